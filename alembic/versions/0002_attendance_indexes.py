@@ -0,0 +1,45 @@
+"""attendance indexes for status and date-range queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # get_user_current_status: user_id equality, check_in range, newest first
+    op.create_index(
+        "ix_attendance_records_user_id_check_in",
+        "attendance_records",
+        ["user_id", sa.text("check_in DESC")],
+    )
+    # Open sessions are a tiny fraction of the table
+    op.create_index(
+        "ix_attendance_records_open_sessions",
+        "attendance_records",
+        ["user_id"],
+        postgresql_where=sa.text("check_out IS NULL"),
+        sqlite_where=sa.text("check_out IS NULL"),
+    )
+    # Admin date-range listing and exports
+    op.create_index(
+        "ix_attendance_records_check_in", "attendance_records", ["check_in"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_attendance_records_check_in", table_name="attendance_records")
+    op.drop_index("ix_attendance_records_open_sessions", table_name="attendance_records")
+    op.drop_index(
+        "ix_attendance_records_user_id_check_in", table_name="attendance_records"
+    )
@@ -0,0 +1,56 @@
+"""enforce at most one open attendance session per user
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 09:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Close all but the newest open session per user so the unique index
+    # can be built; these are sessions that were never checked out.
+    op.execute(
+        """
+        UPDATE attendance_records AS a
+        SET check_out = a.check_in, check_out_method = 'AUTO'
+        WHERE a.check_out IS NULL
+          AND EXISTS (
+              SELECT 1 FROM attendance_records AS newer
+              WHERE newer.user_id = a.user_id
+                AND newer.check_out IS NULL
+                AND (newer.check_in, newer.id) > (a.check_in, a.id)
+          )
+        """
+    )
+    op.drop_index(
+        "ix_attendance_records_open_sessions", table_name="attendance_records"
+    )
+    op.create_index(
+        "uq_attendance_records_open_session",
+        "attendance_records",
+        ["user_id"],
+        unique=True,
+        postgresql_where=sa.text("check_out IS NULL"),
+        sqlite_where=sa.text("check_out IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_attendance_records_open_session", table_name="attendance_records")
+    op.create_index(
+        "ix_attendance_records_open_sessions",
+        "attendance_records",
+        ["user_id"],
+        postgresql_where=sa.text("check_out IS NULL"),
+        sqlite_where=sa.text("check_out IS NULL"),
+    )
@@ -0,0 +1,59 @@
+"""daily attendance summary rollup
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_attendance_summary",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("company_id", sa.Integer(), nullable=True),
+        sa.Column("total_seconds", sa.Integer(), nullable=True),
+        sa.Column("first_check_in", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_check_out", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("session_count", sa.Integer(), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "day"),
+    )
+    op.create_index(
+        "ix_daily_attendance_summary_company_id_day",
+        "daily_attendance_summary",
+        ["company_id", "day"],
+    )
+    op.create_index(
+        "ix_daily_attendance_summary_day", "daily_attendance_summary", ["day"]
+    )
+    # Backfill is left to the rebuild job:
+    #   python -m app.jobs.rebuild_attendance_summary <start> <end>
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_daily_attendance_summary_day", table_name="daily_attendance_summary"
+    )
+    op.drop_index(
+        "ix_daily_attendance_summary_company_id_day",
+        table_name="daily_attendance_summary",
+    )
+    op.drop_table("daily_attendance_summary")
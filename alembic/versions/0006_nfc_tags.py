@@ -0,0 +1,45 @@
+"""nfc tag registry
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 09:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "nfc_tags",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("tag_id", sa.String(), nullable=True),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("site_id", sa.Integer(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["site_id"], ["company_sites.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_nfc_tags_id", "nfc_tags", ["id"])
+    op.create_index("ix_nfc_tags_tag_id", "nfc_tags", ["tag_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_nfc_tags_tag_id", table_name="nfc_tags")
+    op.drop_index("ix_nfc_tags_id", table_name="nfc_tags")
+    op.drop_table("nfc_tags")
@@ -0,0 +1,41 @@
+"""timesheet snapshots of finished periods
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "timesheet_snapshots",
+        sa.Column("company_id", sa.Integer(), nullable=False),
+        sa.Column("start_day", sa.Date(), nullable=False),
+        sa.Column("end_day", sa.Date(), nullable=False),
+        sa.Column("rules", sa.String(length=64), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(
+            ["company_id"], ["companies.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("company_id", "start_day", "end_day", "rules"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("timesheet_snapshots")
@@ -0,0 +1,200 @@
+"""monthly range partitioning of attendance_records on check_in
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# Partitions created up front beyond the current month; the
+# app.jobs.attendance_partitions task keeps extending this
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    "id, user_id, check_in, check_out, latitude, longitude, check_in_method, "
+    "check_out_method, notes, created_at, updated_at"
+)
+INDEXES = (
+    "ix_attendance_records_id",
+    "ix_attendance_records_user_id_check_in",
+    "ix_attendance_records_check_in",
+)
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_month_partition(month: date) -> None:
+    name = f"attendance_records_p{month:%Y_%m}"
+    op.execute(
+        f'CREATE TABLE "{name}" PARTITION OF attendance_records '
+        f"FOR VALUES FROM ('{month.isoformat()}') "
+        f"TO ('{_add_months(month, 1).isoformat()}')"
+    )
+    op.execute(
+        f'CREATE UNIQUE INDEX "uq_{name}_open_session" ON "{name}" (user_id) '
+        "WHERE check_out IS NULL"
+    )
+
+
+def upgrade() -> None:
+    # The partition key cannot be NULL; the model matches on every dialect
+    op.execute(
+        "UPDATE attendance_records "
+        "SET check_in = coalesce(created_at, CURRENT_TIMESTAMP) "
+        "WHERE check_in IS NULL"
+    )
+    with op.batch_alter_table("attendance_records") as batch_op:
+        batch_op.alter_column(
+            "check_in",
+            existing_type=sa.DateTime(timezone=True),
+            nullable=False,
+        )
+
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        # SQLite development databases stay a single table
+        return
+
+    op.execute("ALTER TABLE attendance_records RENAME TO attendance_records_old")
+    op.execute(
+        "ALTER TABLE attendance_records_old "
+        "RENAME CONSTRAINT attendance_records_pkey TO attendance_records_old_pkey"
+    )
+    op.execute("DROP INDEX uq_attendance_records_open_session")
+    for index in INDEXES:
+        op.execute(f"ALTER INDEX {index} RENAME TO {index}_old")
+
+    # Unique constraints on a partitioned table must include the partition
+    # key, hence (id, check_in); ids still come from the existing sequence
+    op.execute(
+        """
+        CREATE TABLE attendance_records (
+            id integer NOT NULL DEFAULT nextval('attendance_records_id_seq'),
+            user_id integer REFERENCES users (id),
+            check_in timestamp with time zone NOT NULL,
+            check_out timestamp with time zone,
+            latitude double precision,
+            longitude double precision,
+            check_in_method varchar,
+            check_out_method varchar,
+            notes varchar,
+            created_at timestamp with time zone DEFAULT now(),
+            updated_at timestamp with time zone,
+            PRIMARY KEY (id, check_in)
+        ) PARTITION BY RANGE (check_in)
+        """
+    )
+    op.execute(
+        "ALTER SEQUENCE attendance_records_id_seq OWNED BY attendance_records.id"
+    )
+    # Created on the parent, these cascade to every partition
+    op.create_index("ix_attendance_records_id", "attendance_records", ["id"])
+    op.create_index(
+        "ix_attendance_records_user_id_check_in",
+        "attendance_records",
+        ["user_id", sa.text("check_in DESC")],
+    )
+    op.create_index(
+        "ix_attendance_records_check_in", "attendance_records", ["check_in"]
+    )
+
+    # Catches rows outside every month partition (e.g. far-future typos);
+    # the maintenance job keeps it empty for current months
+    op.execute(
+        "CREATE TABLE attendance_records_default "
+        "PARTITION OF attendance_records DEFAULT"
+    )
+    op.execute(
+        "CREATE UNIQUE INDEX uq_attendance_records_default_open_session "
+        "ON attendance_records_default (user_id) WHERE check_out IS NULL"
+    )
+
+    current = date.today().replace(day=1)
+    oldest = bind.execute(
+        sa.text("SELECT min(check_in) FROM attendance_records_old")
+    ).scalar()
+    month = oldest.date().replace(day=1) if oldest else current
+    while month <= _add_months(current, MONTHS_AHEAD):
+        _create_month_partition(month)
+        month = _add_months(month, 1)
+
+    op.execute(
+        f"INSERT INTO attendance_records ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM attendance_records_old"
+    )
+    op.execute("DROP TABLE attendance_records_old")
+    op.execute("ANALYZE attendance_records")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        with op.batch_alter_table("attendance_records") as batch_op:
+            batch_op.alter_column(
+                "check_in",
+                existing_type=sa.DateTime(timezone=True),
+                nullable=True,
+            )
+        return
+
+    op.execute(
+        "ALTER TABLE attendance_records RENAME TO attendance_records_partitioned"
+    )
+    for index in INDEXES:
+        op.execute(f"ALTER INDEX {index} RENAME TO {index}_partitioned")
+    op.execute(
+        """
+        CREATE TABLE attendance_records (
+            id integer NOT NULL DEFAULT nextval('attendance_records_id_seq'),
+            user_id integer REFERENCES users (id),
+            check_in timestamp with time zone,
+            check_out timestamp with time zone,
+            latitude double precision,
+            longitude double precision,
+            check_in_method varchar,
+            check_out_method varchar,
+            notes varchar,
+            created_at timestamp with time zone DEFAULT now(),
+            updated_at timestamp with time zone,
+            CONSTRAINT attendance_records_pkey PRIMARY KEY (id)
+        )
+        """
+    )
+    op.execute(
+        "ALTER SEQUENCE attendance_records_id_seq OWNED BY attendance_records.id"
+    )
+    op.execute(
+        f"INSERT INTO attendance_records ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM attendance_records_partitioned"
+    )
+    op.execute("DROP TABLE attendance_records_partitioned CASCADE")
+    op.create_index("ix_attendance_records_id", "attendance_records", ["id"])
+    op.create_index(
+        "ix_attendance_records_user_id_check_in",
+        "attendance_records",
+        ["user_id", sa.text("check_in DESC")],
+    )
+    op.create_index(
+        "ix_attendance_records_check_in", "attendance_records", ["check_in"]
+    )
+    op.create_index(
+        "uq_attendance_records_open_session",
+        "attendance_records",
+        ["user_id"],
+        unique=True,
+        postgresql_where=sa.text("check_out IS NULL"),
+    )
@@ -12,7 +12,7 @@ from app.core.security import verify_password
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.token import TokenPayload
-from app.services.user import get_user
+from app.services.user import get_user_cached
 
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/login/access-token"
@@ -30,7 +30,7 @@ async def get_current_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = await get_user(db, id=token_data.sub)
+    user = await get_user_cached(db, id=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -1,19 +1,36 @@
 # app/api/v1/endpoints/attendance.py
-from typing import Any, List
-from datetime import datetime
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from datetime import date, datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_active_user
-from app.db.session import get_db
+from app.api.deps import get_current_active_superuser, get_current_active_user
+from app.core.config import settings
+from app.core.etag import cache_headers, is_not_modified, make_etag, not_modified
+from app.db.session import get_db, get_session_factory
 from app.models.user import User
 from app.schemas.attendance import (
     Attendance as AttendanceSchema,
     AttendanceCheckIn,
     AttendanceCheckOut,
     AttendanceCreate,
+    AttendanceImportResult,
+    AttendanceSummary,
+    AttendanceSummaryRebuild,
     AttendanceUpdate,
+    GeofenceAuditRequest,
+    GeofenceAuditResult,
 )
 from app.services.attendance import (
     check_in,
@@ -22,83 +39,302 @@ from app.services.attendance import (
     get_attendance,
     get_attendance_by_date_range,
     get_attendance_by_user,
+    get_attendance_page_version,
     get_user_current_status,
+    get_user_current_status_version,
     update_attendance,
 )
+from app.services.attendance_archive_manifest import ensure_not_archived
+from app.services.attendance_ingest import attendance_ingestor
+from app.services.attendance_export import (
+    render_csv,
+    render_ndjson,
+    stream_attendance_rows,
+)
+from app.services.attendance_summary import (
+    get_attendance_summary,
+    rebuild_daily_summary,
+)
+from app.services.attendance_import import (
+    import_attendance,
+    iter_csv_records,
+    iter_lines,
+    iter_ndjson_records,
+)
+from app.services.company_site import get_company_sites, get_site_index
+from app.services.geofence_audit import audit_attendance_locations
+from app.services.idempotency import (
+    get_stored_response,
+    key_lock,
+    request_fingerprint,
+    save_response,
+)
+from app.services.nfc import validate_tag
+from app.services.qr import verify_site_code
+from app.utils.pagination import encode_cursor
+from app.utils.projection import list_adapter, parse_fields
 
 router = APIRouter()
 
 
-@router.post("/attendance/check-in", response_model=AttendanceSchema)
-async def user_check_in(
-    *,
-    db: AsyncSession = Depends(get_db),
-    check_in_data: AttendanceCheckIn,
-    current_user: User = Depends(get_current_active_user),
+async def _enforce_geofence(
+    db: AsyncSession,
+    user: User,
+    latitude: Optional[float],
+    longitude: Optional[float],
+) -> None:
+    """Reject a check-in/out outside every active site of the user's company"""
+    if not settings.GEOFENCE_ENFORCED or not user.company_id:
+        return
+    index = await get_site_index(db, user.company_id)
+    if not index:
+        return
+    if latitude is None or longitude is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Your location is required to check in or out.",
+        )
+    if index.find(latitude, longitude) is None:
+        raise HTTPException(
+            status_code=400,
+            detail="You are not at an allowed location.",
+        )
+
+
+async def _verify_qr_code(
+    db: AsyncSession, user: User, code: Optional[str], method: str
+) -> None:
+    """
+    Reject a scanned rotating site code that is forged, expired or foreign,
+    or missing when the method is QR
+    """
+    if code is None:
+        if method == "QR":
+            raise HTTPException(status_code=400, detail="QR code is required.")
+        return
+    site_id = verify_site_code(code)
+    if (
+        site_id is None
+        or not user.company_id
+        or site_id not in await get_site_index(db, user.company_id)
+    ):
+        raise HTTPException(status_code=400, detail="Invalid or expired QR code.")
+
+
+async def _verify_nfc_tag(
+    db: AsyncSession, user: User, tag_id: Optional[str], method: str
+) -> None:
+    """
+    Reject an unregistered, inactive or foreign NFC tag, or a missing one
+    when the method is NFC
+    """
+    if tag_id is None:
+        if method == "NFC":
+            raise HTTPException(status_code=400, detail="NFC tag ID is required.")
+        return
+    result = await validate_tag(db, tag_id, user.id)
+    if not result["valid"]:
+        raise HTTPException(status_code=400, detail=result["message"])
+    site_id = result["site_id"]
+    if site_id is not None and (
+        not user.company_id
+        or site_id not in await get_site_index(db, user.company_id)
+    ):
+        raise HTTPException(
+            status_code=400, detail="NFC tag belongs to another company's site"
+        )
+
+
+async def _idempotent(
+    db: AsyncSession,
+    user: User,
+    endpoint: str,
+    key: Optional[str],
+    payload: Any,
+    call: Callable[[], Awaitable[Any]],
 ) -> Any:
     """
-    User check-in.
+    Run `call` once per Idempotency-Key. The first response, success or
+    client error, is stored and replayed for retries with the same key.
     """
-    status = await get_user_current_status(db, user_id=current_user.id)
-    if status and not status.check_out:
+    if key is None:
+        return await call()
+    if not key or len(key) > 255:
         raise HTTPException(
-            status_code=400,
-            detail="You are already checked in. Please check out first.",
+            status_code=400, detail="Idempotency-Key must be 1-255 characters."
         )
+    request_hash = request_fingerprint(payload.model_dump())
+    # A rolled-back check-in expires the session's objects, user included
+    user_id = user.id
+    replayed = True
+    async with key_lock(user_id, endpoint, key):
+        stored = await get_stored_response(db, user_id, endpoint, key)
+        if stored is None:
+            replayed = False
+            try:
+                attendance = AttendanceSchema.model_validate(await call())
+                status_code, body = 200, jsonable_encoder(attendance)
+            except HTTPException as exc:
+                if exc.status_code >= 500:
+                    raise
+                status_code, body = exc.status_code, {"detail": exc.detail}
+            stored = await save_response(
+                db, user_id, endpoint, key, request_hash, status_code, body
+            )
+    if stored.request_hash != request_hash:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used for a different request.",
+        )
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return JSONResponse(stored.body, status_code=stored.status_code, headers=headers)
+
 
-    attendance = await check_in(
-        db=db,
-        user_id=current_user.id,
+async def _check_in(db: AsyncSession, user: User, check_in_data: AttendanceCheckIn):
+    method = check_in_data.check_in_method
+    await _verify_qr_code(db, user, check_in_data.qr_code, method)
+    await _verify_nfc_tag(db, user, check_in_data.nfc_tag_id, method)
+    await _enforce_geofence(db, user, check_in_data.latitude, check_in_data.longitude)
+    values = dict(
+        user_id=user.id,
         latitude=check_in_data.latitude,
         longitude=check_in_data.longitude,
         check_in_method=check_in_data.check_in_method,
         notes=check_in_data.notes,
     )
+    if settings.ATTENDANCE_INGEST_MODE == "batched":
+        # Return the pooled connection while the event waits for its batch
+        await db.close()
+        attendance = await attendance_ingestor.check_in(**values)
+    else:
+        attendance = await check_in(db=db, **values)
+    if not attendance:
+        raise HTTPException(
+            status_code=400,
+            detail="You are already checked in. Please check out first.",
+        )
     return attendance
 
 
-@router.post("/attendance/check-out", response_model=AttendanceSchema)
-async def user_check_out(
-    *,
-    db: AsyncSession = Depends(get_db),
-    check_out_data: AttendanceCheckOut,
-    current_user: User = Depends(get_current_active_user),
-) -> Any:
-    """
-    User check-out.
-    """
-    status = await get_user_current_status(db, user_id=current_user.id)
+async def _check_out(
+    db: AsyncSession, user: User, check_out_data: AttendanceCheckOut
+):
+    method = check_out_data.check_out_method
+    await _verify_qr_code(db, user, check_out_data.qr_code, method)
+    await _verify_nfc_tag(db, user, check_out_data.nfc_tag_id, method)
+    await _enforce_geofence(
+        db, user, check_out_data.latitude, check_out_data.longitude
+    )
+    status = await get_user_current_status(db, user_id=user.id)
     if not status or status.check_out:
         raise HTTPException(
             status_code=400,
             detail="You are not checked in. Please check in first.",
         )
 
-    attendance = await check_out(
-        db=db,
-        attendance_id=status.id,
+    values = dict(
         latitude=check_out_data.latitude,
         longitude=check_out_data.longitude,
         check_out_method=check_out_data.check_out_method,
         notes=check_out_data.notes,
     )
-    return attendance
+    if settings.ATTENDANCE_INGEST_MODE == "batched":
+        # Return the pooled connection while the event waits for its batch
+        await db.close()
+        attendance = await attendance_ingestor.check_out(status.id, **values)
+        if not attendance:
+            # Another check-out of the same session got in first
+            raise HTTPException(
+                status_code=400,
+                detail="You are not checked in. Please check in first.",
+            )
+        return attendance
+    return await check_out(db=db, attendance_id=status.id, **values)
+
+
+@router.post("/attendance/check-in", response_model=AttendanceSchema)
+async def user_check_in(
+    *,
+    db: AsyncSession = Depends(get_db),
+    check_in_data: AttendanceCheckIn,
+    current_user: User = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+) -> Any:
+    """
+    User check-in. Retries carrying the same Idempotency-Key get the first
+    response back without checking in again.
+    """
+    return await _idempotent(
+        db,
+        current_user,
+        "check-in",
+        idempotency_key,
+        check_in_data,
+        lambda: _check_in(db, current_user, check_in_data),
+    )
+
+
+@router.post("/attendance/check-out", response_model=AttendanceSchema)
+async def user_check_out(
+    *,
+    db: AsyncSession = Depends(get_db),
+    check_out_data: AttendanceCheckOut,
+    current_user: User = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+) -> Any:
+    """
+    User check-out. Retries carrying the same Idempotency-Key get the first
+    response back without checking out again.
+    """
+    return await _idempotent(
+        db,
+        current_user,
+        "check-out",
+        idempotency_key,
+        check_out_data,
+        lambda: _check_out(db, current_user, check_out_data),
+    )
+
+
+def _status_validators(
+    user_id: int,
+    id: int,
+    created_at: Optional[datetime],
+    updated_at: Optional[datetime],
+    check_out: Optional[datetime],
+) -> Tuple[str, Optional[datetime]]:
+    etag = make_etag("status", user_id, id, created_at, updated_at, check_out)
+    return etag, updated_at or created_at
 
 
 @router.get("/attendance/status", response_model=AttendanceSchema)
 async def get_current_status(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Get current user's attendance status.
+    Get current user's attendance status. Honours If-None-Match and
+    If-Modified-Since with a 304 checked against the record's version only.
     """
-    status = await get_user_current_status(db, user_id=current_user.id)
+    user_id = current_user.id
+    version = await get_user_current_status_version(db, user_id=user_id)
+    if version is not None:
+        etag, last_modified = _status_validators(user_id, *version)
+        if is_not_modified(request, etag, last_modified):
+            return not_modified(cache_headers(etag, last_modified))
+
+    status = await get_user_current_status(db, user_id=user_id)
     if not status:
         raise HTTPException(
             status_code=404,
             detail="No active attendance record found.",
         )
+    etag, last_modified = _status_validators(
+        user_id, status.id, status.created_at, status.updated_at, status.check_out
+    )
+    response.headers.update(cache_headers(etag, last_modified))
     return status
 
 
@@ -107,36 +343,108 @@ async def read_attendance(
     *,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None),
     start_date: datetime = Query(None),
     end_date: datetime = Query(None),
+    fields: Optional[str] = Query(None),
 ) -> Any:
     """
     Retrieve attendance records.
+
+    Pass the `next_cursor` from the previous page's `Link` header as `cursor`
+    for constant-cost keyset pagination; `skip` is kept for backward
+    compatibility only. `fields` is a comma-separated sparse fieldset, e.g.
+    `fields=user_id,check_in,check_out`. An If-None-Match matching the
+    page's ETag gets a 304 before any row is loaded.
     """
-    if current_user.is_superuser:
-        if start_date and end_date:
-            attendance = await get_attendance_by_date_range(
-                db, start_date=start_date, end_date=end_date, skip=skip, limit=limit
-            )
-        else:
-            attendance = await get_attendance(db, skip=skip, limit=limit)
-    else:
-        if start_date and end_date:
-            attendance = await get_attendance_by_date_range(
-                db,
-                start_date=start_date,
-                end_date=end_date,
-                user_id=current_user.id,
-                skip=skip,
-                limit=limit,
-            )
+    try:
+        selected = parse_fields(fields, AttendanceSchema)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    try:
+        version = await get_attendance_page_version(
+            db,
+            user_id=None if current_user.is_superuser else current_user.id,
+            start_date=start_date,
+            end_date=end_date,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    etag = make_etag("attendance", current_user.id, selected, *version)
+    headers = cache_headers(etag)
+    if is_not_modified(request, etag):
+        return not_modified(headers)
+
+    try:
+        if current_user.is_superuser:
+            if start_date and end_date:
+                attendance = await get_attendance_by_date_range(
+                    db,
+                    start_date=start_date,
+                    end_date=end_date,
+                    skip=skip,
+                    limit=limit,
+                    cursor=cursor,
+                    as_rows=True,
+                    fields=selected,
+                )
+            else:
+                attendance = await get_attendance(
+                    db,
+                    skip=skip,
+                    limit=limit,
+                    cursor=cursor,
+                    as_rows=True,
+                    fields=selected,
+                )
         else:
-            attendance = await get_attendance_by_user(
-                db, user_id=current_user.id, skip=skip, limit=limit
-            )
-    return attendance
+            if start_date and end_date:
+                attendance = await get_attendance_by_date_range(
+                    db,
+                    start_date=start_date,
+                    end_date=end_date,
+                    user_id=current_user.id,
+                    skip=skip,
+                    limit=limit,
+                    cursor=cursor,
+                    as_rows=True,
+                    fields=selected,
+                )
+            else:
+                attendance = await get_attendance_by_user(
+                    db,
+                    user_id=current_user.id,
+                    skip=skip,
+                    limit=limit,
+                    cursor=cursor,
+                    as_rows=True,
+                    fields=selected,
+                )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+    if limit and len(attendance) == limit and attendance[-1].check_in is not None:
+        next_cursor = encode_cursor(attendance[-1].check_in, attendance[-1].id)
+        next_url = request.url.remove_query_params("skip").include_query_params(
+            cursor=next_cursor
+        )
+        headers["Link"] = f'<{next_url}>; rel="next"'
+        headers["X-Next-Cursor"] = next_cursor
+    # Row tuples are validated and serialized as one list by pydantic-core,
+    # skipping ORM instances and FastAPI's response_model encoding; dump_json
+    # keeps datetimes formatted as in single-record responses
+    adapter = list_adapter(AttendanceSchema, selected)
+    rows = adapter.validate_python(attendance, from_attributes=True)
+    return Response(
+        adapter.dump_json(rows), media_type="application/json", headers=headers
+    )
 
 
 @router.post("/attendance/", response_model=AttendanceSchema)
@@ -155,6 +463,175 @@ async def create_attendance_record(
     return attendance
 
 
+@router.post("/attendance/import", response_model=AttendanceImportResult)
+async def import_attendance_records(
+    *,
+    db: AsyncSession = Depends(get_db),
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Bulk import attendance records (admin only).
+
+    The request body is a CSV file with a header row or newline-delimited
+    JSON, streamed and inserted in chunks. The format is taken from `format`
+    or the Content-Type header. Invalid rows are reported, not fatal.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "json" in content_type else "csv"
+    lines = iter_lines(request.stream())
+    if format == "ndjson":
+        records = iter_ndjson_records(lines)
+    else:
+        records = iter_csv_records(lines)
+    return await import_attendance(
+        db,
+        records,
+        chunk_size=settings.ATTENDANCE_IMPORT_CHUNK_SIZE,
+        max_errors=settings.ATTENDANCE_IMPORT_MAX_ERRORS,
+    )
+
+
+@router.get("/attendance/export")
+async def export_attendance_records(
+    *,
+    session_factory: Callable[[], AsyncSession] = Depends(get_session_factory),
+    current_user: User = Depends(get_current_active_user),
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start_date: datetime = Query(None),
+    end_date: datetime = Query(None),
+    user_id: Optional[int] = Query(None),
+) -> Any:
+    """
+    Stream attendance records as CSV or NDJSON.
+
+    Rows come from a server-side cursor, so memory stays flat regardless of
+    the size of the export. Regular users can only export their own records.
+    Archived records are not exported; without `start_date` the export
+    starts at the archive watermark.
+    """
+    if not current_user.is_superuser:
+        user_id = current_user.id
+    if start_date:
+        try:
+            ensure_not_archived(start_date)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    async def body():
+        # The response outlives request-scoped dependencies, so the stream
+        # owns its session.
+        async with session_factory() as db:
+            batches = stream_attendance_rows(
+                db,
+                start_date=start_date,
+                end_date=end_date,
+                user_id=user_id,
+                batch_size=settings.ATTENDANCE_EXPORT_BATCH_SIZE,
+            )
+            render = render_ndjson if format == "ndjson" else render_csv
+            async for chunk in render(batches):
+                yield chunk
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    return StreamingResponse(
+        body(),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="attendance.{format}"'
+        },
+    )
+
+
+@router.get("/attendance/summary", response_model=List[AttendanceSummary])
+async def read_attendance_summary(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    start_date: date,
+    end_date: date,
+    period: str = Query("week", pattern="^(day|week|month)$"),
+    user_id: Optional[int] = Query(None),
+    company_id: Optional[int] = Query(None),
+) -> Any:
+    """
+    Hours worked per user and day, week or month, from the daily rollup.
+    Regular users only see their own totals.
+    """
+    if not current_user.is_superuser:
+        user_id, company_id = current_user.id, None
+    return await get_attendance_summary(
+        db,
+        start_day=start_date,
+        end_day=end_date,
+        period=period,
+        user_id=user_id,
+        company_id=company_id,
+    )
+
+
+@router.post("/attendance/summary/rebuild", response_model=AttendanceSummaryRebuild)
+async def rebuild_attendance_summary(
+    *,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser),
+    start_date: date,
+    end_date: date,
+    user_id: Optional[int] = Query(None),
+) -> Any:
+    """
+    Recompute the daily rollup for a range of days (admin only).
+    """
+    rows = await rebuild_daily_summary(
+        db, start_day=start_date, end_day=end_date, user_id=user_id
+    )
+    return {"rows": rows}
+
+
+@router.post("/attendance/audit/geofence", response_model=GeofenceAuditResult)
+async def audit_geofence(
+    *,
+    db: AsyncSession = Depends(get_db),
+    audit_in: GeofenceAuditRequest,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Re-validate stored check-in coordinates against a geofence (admin only).
+
+    Give an explicit centre and radius, or only a `company_id` to audit
+    against all of that company's active sites.
+    """
+    if audit_in.latitude is not None and audit_in.longitude is not None:
+        fences = [(audit_in.latitude, audit_in.longitude, audit_in.radius_meters)]
+    elif audit_in.company_id:
+        sites = await get_company_sites(
+            db, company_id=audit_in.company_id, active_only=True
+        )
+        fences = [(s.latitude, s.longitude, s.radius_meters) for s in sites]
+    else:
+        fences = []
+    if not fences:
+        raise HTTPException(
+            status_code=400,
+            detail="Provide a latitude and longitude or a company with sites.",
+        )
+    try:
+        return await audit_attendance_locations(
+            db,
+            fences=fences,
+            start_date=audit_in.start_date,
+            end_date=audit_in.end_date,
+            user_id=audit_in.user_id,
+            company_id=audit_in.company_id,
+            chunk_size=settings.GEOFENCE_AUDIT_CHUNK_SIZE,
+            max_flagged=settings.GEOFENCE_AUDIT_MAX_VIOLATIONS,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
 @router.get("/attendance/{attendance_id}", response_model=AttendanceSchema)
 async def read_attendance_by_id(
     *,
@@ -1,10 +1,13 @@
 # app/api/v1/endpoints/companies.py
-from typing import Any, List
+from datetime import date
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_active_superuser, get_current_active_user
+from app.core.config import settings
+from app.core.etag import cache_headers, is_not_modified, make_etag, not_modified
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.company import (
@@ -13,6 +16,12 @@ from app.schemas.company import (
     CompanyUpdate,
     CompanyWithEmployees,
 )
+from app.schemas.attendance import Timesheet
+from app.schemas.company_site import (
+    CompanySite,
+    CompanySiteCreate,
+    CompanySiteUpdate,
+)
 from app.services.company import (
     create_company,
     get_company,
@@ -20,6 +29,18 @@ from app.services.company import (
     update_company,
     delete_company,
 )
+from app.services.company_site import (
+    create_company_site,
+    delete_company_site,
+    get_company_site,
+    get_company_sites,
+    get_site_index,
+    update_company_site,
+)
+from app.services.qr import site_qr_renderer, window_expires_in
+from app.services.timesheet import get_company_timesheet
+from app.utils.projection import list_adapter, parse_fields
+from app.utils.qr import QR_FORMATS
 
 router = APIRouter()
 
@@ -28,18 +49,30 @@ router = APIRouter()
 async def read_companies(
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Retrieve companies.
+    Retrieve companies. `fields` is a comma-separated sparse fieldset.
     """
+    try:
+        selected = parse_fields(fields, Company)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     if current_user.is_superuser:
-        companies = await get_companies(db, skip=skip, limit=limit)
+        companies = await get_companies(db, skip=skip, limit=limit, fields=selected)
     else:
         # Regular users can only see their own company
-        companies = [current_user.company] if current_user.company else []
-    return companies
+        company = None
+        if current_user.company_id:
+            company = await get_company(db, id=current_user.company_id)
+        companies = [company] if company else []
+    if selected is None:
+        return companies
+    adapter = list_adapter(Company, selected)
+    rows = adapter.validate_python(companies, from_attributes=True)
+    return Response(adapter.dump_json(rows), media_type="application/json")
 
 
 @router.post("/companies/", response_model=Company)
@@ -56,25 +89,46 @@ async def create_new_company(
     return company
 
 
+def _company_etag(company: Any) -> str:
+    employees = company.employees
+    return make_etag(
+        "company",
+        company.id,
+        company.created_at,
+        company.updated_at,
+        len(employees),
+        max(
+            (employee.updated_at or employee.created_at for employee in employees),
+            default=None,
+        ),
+        sum(employee.id for employee in employees),
+    )
+
+
 @router.get("/companies/{company_id}", response_model=CompanyWithEmployees)
 async def read_company_by_id(
     company_id: int,
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Get a specific company by id.
+    Get a specific company by id. Served from company_cache when possible;
+    an unchanged company (including its employees) gets a 304.
     """
-    company = await get_company(db, id=company_id)
+    if not current_user.is_superuser and current_user.company_id != company_id:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    company = await get_company(db, id=company_id, with_employees=True)
     if not company:
         raise HTTPException(
             status_code=404,
             detail="Company not found",
         )
-    if not current_user.is_superuser and (
-        not current_user.company or current_user.company.id != company_id
-    ):
-        raise HTTPException(status_code=400, detail="Not enough permissions")
+    headers = cache_headers(_company_etag(company))
+    if is_not_modified(request, headers["ETag"]):
+        return not_modified(headers)
+    response.headers.update(headers)
     return company
 
 
@@ -117,3 +171,140 @@ async def delete_company_by_id(
         )
     company = await delete_company(db=db, id=company_id)
     return company
+
+
+@router.get("/companies/{company_id}/sites", response_model=List[CompanySite])
+async def read_company_sites(
+    company_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    List the sites (geofences) of a company.
+    """
+    if not current_user.is_superuser and current_user.company_id != company_id:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    return await get_company_sites(db, company_id=company_id)
+
+
+@router.post("/companies/{company_id}/sites", response_model=CompanySite)
+async def create_new_company_site(
+    *,
+    db: AsyncSession = Depends(get_db),
+    company_id: int,
+    site_in: CompanySiteCreate,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Add a site to a company.
+    """
+    company = await get_company(db, id=company_id)
+    if not company:
+        raise HTTPException(
+            status_code=404,
+            detail="Company not found",
+        )
+    return await create_company_site(db, company_id=company_id, obj_in=site_in)
+
+
+@router.put("/companies/{company_id}/sites/{site_id}", response_model=CompanySite)
+async def update_company_site_by_id(
+    *,
+    db: AsyncSession = Depends(get_db),
+    company_id: int,
+    site_id: int,
+    site_in: CompanySiteUpdate,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Update a company site.
+    """
+    site = await get_company_site(db, id=site_id)
+    if not site or site.company_id != company_id:
+        raise HTTPException(
+            status_code=404,
+            detail="Site not found",
+        )
+    return await update_company_site(db, db_obj=site, obj_in=site_in)
+
+
+@router.delete("/companies/{company_id}/sites/{site_id}", response_model=CompanySite)
+async def delete_company_site_by_id(
+    *,
+    db: AsyncSession = Depends(get_db),
+    company_id: int,
+    site_id: int,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Delete a company site.
+    """
+    site = await get_company_site(db, id=site_id)
+    if not site or site.company_id != company_id:
+        raise HTTPException(
+            status_code=404,
+            detail="Site not found",
+        )
+    return await delete_company_site(db, id=site_id)
+
+
+@router.get("/companies/{company_id}/sites/{site_id}/qr")
+async def read_company_site_qr(
+    company_id: int,
+    site_id: int,
+    format: str = Query("png", pattern="^(png|svg)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Current rotating check-in QR code of a site, for display screens.
+    """
+    if not current_user.is_superuser and current_user.company_id != company_id:
+        raise HTTPException(status_code=400, detail="Not enough permissions")
+    if site_id not in await get_site_index(db, company_id):
+        raise HTTPException(
+            status_code=404,
+            detail="Site not found",
+        )
+    image, window = await site_qr_renderer.get(site_id, format)
+    return Response(
+        content=image,
+        media_type=QR_FORMATS[format],
+        headers={"Cache-Control": f"max-age={window_expires_in(window)}"},
+    )
+
+
+@router.get("/companies/{company_id}/timesheet", response_model=Timesheet)
+async def read_company_timesheet(
+    company_id: int,
+    start_date: date,
+    end_date: date,
+    refresh: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Per-employee totals, overtime, late arrivals and missing check-outs for
+    a period (admin only). Finished periods are served from a stored
+    snapshot; pass `refresh=true` to recompute one after corrections.
+    """
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    if (end_date - start_date).days >= settings.TIMESHEET_MAX_DAYS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Timesheets span at most {settings.TIMESHEET_MAX_DAYS} days",
+        )
+    if not await get_company(db, id=company_id):
+        raise HTTPException(
+            status_code=404,
+            detail="Company not found",
+        )
+    try:
+        payload = await get_company_timesheet(
+            db, company_id, start_date, end_date, refresh=refresh
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    # Already rendered JSON; snapshots are returned byte for byte
+    return Response(content=payload, media_type="application/json")
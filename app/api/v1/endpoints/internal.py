@@ -0,0 +1,47 @@
+# app/api/v1/endpoints/internal.py
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_active_superuser
+from app.core.config import settings
+from app.core.security import password_hash_stats
+from app.db.session import pool_status
+from app.models.user import User
+from app.services.attendance_ingest import attendance_ingestor
+from app.services.company import company_cache
+from app.services.company_site import site_index_cache
+from app.services.idempotency import idempotency_cache
+from app.services.user import user_cache
+
+router = APIRouter()
+
+
+@router.get("/internal/pool")
+async def read_pool_status(
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Connection, hashing and ingest queue counters for this worker process.
+    """
+    return {
+        "profile": settings.DB_POOL_PROFILE,
+        "database": pool_status(),
+        "password_hash": password_hash_stats(),
+        "attendance_ingest": attendance_ingestor.stats(),
+    }
+
+
+@router.get("/internal/cache")
+async def read_cache_stats(
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Hit, miss, eviction and invalidation counters of this worker's caches.
+    """
+    return {
+        "company": company_cache.stats(),
+        "user": user_cache.stats(),
+        "site_index": site_index_cache.stats(),
+        "idempotency": idempotency_cache.stats(),
+    }
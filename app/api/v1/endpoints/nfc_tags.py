@@ -0,0 +1,57 @@
+# app/api/v1/endpoints/nfc_tags.py
+from typing import Any, List
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_active_superuser
+from app.db.session import get_db
+from app.models.user import User
+from app.schemas.nfc_tag import (
+    NFCTag,
+    NFCTagBulkCreate,
+    NFCTagBulkDeactivate,
+    NFCTagBulkResult,
+)
+from app.services.nfc import deactivate_nfc_tags, get_nfc_tags, register_nfc_tags
+
+router = APIRouter()
+
+
+@router.get("/nfc-tags/", response_model=List[NFCTag])
+async def read_nfc_tags(
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Retrieve registered NFC tags.
+    """
+    return await get_nfc_tags(db, skip=skip, limit=limit)
+
+
+@router.post("/nfc-tags/bulk", response_model=NFCTagBulkResult)
+async def bulk_register_nfc_tags(
+    *,
+    db: AsyncSession = Depends(get_db),
+    tags_in: NFCTagBulkCreate,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Register or update many NFC tags at once, matched by tag_id.
+    """
+    return await register_nfc_tags(db, tags_in.tags)
+
+
+@router.post("/nfc-tags/deactivate", response_model=NFCTagBulkResult)
+async def bulk_deactivate_nfc_tags(
+    *,
+    db: AsyncSession = Depends(get_db),
+    tags_in: NFCTagBulkDeactivate,
+    current_user: User = Depends(get_current_active_superuser),
+) -> Any:
+    """
+    Deactivate many NFC tags at once.
+    """
+    return await deactivate_nfc_tags(db, tags_in.tag_ids)
@@ -1,14 +1,24 @@
 # app/api/v1/endpoints/users.py
-from typing import Any, List
+from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_active_superuser, get_current_active_user
+from app.core.etag import cache_headers, is_not_modified, make_etag, not_modified
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserCreate, UserUpdate
-from app.services.user import create_user, get_user, get_users, update_user, delete_user
+from app.services.user import (
+    PUBLIC_USER_COLUMNS,
+    create_user,
+    delete_user,
+    get_user,
+    get_user_by_email,
+    get_users,
+    update_user,
+)
+from app.utils.projection import list_adapter, parse_fields
 
 router = APIRouter()
 
@@ -17,14 +27,21 @@ router = APIRouter()
 async def read_users(
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = Query(None),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_superuser),
 ) -> Any:
     """
-    Retrieve users.
+    Retrieve users. `fields` is a comma-separated sparse fieldset.
     """
-    users = await get_users(db, skip=skip, limit=limit)
-    return users
+    try:
+        selected = parse_fields(fields, UserSchema)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    users = await get_users(db, skip=skip, limit=limit, as_rows=True, fields=selected)
+    adapter = list_adapter(UserSchema, selected)
+    rows = adapter.validate_python(users, from_attributes=True)
+    return Response(adapter.dump_json(rows), media_type="application/json")
 
 
 @router.post("/users/", response_model=UserSchema)
@@ -49,11 +66,22 @@ async def create_new_user(
 
 @router.get("/users/me", response_model=UserSchema)
 async def read_user_me(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
 ) -> Any:
     """
-    Get current user.
+    Get current user. The ETag hashes the already loaded columns, so a 304
+    costs no query beyond authentication.
     """
+    etag = make_etag(
+        *(getattr(current_user, column.key) for column in PUBLIC_USER_COLUMNS)
+    )
+    last_modified = current_user.updated_at or current_user.created_at
+    headers = cache_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(headers)
+    response.headers.update(headers)
     return current_user
 
 
@@ -1,8 +1,20 @@
 # app/core/config.py
-from pydantic import PostgresDsn, field_validator, EmailStr, AnyHttpUrl
+from pydantic import PostgresDsn, field_validator, model_validator, EmailStr, AnyHttpUrl
 from pydantic_settings import BaseSettings
 import secrets
-from typing import List, Optional, Any, Union
+from datetime import time
+from typing import Dict, List, Optional, Any, Union
+
+# Presets for DB_POOL_PROFILE; any DB_* setting given explicitly wins
+DB_POOL_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    # API workers: more concurrent requests, fail fast instead of queueing
+    "web": {"DB_POOL_SIZE": 10, "DB_MAX_OVERFLOW": 20, "DB_POOL_TIMEOUT": 10.0},
+    # Background jobs and CLIs: one or two long-running connections
+    "worker": {"DB_POOL_SIZE": 2, "DB_MAX_OVERFLOW": 0},
+    # Behind PgBouncer in transaction mode prepared statements cannot be cached
+    "pgbouncer": {"DB_STATEMENT_CACHE_SIZE": 0, "DB_POOL_PRE_PING": False},
+}
 
 
 class Settings(BaseSettings):
@@ -41,9 +53,91 @@ class Settings(BaseSettings):
         # Build the URI as a string
         return f"postgresql+asyncpg://{user}:{password}@{host}/{db}"
 
+    DB_POOL_PROFILE: str = "default"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared statement cache per connection; 0 disables it
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_ECHO: bool = False
+
+    @model_validator(mode="after")
+    def apply_db_pool_profile(self) -> "Settings":
+        if self.DB_POOL_PROFILE not in DB_POOL_PROFILES:
+            raise ValueError(f"Unknown DB_POOL_PROFILE {self.DB_POOL_PROFILE!r}")
+        for name, value in DB_POOL_PROFILES[self.DB_POOL_PROFILE].items():
+            if name not in self.model_fields_set:
+                setattr(self, name, value)
+        return self
+
     FIRST_SUPERUSER: EmailStr
     FIRST_SUPERUSER_PASSWORD: str
 
+    # bcrypt work is offloaded to a "thread" or "process" pool
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 4
+
+    ATTENDANCE_IMPORT_CHUNK_SIZE: int = 1000
+    # Per-row errors beyond this are counted but not listed in the response
+    ATTENDANCE_IMPORT_MAX_ERRORS: int = 1000
+    ATTENDANCE_EXPORT_BATCH_SIZE: int = 1000
+    # "direct" commits every check-in/out; "batched" queues them and writes
+    # up to ATTENDANCE_INGEST_BATCH_SIZE events per transaction
+    ATTENDANCE_INGEST_MODE: str = "direct"
+    ATTENDANCE_INGEST_BATCH_SIZE: int = 500
+    ATTENDANCE_INGEST_FLUSH_MS: float = 5.0
+    # Monthly attendance partitions (PostgreSQL): created this many months
+    # ahead; partitions older than the retention are detached, None keeps all
+    ATTENDANCE_PARTITIONS_AHEAD: int = 3
+    ATTENDANCE_PARTITION_RETENTION_MONTHS: Optional[int] = None
+    # Closed attendance older than this many months is moved to Parquet files
+    # under ATTENDANCE_ARCHIVE_DIR by app.jobs.archive_attendance
+    ATTENDANCE_ARCHIVE_DIR: str = "archive/attendance"
+    ATTENDANCE_ARCHIVE_AFTER_MONTHS: int = 12
+    ATTENDANCE_ARCHIVE_BATCH_SIZE: int = 10000
+    # Responses kept for replaying retried check-in/out Idempotency-Keys
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    # Company timesheet rules: overtime beyond the workday, late after start
+    # plus grace; reports span at most TIMESHEET_MAX_DAYS
+    TIMESHEET_WORKDAY_HOURS: float = 8.0
+    TIMESHEET_WORKDAY_START: time = time(9, 0)
+    TIMESHEET_LATE_GRACE_MINUTES: int = 5
+    TIMESHEET_MAX_DAYS: int = 62
+    # Days and late arrivals are judged on wall-clock time in this zone, not
+    # the database session's TimeZone (SQLite test databases are UTC only)
+    TIMESHEET_TIMEZONE: str = "UTC"
+    GEOFENCE_AUDIT_CHUNK_SIZE: int = 10000
+    GEOFENCE_AUDIT_MAX_VIOLATIONS: int = 1000
+
+    # Reject check-in/out outside every site of companies that define sites
+    GEOFENCE_ENFORCED: bool = True
+    SITE_INDEX_CACHE_SIZE: int = 1000
+    SITE_INDEX_TTL_SECONDS: float = 3600.0
+
+    # Rotating site check-in QR codes
+    QR_ROTATION_SECONDS: int = 60
+    QR_BOX_SIZE: int = 10
+    QR_PRERENDER_ENABLED: bool = True
+
+    # Prometheus text metrics served at /metrics
+    METRICS_ENABLED: bool = True
+
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    # Companies, their employees and list pages; writes invalidate precisely,
+    # the TTL only bounds staleness from missed cross-worker notifications
+    COMPANY_CACHE_SIZE: int = 1000
+    COMPANY_CACHE_TTL_SECONDS: float = 3600.0
+    # "local" for a single worker, "postgres" to fan out via LISTEN/NOTIFY
+    CACHE_INVALIDATION_BACKEND: str = "local"
+    # Backoff bounds for re-establishing a lost LISTEN connection
+    CACHE_INVALIDATION_RECONNECT_MIN_SECONDS: float = 0.5
+    CACHE_INVALIDATION_RECONNECT_MAX_SECONDS: float = 30.0
+
     class Config:
         case_sensitive = True
         env_file = ".env"
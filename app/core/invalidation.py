@@ -0,0 +1,157 @@
+# app/core/invalidation.py
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Callable, DefaultDict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Subscriber = Callable[[str], None]
+ResetSubscriber = Callable[[], None]
+
+
+class LocalInvalidationChannel:
+    """
+    In-process invalidation channel. Publishing a (topic, key) pair calls
+    every subscriber of that topic in this worker only; used for single
+    worker deployments and tests.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: DefaultDict[str, List[Subscriber]] = defaultdict(list)
+        self._reset_subscribers: List[ResetSubscriber] = []
+
+    def subscribe(self, topic: str, callback: Subscriber) -> None:
+        self._subscribers[topic].append(callback)
+
+    def subscribe_reset(self, callback: ResetSubscriber) -> None:
+        """`callback` drops everything the subscriber caches in this worker"""
+        self._reset_subscribers.append(callback)
+
+    def reset(self) -> None:
+        """Called when notifications may have been missed"""
+        for callback in self._reset_subscribers:
+            try:
+                callback()
+            except Exception:
+                logger.exception("Invalidation reset subscriber failed")
+
+    def dispatch(self, topic: str, key: str) -> None:
+        for callback in self._subscribers.get(topic, []):
+            try:
+                callback(key)
+            except Exception:
+                logger.exception(
+                    "Invalidation subscriber failed for %s:%s", topic, key
+                )
+
+    async def publish(self, topic: str, key: object) -> None:
+        self.dispatch(topic, str(key))
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class PostgresInvalidationChannel(LocalInvalidationChannel):
+    """
+    Cross-worker invalidation over PostgreSQL LISTEN/NOTIFY. Local
+    subscribers are called immediately on publish and every other worker is
+    notified through a single dedicated asyncpg connection. If that
+    connection drops it is re-established with exponential backoff, and every
+    local cache is flushed once listening again, since notifications sent in
+    between were lost.
+    """
+
+    def __init__(self, dsn: str, channel: str = "workcheck_invalidation") -> None:
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self._conn = None
+        self._lock = asyncio.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        if conn.get_server_pid() == pid:
+            return  # already dispatched locally by publish()
+        topic, _, key = payload.partition(":")
+        self.dispatch(topic, key)
+
+    def _on_terminate(self, conn) -> None:
+        if conn is not self._conn or self._stopping:
+            return
+        logger.warning("Invalidation listener connection lost; reconnecting")
+        self._conn = None
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        conn = await asyncpg.connect(self.dsn)
+        conn.add_termination_listener(self._on_terminate)
+        await conn.add_listener(self.channel, self._on_notify)
+        self._conn = conn
+
+    async def _reconnect(self) -> None:
+        delay = settings.CACHE_INVALIDATION_RECONNECT_MIN_SECONDS
+        while not self._stopping:
+            await asyncio.sleep(delay)
+            try:
+                await self._connect()
+            except Exception:
+                logger.warning(
+                    "Invalidation listener reconnect failed; retrying in %.1fs",
+                    delay,
+                    exc_info=True,
+                )
+                delay = min(
+                    delay * 2, settings.CACHE_INVALIDATION_RECONNECT_MAX_SECONDS
+                )
+                continue
+            # Listening again: drop whatever may have been invalidated
+            # while the connection was down
+            self.reset()
+            logger.info("Invalidation listener reconnected")
+            return
+
+    async def start(self) -> None:
+        self._stopping = False
+        await self._connect()
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            try:
+                await self._reconnect_task
+            except asyncio.CancelledError:
+                pass
+            self._reconnect_task = None
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    async def publish(self, topic: str, key: object) -> None:
+        self.dispatch(topic, str(key))
+        if self._conn is None:
+            return
+        async with self._lock:
+            await self._conn.execute(
+                "SELECT pg_notify($1, $2)", self.channel, f"{topic}:{key}"
+            )
+
+
+def _create_channel() -> LocalInvalidationChannel:
+    if settings.CACHE_INVALIDATION_BACKEND == "postgres":
+        dsn = str(settings.SQLALCHEMY_DATABASE_URI).replace("+asyncpg", "", 1)
+        return PostgresInvalidationChannel(dsn)
+    return LocalInvalidationChannel()
+
+
+invalidation_channel = _create_channel()
@@ -0,0 +1,213 @@
+# app/core/metrics.py
+"""
+In-process Prometheus metrics: request latency per route template and
+status code, plus SQL statement counts and database time per request.
+"""
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+Labels = Tuple[str, ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram; buckets are cumulated only when rendered"""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float],
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def clear(self) -> None:
+        self._series.clear()
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, series in sorted(self._series.items()):
+            base = ",".join(
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.label_names, labels)
+            )
+            prefix = f"{base}," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}'
+                )
+            cumulative += series[-2]
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_LABELS = ("method", "route", "status")
+
+request_duration = Histogram(
+    "workcheck_http_request_duration_seconds",
+    "HTTP request latency by route template and status code.",
+    REQUEST_LABELS,
+    LATENCY_BUCKETS,
+)
+request_db_statements = Histogram(
+    "workcheck_http_request_db_statements",
+    "SQL statements executed per HTTP request.",
+    REQUEST_LABELS,
+    QUERY_COUNT_BUCKETS,
+)
+request_db_duration = Histogram(
+    "workcheck_http_request_db_duration_seconds",
+    "Time spent executing SQL per HTTP request.",
+    REQUEST_LABELS,
+    LATENCY_BUCKETS,
+)
+REGISTRY = (request_duration, request_db_statements, request_db_duration)
+
+
+class QueryStats:
+    __slots__ = ("statements", "seconds")
+
+    def __init__(self) -> None:
+        self.statements = 0
+        self.seconds = 0.0
+
+
+# Set by the middleware for each request, read by the engine event hooks
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += time.perf_counter() - started
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context) -> None:
+    # after_cursor_execute does not fire for failed statements
+    if context.connection is not None:
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def _full_template(route: Any, path: str) -> str:
+    """
+    The route's path_format ("/users/{id}", without convertors) behind the
+    prefix it was reached through. Routes of mounted apps, and of included
+    routers in newer FastAPI, only know their own part of the path; the
+    prefix is the part of the request path their pattern does not cover.
+    """
+    template = getattr(route, "path_format", None)
+    if template is None:
+        return "unmatched"
+    pattern = route.path_regex
+    for index, char in enumerate(path):
+        if char == "/" and pattern.match(path[index:]):
+            return path[:index] + template
+    return template
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware, so streaming responses are
+    not buffered). Requests that match no route share one "unmatched" label
+    so scanners cannot blow up the series count.
+    """
+
+    def __init__(self, app: Callable, exclude_paths: Sequence[str] = ()) -> None:
+        self.app = app
+        self.exclude_paths = frozenset(exclude_paths)
+        self._endpoint_paths: Dict[Any, str] = {}
+
+    def _route_template(self, scope: Dict[str, Any]) -> str:
+        route = scope.get("route")
+        if route is not None:
+            return _full_template(route, scope["path"])
+        # Older Starlette only records the endpoint on the scope
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if not self._endpoint_paths:
+            for candidate in scope["app"].routes:
+                if hasattr(candidate, "endpoint"):
+                    self._endpoint_paths[candidate.endpoint] = getattr(
+                        candidate, "path_format", candidate.path
+                    )
+        return self._endpoint_paths.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_query_stats.reset(token)
+            labels = (scope["method"], self._route_template(scope), str(status_code))
+            request_duration.observe(labels, elapsed)
+            request_db_statements.observe(labels, stats.statements)
+            request_db_duration.observe(labels, stats.seconds)
@@ -1,6 +1,9 @@
 # app/core/security.py
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Optional, Union
+from typing import Any, Callable, Dict, Optional, TypeVar, Union
 
 from jose import jwt
 from passlib.context import CryptContext
@@ -9,6 +12,8 @@ from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -18,6 +23,64 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _create_hash_executor() -> Executor:
+    # bcrypt releases the GIL, so threads are usually enough; processes
+    # isolate the CPU cost entirely at the price of extra memory per worker
+    if settings.PASSWORD_HASH_EXECUTOR == "process":
+        return ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+    return ThreadPoolExecutor(
+        max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="pwd-hash"
+    )
+
+
+_hash_executor = _create_hash_executor()
+_hash_semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_CONCURRENCY)
+_hash_stats: Dict[str, float] = {
+    "waiting": 0,
+    "max_waiting": 0,
+    "running": 0,
+    "completed": 0,
+    "wait_seconds_total": 0.0,
+    "run_seconds_total": 0.0,
+}
+
+
+async def _run_hash_task(func: Callable[..., T], *args: Any) -> T:
+    queued_at = time.perf_counter()
+    _hash_stats["waiting"] += 1
+    _hash_stats["max_waiting"] = max(_hash_stats["max_waiting"], _hash_stats["waiting"])
+    try:
+        await _hash_semaphore.acquire()
+    finally:
+        _hash_stats["waiting"] -= 1
+    started_at = time.perf_counter()
+    _hash_stats["wait_seconds_total"] += started_at - queued_at
+    _hash_stats["running"] += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_hash_executor, func, *args)
+    finally:
+        _hash_stats["running"] -= 1
+        _hash_stats["completed"] += 1
+        _hash_stats["run_seconds_total"] += time.perf_counter() - started_at
+        _hash_semaphore.release()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password without blocking the event loop"""
+    return await _run_hash_task(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash without blocking the event loop"""
+    return await _run_hash_task(get_password_hash, password)
+
+
+def password_hash_stats() -> Dict[str, float]:
+    """Queue depth and timing counters for the password hashing pool"""
+    return dict(_hash_stats, max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY)
+
+
 def create_access_token(
     subject: Union[str, Any], expires_delta: Optional[timedelta] = None
 ) -> str:
@@ -0,0 +1,76 @@
+# app/db/pool.py
+import statistics
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolStats:
+    """Checkout counters shared by a pool and the pools it is recreated as"""
+
+    def __init__(self, window: int = 1000) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.recent_waits: Deque[float] = deque(maxlen=window)
+
+    def record(self, waited: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.recent_waits.append(waited)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that times every checkout, including waiting for a free slot
+    and opening or pre-pinging the connection, and counts checkout timeouts.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        self.stats.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def snapshot(self) -> Dict[str, Any]:
+        stats = self.stats
+        recent = sorted(stats.recent_waits)
+        if len(recent) > 1:
+            quantiles = statistics.quantiles(recent, n=100, method="inclusive")
+            p50, p95, p99 = quantiles[49], quantiles[94], quantiles[98]
+        else:
+            p50 = p95 = p99 = recent[0] if recent else 0.0
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout": self.timeout(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(0, self.overflow()),
+            "checkouts": stats.checkouts,
+            "timeouts": stats.timeouts,
+            "wait_seconds_total": stats.wait_seconds_total,
+            "wait_seconds_max": stats.wait_seconds_max,
+            "wait_seconds_avg": (
+                stats.wait_seconds_total / stats.checkouts if stats.checkouts else 0.0
+            ),
+            "recent_wait_seconds": {"p50": p50, "p95": p95, "p99": p99},
+        }
@@ -1,14 +1,49 @@
 # app/db/session.py
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Callable, Dict
 
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.pool import InstrumentedQueuePool
 
-engine = create_async_engine(settings.SQLALCHEMY_DATABASE_URI, echo=True)
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Pool and driver arguments from settings; pool tuning is PostgreSQL-only"""
+    options: Dict[str, Any] = {"echo": settings.DB_ECHO}
+    backend = make_url(url)
+    if backend.get_backend_name() != "postgresql":
+        return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if backend.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE
+        }
+    return options
+
+
+engine = create_async_engine(
+    settings.SQLALCHEMY_DATABASE_URI,
+    **engine_options(settings.SQLALCHEMY_DATABASE_URI),
+)
 AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+
+def pool_status() -> Dict[str, Any]:
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.snapshot()
+    return {"pool": type(pool).__name__, "status": pool.status()}
+
+
 async def get_db() -> AsyncGenerator:
     async with AsyncSessionLocal() as session:
         try:
@@ -16,3 +51,7 @@ async def get_db() -> AsyncGenerator:
         finally:
             await session.close()
 
+
+def get_session_factory() -> Callable[[], AsyncSession]:
+    """For responses that outlive the request and must open their own session"""
+    return AsyncSessionLocal
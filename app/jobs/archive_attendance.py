@@ -0,0 +1,46 @@
+# app/jobs/archive_attendance.py
+"""
+Move closed attendance older than ATTENDANCE_ARCHIVE_AFTER_MONTHS to Parquet
+files under ATTENDANCE_ARCHIVE_DIR and delete it from the database. Run
+monthly (e.g. from cron); requires pyarrow.
+
+    python -m app.jobs.archive_attendance
+    python -m app.jobs.archive_attendance --after-months 6
+"""
+import argparse
+import asyncio
+import json
+import logging
+from datetime import date
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.attendance_archive import archive_attendance
+
+logger = logging.getLogger(__name__)
+
+
+async def run(after_months: int) -> dict:
+    async with AsyncSessionLocal() as db:
+        report = await archive_attendance(
+            db,
+            date.today(),
+            after_months,
+            batch_size=settings.ATTENDANCE_ARCHIVE_BATCH_SIZE,
+        )
+    logger.info(
+        "Archived %s attendance records from %s",
+        report["archived"],
+        report["months"],
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--after-months", type=int, default=settings.ATTENDANCE_ARCHIVE_AFTER_MONTHS
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(asyncio.run(run(args.after_months))))
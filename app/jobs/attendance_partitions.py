@@ -0,0 +1,66 @@
+# app/jobs/attendance_partitions.py
+"""
+Create upcoming monthly attendance_records partitions and detach expired
+ones. Run daily (e.g. from cron) so next month's partition always exists
+before the first check-in lands in it.
+
+    python -m app.jobs.attendance_partitions
+    python -m app.jobs.attendance_partitions --retention-months 24 --drop
+"""
+import argparse
+import asyncio
+import json
+import logging
+from datetime import date
+from typing import Optional
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.services.attendance_partitions import maintain_partitions
+
+logger = logging.getLogger(__name__)
+
+
+async def run(
+    months_ahead: int, retention_months: Optional[int], drop: bool
+) -> dict:
+    if engine.dialect.name != "postgresql":
+        logger.info("attendance_records is only partitioned on PostgreSQL")
+        return {}
+    async with AsyncSessionLocal() as db:
+        report = await maintain_partitions(
+            db,
+            date.today(),
+            months_ahead,
+            retention_months=retention_months,
+            drop_detached=drop,
+        )
+    logger.info(
+        "Created %s, detached %s attendance partitions",
+        report["created"],
+        report["detached"],
+    )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--months-ahead", type=int, default=settings.ATTENDANCE_PARTITIONS_AHEAD
+    )
+    parser.add_argument(
+        "--retention-months",
+        type=int,
+        default=settings.ATTENDANCE_PARTITION_RETENTION_MONTHS,
+        help="detach partitions older than this many months",
+    )
+    parser.add_argument(
+        "--drop", action="store_true", help="drop detached partitions"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(
+        json.dumps(
+            asyncio.run(run(args.months_ahead, args.retention_months, args.drop))
+        )
+    )
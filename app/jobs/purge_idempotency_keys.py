@@ -0,0 +1,26 @@
+# app/jobs/purge_idempotency_keys.py
+"""
+Delete stored Idempotency-Key responses past their expiry. Safe to run on
+any schedule; expired keys are already ignored by lookups.
+
+    python -m app.jobs.purge_idempotency_keys
+"""
+import asyncio
+import logging
+
+from app.db.session import AsyncSessionLocal
+from app.services.idempotency import purge_expired_idempotency_keys
+
+logger = logging.getLogger(__name__)
+
+
+async def purge() -> int:
+    async with AsyncSessionLocal() as db:
+        deleted = await purge_expired_idempotency_keys(db)
+    logger.info("Purged %s expired idempotency keys", deleted)
+    return deleted
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(asyncio.run(purge()))
@@ -0,0 +1,43 @@
+# app/jobs/rebuild_attendance_summary.py
+"""
+Recompute daily_attendance_summary for a range of days, one month per
+transaction.
+
+    python -m app.jobs.rebuild_attendance_summary 2024-01-01 2024-12-31
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date, timedelta
+
+from app.db.session import AsyncSessionLocal
+from app.services.attendance_summary import rebuild_daily_summary
+
+logger = logging.getLogger(__name__)
+
+
+def _month_end(day: date) -> date:
+    next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+async def rebuild(start_day: date, end_day: date) -> int:
+    total = 0
+    chunk_start = start_day
+    while chunk_start <= end_day:
+        chunk_end = min(_month_end(chunk_start), end_day)
+        async with AsyncSessionLocal() as db:
+            rows = await rebuild_daily_summary(db, chunk_start, chunk_end)
+        logger.info("Rebuilt %s to %s: %s rows", chunk_start, chunk_end, rows)
+        total += rows
+        chunk_start = chunk_end + timedelta(days=1)
+    return total
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("start", type=date.fromisoformat)
+    parser.add_argument("end", type=date.fromisoformat)
+    args = parser.parse_args()
+    print(asyncio.run(rebuild(args.start, args.end)))
@@ -1,11 +1,23 @@
 # app/main.py
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from app.api.v1.endpoints import auth, attendance, companies, users
+from app.api.v1.endpoints import (
+    attendance,
+    auth,
+    companies,
+    internal,
+    nfc_tags,
+    users,
+)
 from app.core.config import settings
+from app.core.invalidation import invalidation_channel
+from app.core.metrics import MetricsMiddleware, render_metrics
 
 from app.db.init_db import create_first_superuser
+from app.services.attendance_ingest import attendance_ingestor
+from app.services.qr import site_qr_renderer
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -22,19 +34,44 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Link", "X-Next-Cursor"],
     )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, exclude_paths=["/metrics"])
+
 # Include routers
 app.include_router(auth.router, prefix=settings.API_V1_STR, tags=["authentication"])
 app.include_router(users.router, prefix=settings.API_V1_STR, tags=["users"])
 app.include_router(companies.router, prefix=settings.API_V1_STR, tags=["companies"])
 app.include_router(attendance.router, prefix=settings.API_V1_STR, tags=["attendance"])
+app.include_router(nfc_tags.router, prefix=settings.API_V1_STR, tags=["nfc"])
+app.include_router(internal.router, prefix=settings.API_V1_STR, tags=["internal"])
 
 @app.on_event("startup")
 async def startup_event():
+    await invalidation_channel.start()
     await create_first_superuser()
+    if settings.QR_PRERENDER_ENABLED:
+        site_qr_renderer.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await site_qr_renderer.stop()
+    await attendance_ingestor.stop()
+    await invalidation_channel.stop()
 
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to WorkCheck Attendance System"}
+
+
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    def read_metrics():
+        return PlainTextResponse(
+            render_metrics(), media_type="text/plain; version=0.0.4"
+        )
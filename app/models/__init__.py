@@ -1,5 +1,10 @@
 # app/models/__init__.py
 from app.models.user import User
 from app.models.company import Company
+from app.models.company_site import CompanySite
 from app.models.attendance import Attendance
+from app.models.attendance_summary import DailyAttendanceSummary
+from app.models.nfc_tag import NFCTag
 
+from app.models.idempotency_key import IdempotencyKey
+from app.models.timesheet_snapshot import TimesheetSnapshot
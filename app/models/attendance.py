@@ -1,5 +1,14 @@
 # app/models/attendance.py
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Float
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Integer,
+    String,
+    DateTime,
+    ForeignKey,
+    Float,
+    Index,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -11,12 +20,13 @@ class Attendance(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    check_in = Column(DateTime(timezone=True))
+    # Partition key on PostgreSQL (monthly ranges, see migration 0009)
+    check_in = Column(DateTime(timezone=True), nullable=False, index=True)
     check_out = Column(DateTime(timezone=True), nullable=True)
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
     check_in_method = Column(String)  # "QR", "NFC", "MANUAL"
-    check_out_method = Column(String, nullable=True)  # "QR", "NFC", "MANUAL"
+    check_out_method = Column(String, nullable=True)  # "QR", "NFC", "MANUAL", "AUTO"
     notes = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -24,3 +34,23 @@ class Attendance(Base):
     # Relationships
     user = relationship("User", back_populates="attendance_records")
 
+    # On PostgreSQL the table key is (id, check_in); identifying rows by both
+    # lets UPDATE/DELETE by primary key prune to a single partition
+    __mapper_args__ = {"primary_key": [id, check_in]}
+
+    __table_args__ = (
+        Index("ix_attendance_records_user_id_check_in", user_id, check_in.desc()),
+        # At most one open session per user; check-in relies on this. On
+        # PostgreSQL it exists per partition instead (unique indexes on a
+        # partitioned table must include the partition key), created by
+        # migration 0009 and attendance_partitions; alembic/env.py leaves
+        # SQLite-only indexes out of autogenerate there
+        Index(
+            "uq_attendance_records_open_session",
+            user_id,
+            unique=True,
+            sqlite_where=check_out.is_(None),
+            info={"dialects": ("sqlite",)},
+        ).ddl_if(dialect="sqlite"),
+    )
+
@@ -0,0 +1,27 @@
+# app/models/attendance_summary.py
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Index, Integer
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class DailyAttendanceSummary(Base):
+    """Per user and day rollup of completed attendance sessions"""
+
+    __tablename__ = "daily_attendance_summary"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=True)
+    total_seconds = Column(Integer, default=0)
+    first_check_in = Column(DateTime(timezone=True))
+    last_check_out = Column(DateTime(timezone=True))
+    session_count = Column(Integer, default=0)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        Index("ix_daily_attendance_summary_company_id_day", company_id, day),
+        Index("ix_daily_attendance_summary_day", day),
+    )
@@ -19,3 +19,4 @@ class Company(Base):
     
     # Relationships
     employees = relationship("User", back_populates="company")
+    sites = relationship("CompanySite", back_populates="company")
@@ -0,0 +1,22 @@
+# app/models/nfc_tag.py
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class NFCTag(Base):
+    __tablename__ = "nfc_tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tag_id = Column(String, unique=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    site_id = Column(Integer, ForeignKey("company_sites.id"), nullable=True)
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    user = relationship("User")
+    site = relationship("CompanySite")
@@ -0,0 +1,21 @@
+# app/models/timesheet_snapshot.py
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.db.base_class import Base
+
+
+class TimesheetSnapshot(Base):
+    """Rendered timesheet of a finished period, kept as an immutable snapshot"""
+
+    __tablename__ = "timesheet_snapshots"
+
+    company_id = Column(
+        Integer, ForeignKey("companies.id", ondelete="CASCADE"), primary_key=True
+    )
+    start_day = Column(Date, primary_key=True)
+    end_day = Column(Date, primary_key=True)
+    # Workday rules the report was computed with; changing them is a new key
+    rules = Column(String(64), primary_key=True)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
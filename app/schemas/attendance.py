@@ -1,7 +1,7 @@
 # app/schemas/attendance.py
-from typing import Optional
-from datetime import datetime
-from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date, datetime, time
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # Shared properties
@@ -22,6 +22,8 @@ class AttendanceCheckIn(BaseModel):
     longitude: Optional[float] = None
     check_in_method: str = Field(..., pattern="^(QR|NFC|MANUAL)$")
     notes: Optional[str] = None
+    qr_code: Optional[str] = None  # rotating site code scanned by the client
+    nfc_tag_id: Optional[str] = None  # registered NFC tag scanned by the client
 
 
 # Properties to receive via API on check-out
@@ -30,6 +32,8 @@ class AttendanceCheckOut(BaseModel):
     longitude: Optional[float] = None
     check_out_method: str = Field(..., pattern="^(QR|NFC|MANUAL)$")
     notes: Optional[str] = None
+    qr_code: Optional[str] = None  # rotating site code scanned by the client
+    nfc_tag_id: Optional[str] = None  # registered NFC tag scanned by the client
 
 
 # Properties to receive via API on creation (admin)
@@ -50,10 +54,87 @@ class AttendanceInDBBase(AttendanceBase):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Additional properties to return via API
 class Attendance(AttendanceInDBBase):
-    pass
\ No newline at end of file
+    pass
+
+
+# Outcome of a bulk import (admin)
+class AttendanceImportError(BaseModel):
+    line: int
+    error: str
+
+
+class AttendanceImportResult(BaseModel):
+    total_rows: int = 0
+    imported: int = 0
+    failed: int = 0
+    errors: List[AttendanceImportError] = []
+
+
+# Totals per user and period, served from the daily rollup
+class AttendanceSummary(BaseModel):
+    user_id: int
+    period_start: date
+    total_seconds: int
+    session_count: int
+    days_present: int
+
+
+class AttendanceSummaryRebuild(BaseModel):
+    rows: int
+
+
+# Company timesheet for a period, computed in SQL
+class TimesheetEntry(BaseModel):
+    user_id: int
+    email: Optional[str] = None
+    full_name: Optional[str] = None
+    total_seconds: int
+    overtime_seconds: int
+    days_present: int
+    session_count: int
+    late_arrivals: int
+    missing_check_outs: int
+
+
+class Timesheet(BaseModel):
+    company_id: int
+    start_date: date
+    end_date: date
+    workday_hours: float
+    workday_start: time
+    late_grace_minutes: int
+    finished: bool
+    generated_at: datetime
+    entries: List[TimesheetEntry]
+
+
+# Compliance audit of stored coordinates against a geofence (admin)
+class GeofenceAuditRequest(BaseModel):
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    radius_meters: float = 100
+    start_date: datetime
+    end_date: datetime
+    user_id: Optional[int] = None
+    company_id: Optional[int] = None
+
+
+class GeofenceViolation(BaseModel):
+    id: int
+    user_id: Optional[int] = None
+    check_in: Optional[datetime] = None
+    latitude: float
+    longitude: float
+    distance_meters: float
+
+
+class GeofenceAuditResult(BaseModel):
+    checked: int = 0
+    flagged: int = 0
+    missing_location: int = 0
+    violations: List[GeofenceViolation] = []
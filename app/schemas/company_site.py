@@ -0,0 +1,40 @@
+# app/schemas/company_site.py
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Shared properties
+class CompanySiteBase(BaseModel):
+    name: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    radius_meters: Optional[float] = Field(100, gt=0)
+    is_active: Optional[bool] = True
+
+
+# Properties to receive via API on creation
+class CompanySiteCreate(CompanySiteBase):
+    name: str
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+
+
+# Properties to receive via API on update
+class CompanySiteUpdate(CompanySiteBase):
+    pass
+
+
+# Additional properties stored in DB
+class CompanySiteInDBBase(CompanySiteBase):
+    id: Optional[int] = None
+    company_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Additional properties to return via API
+class CompanySite(CompanySiteInDBBase):
+    pass
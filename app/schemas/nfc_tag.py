@@ -0,0 +1,46 @@
+# app/schemas/nfc_tag.py
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Shared properties
+class NFCTagBase(BaseModel):
+    tag_id: Optional[str] = None
+    user_id: Optional[int] = None
+    site_id: Optional[int] = None
+    is_active: Optional[bool] = True
+
+
+# Properties to receive via API on registration
+class NFCTagCreate(NFCTagBase):
+    tag_id: str = Field(..., min_length=1)
+
+
+# Properties to receive via API for bulk operations
+class NFCTagBulkCreate(BaseModel):
+    tags: List[NFCTagCreate]
+
+
+class NFCTagBulkDeactivate(BaseModel):
+    tag_ids: List[str]
+
+
+class NFCTagBulkResult(BaseModel):
+    created: int = 0
+    updated: int = 0
+    deactivated: int = 0
+
+
+# Additional properties stored in DB
+class NFCTagInDBBase(NFCTagBase):
+    id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Additional properties to return via API
+class NFCTag(NFCTagInDBBase):
+    pass
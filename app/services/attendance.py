@@ -1,41 +1,122 @@
 # app/services/attendance.py
-from typing import Any, Dict, Optional, List, Union
-from datetime import datetime, date
+from typing import Any, Dict, Optional, List, Sequence, Tuple, Union
+from datetime import datetime, date, time
 
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, insert, update, and_, func, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from sqlalchemy.sql import Select
 
 from app.models.attendance import Attendance
 from app.schemas.attendance import AttendanceCreate, AttendanceUpdate
+from app.services.attendance_archive import (
+    get_archived_attendance,
+    merge_archived,
+)
+from app.services.attendance_archive_manifest import (
+    archive_revision,
+    reaches_archive,
+)
+from app.services.attendance_partitions import add_months
+from app.services.attendance_summary import (
+    refresh_daily_summaries,
+    refresh_daily_summary,
+)
+from app.utils.pagination import decode_cursor
+
+ATTENDANCE_COLUMNS = list(Attendance.__table__.columns)
+
+
+def _paginate(
+    query: Select, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> Select:
+    """
+    Order by (check_in, id) descending and page either by keyset cursor or,
+    for backward compatibility, by offset. A cursor takes precedence over skip.
+    """
+    if cursor:
+        cursor_check_in, cursor_id = decode_cursor(cursor)
+        query = query.filter(
+            tuple_(Attendance.check_in, Attendance.id)
+            < tuple_(cursor_check_in, cursor_id),
+            # Redundant, but row comparisons do not prune partitions
+            Attendance.check_in <= cursor_check_in,
+        )
+    elif skip:
+        query = query.offset(skip)
+    return query.order_by(Attendance.check_in.desc(), Attendance.id.desc()).limit(
+        limit
+    )
+
+
+async def _fetch_list(
+    db: AsyncSession,
+    query: Select,
+    as_rows: bool,
+    fields: Optional[Sequence[str]] = None,
+) -> List[Any]:
+    """
+    ORM objects, or plain row tuples for the fast list serialization path.
+    `fields` restricts the loaded columns; rows always carry the keyset
+    columns (check_in, id) so callers can build the next cursor.
+    """
+    if as_rows:
+        columns = ATTENDANCE_COLUMNS
+        if fields is not None:
+            keys = set(fields) | {"check_in", "id"}
+            columns = [column for column in columns if column.key in keys]
+        result = await db.execute(query.with_only_columns(*columns))
+        return result.all()
+    if fields is not None:
+        query = query.options(
+            load_only(*(getattr(Attendance, field) for field in fields))
+        )
+    result = await db.execute(query)
+    return result.scalars().all()
 
 
 async def get_attendance(
-    db: AsyncSession, id: Optional[int] = None, skip: int = 0, limit: int = 100
+    db: AsyncSession,
+    id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    as_rows: bool = False,
+    fields: Optional[Sequence[str]] = None,
 ) -> Union[Optional[Attendance], List[Attendance]]:
     if id:
         result = await db.execute(select(Attendance).filter(Attendance.id == id))
         return result.scalars().first()
     else:
-        result = await db.execute(
-            select(Attendance)
-            .order_by(Attendance.check_in.desc())
-            .offset(skip)
-            .limit(limit)
+        return await _fetch_list(
+            db,
+            _paginate(select(Attendance), skip=skip, limit=limit, cursor=cursor),
+            as_rows,
+            fields,
         )
-        return result.scalars().all()
 
 
 async def get_attendance_by_user(
-    db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100
+    db: AsyncSession,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    as_rows: bool = False,
+    fields: Optional[Sequence[str]] = None,
 ) -> List[Attendance]:
-    result = await db.execute(
-        select(Attendance)
-        .filter(Attendance.user_id == user_id)
-        .order_by(Attendance.check_in.desc())
-        .offset(skip)
-        .limit(limit)
+    return await _fetch_list(
+        db,
+        _paginate(
+            select(Attendance).filter(Attendance.user_id == user_id),
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+        ),
+        as_rows,
+        fields,
     )
-    return result.scalars().all()
 
 
 async def get_attendance_by_date_range(
@@ -45,6 +126,9 @@ async def get_attendance_by_date_range(
     user_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    as_rows: bool = False,
+    fields: Optional[Sequence[str]] = None,
 ) -> List[Attendance]:
     query = select(Attendance).filter(
         and_(Attendance.check_in >= start_date, Attendance.check_in <= end_date)
@@ -53,19 +137,66 @@ async def get_attendance_by_date_range(
     if user_id:
         query = query.filter(Attendance.user_id == user_id)
 
-    query = query.order_by(Attendance.check_in.desc()).offset(skip).limit(limit)
-    result = await db.execute(query)
-    return result.scalars().all()
+    if not reaches_archive(start_date):
+        query = _paginate(query, skip=skip, limit=limit, cursor=cursor)
+        return await _fetch_list(db, query, as_rows, fields)
+
+    # The range reaches archived months: page the union in Python from the
+    # first offset + limit records of each side. A cursor already positions
+    # both sides, so skip only applies without one (as in _paginate)
+    offset = 0 if cursor else skip
+    hot = await _fetch_list(
+        db, _paginate(query, limit=offset + limit, cursor=cursor), as_rows, fields
+    )
+    cold = await get_archived_attendance(
+        start_date, end_date, user_id=user_id, cursor=cursor, limit=offset + limit
+    )
+    return merge_archived(hot, cold)[offset : offset + limit]
 
 
-async def get_user_current_status(
-    db: AsyncSession, user_id: int
-) -> Optional[Attendance]:
-    """Get user's most recent attendance record for today"""
+async def get_attendance_page_version(
+    db: AsyncSession,
+    user_id: Optional[int] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[int, Optional[datetime], Optional[int], Optional[int]]:
+    """
+    (row count, latest change, sum of ids, archive revision) of the page the
+    list getters would return for the same arguments, read without loading
+    the rows. Any insert, update or delete within the page changes at least
+    one of them; the archive revision (None unless the range reaches
+    archived months) covers records served from the archive.
+    """
+    query = select(Attendance)
+    if start_date and end_date:
+        query = query.filter(
+            and_(Attendance.check_in >= start_date, Attendance.check_in <= end_date)
+        )
+    if user_id:
+        query = query.filter(Attendance.user_id == user_id)
+    page = (
+        _paginate(query, skip=skip, limit=limit, cursor=cursor)
+        .with_only_columns(Attendance.id, Attendance.created_at, Attendance.updated_at)
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            func.count(),
+            func.max(func.coalesce(page.c.updated_at, page.c.created_at)),
+            func.sum(page.c.id),
+        ).select_from(page)
+    )
+    archive = archive_revision(start_date) if start_date and end_date else None
+    return (*result.one(), archive)
+
+
+def _current_status_query(user_id: int) -> Select:
     today_start = datetime.combine(date.today(), datetime.min.time())
     today_end = datetime.combine(date.today(), datetime.max.time())
-
-    result = await db.execute(
+    return (
         select(Attendance)
         .filter(
             and_(
@@ -77,9 +208,34 @@ async def get_user_current_status(
         .order_by(Attendance.check_in.desc())
         .limit(1)
     )
+
+
+async def get_user_current_status(
+    db: AsyncSession, user_id: int
+) -> Optional[Attendance]:
+    """Get user's most recent attendance record for today"""
+    result = await db.execute(_current_status_query(user_id))
     return result.scalars().first()
 
 
+async def get_user_current_status_version(
+    db: AsyncSession, user_id: int
+) -> Optional[Tuple[Any, ...]]:
+    """
+    (id, created_at, updated_at, check_out) of the record
+    get_user_current_status would return, or None
+    """
+    result = await db.execute(
+        _current_status_query(user_id).with_only_columns(
+            Attendance.id,
+            Attendance.created_at,
+            Attendance.updated_at,
+            Attendance.check_out,
+        )
+    )
+    return result.first()
+
+
 async def create_attendance(db: AsyncSession, obj_in: AttendanceCreate) -> Attendance:
     db_obj = Attendance(
         user_id=obj_in.user_id,
@@ -92,6 +248,9 @@ async def create_attendance(db: AsyncSession, obj_in: AttendanceCreate) -> Atten
         notes=obj_in.notes,
     )
     db.add(db_obj)
+    await db.flush()
+    if db_obj.check_out is not None:
+        await refresh_daily_summary(db, db_obj.user_id, db_obj.check_in.date())
     await db.commit()
     await db.refresh(db_obj)
     return db_obj
@@ -105,18 +264,92 @@ async def update_attendance(
     if isinstance(obj_in, dict):
         update_data = obj_in
     else:
-        update_data = obj_in.dict(exclude_unset=True)
+        update_data = obj_in.model_dump(exclude_unset=True)
 
+    summary_keys = [(db_obj.user_id, db_obj.check_in.date())]
     for field in update_data:
         if hasattr(db_obj, field):
             setattr(db_obj, field, update_data[field])
+    summary_keys.append((db_obj.user_id, db_obj.check_in.date()))
 
     db.add(db_obj)
+    await db.flush()
+    await refresh_daily_summaries(db, summary_keys)
     await db.commit()
     await db.refresh(db_obj)
     return db_obj
 
 
+async def _insert_check_in(
+    db: AsyncSession, values: Dict[str, Any]
+) -> Optional[Attendance]:
+    try:
+        result = await db.execute(
+            insert(Attendance).values(**values).returning(Attendance)
+        )
+        attendance = result.scalar_one()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return None
+    return attendance
+
+
+async def close_stale_sessions(db: AsyncSession, user_id: int) -> int:
+    """Auto-close open sessions left over from previous days"""
+    today_start = datetime.combine(date.today(), datetime.min.time())
+    result = await db.execute(
+        update(Attendance)
+        .where(
+            and_(
+                Attendance.user_id == user_id,
+                Attendance.check_out.is_(None),
+                Attendance.check_in < today_start,
+            )
+        )
+        .values(check_out=Attendance.check_in, check_out_method="AUTO")
+        .returning(Attendance.check_in)
+        .execution_options(synchronize_session=False)
+    )
+    closed = result.scalars().all()
+    await refresh_daily_summaries(db, [(user_id, value.date()) for value in closed])
+    await db.commit()
+    return len(closed)
+
+
+async def close_earlier_month_sessions(
+    db: AsyncSession, user_ids: Sequence[int], check_in_time: datetime
+) -> int:
+    """
+    Auto-close the users' sessions left open in the month before
+    `check_in_time`, without committing. Only needed on PostgreSQL, where the
+    open-session index is unique per monthly partition, so such a session
+    would not conflict with the insert; elsewhere the conflict path closes
+    it. Bounded to one partition; older months are closed by the daily
+    partition maintenance job.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return 0
+    month = check_in_time.date().replace(day=1)
+    result = await db.execute(
+        update(Attendance)
+        .where(
+            Attendance.user_id.in_(user_ids),
+            Attendance.check_out.is_(None),
+            Attendance.check_in >= datetime.combine(add_months(month, -1), time.min),
+            Attendance.check_in < datetime.combine(month, time.min),
+        )
+        .values(check_out=Attendance.check_in, check_out_method="AUTO")
+        .returning(Attendance.user_id, Attendance.check_in)
+        .execution_options(synchronize_session=False)
+    )
+    closed = result.all()
+    await refresh_daily_summaries(
+        db, [(user_id, value.date()) for user_id, value in closed]
+    )
+    return len(closed)
+
+
 async def check_in(
     db: AsyncSession,
     user_id: int,
@@ -124,35 +357,41 @@ async def check_in(
     longitude: Optional[float] = None,
     check_in_method: str = "MANUAL",
     notes: Optional[str] = None,
-) -> Attendance:
-    """User check-in"""
-    attendance = Attendance(
+    check_in_time: Optional[datetime] = None,
+) -> Optional[Attendance]:
+    """
+    User check-in as a single INSERT ... RETURNING. The unique index on open
+    sessions makes concurrent check-ins race-free; returns None if the user
+    is already checked in. On PostgreSQL a session from last month, which
+    that index does not cover once partitioned, is closed first.
+    """
+    check_in_time = check_in_time or datetime.now()
+    values = dict(
         user_id=user_id,
-        check_in=datetime.now(),
+        check_in=check_in_time,
         latitude=latitude,
         longitude=longitude,
         check_in_method=check_in_method,
         notes=notes,
     )
-    db.add(attendance)
-    await db.commit()
-    await db.refresh(attendance)
+    await close_earlier_month_sessions(db, [user_id], check_in_time)
+    attendance = await _insert_check_in(db, values)
+    if attendance is None and await close_stale_sessions(db, user_id):
+        # The conflicting session was a forgotten check-out from an earlier day
+        attendance = await _insert_check_in(db, values)
     return attendance
 
 
-async def check_out(
-    db: AsyncSession,
-    attendance_id: int,
+def apply_check_out(
+    attendance: Attendance,
+    check_out_time: datetime,
     latitude: Optional[float] = None,
     longitude: Optional[float] = None,
     check_out_method: str = "MANUAL",
     notes: Optional[str] = None,
-) -> Attendance:
-    """User check-out"""
-    attendance = await get_attendance(db, id=attendance_id)
-
-    # Update with check-out data
-    attendance.check_out = datetime.now()
+) -> None:
+    """Set check-out fields on a loaded record without flushing"""
+    attendance.check_out = check_out_time
     attendance.check_out_method = check_out_method
 
     if latitude is not None:
@@ -166,7 +405,29 @@ async def check_out(
             else f"{attendance.notes}\n\nCheck-out: {notes}"
         )
 
+
+async def check_out(
+    db: AsyncSession,
+    attendance_id: int,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    check_out_method: str = "MANUAL",
+    notes: Optional[str] = None,
+    check_out_time: Optional[datetime] = None,
+) -> Attendance:
+    """User check-out"""
+    attendance = await get_attendance(db, id=attendance_id)
+    apply_check_out(
+        attendance,
+        check_out_time or datetime.now(),
+        latitude=latitude,
+        longitude=longitude,
+        check_out_method=check_out_method,
+        notes=notes,
+    )
     db.add(attendance)
+    await db.flush()
+    await refresh_daily_summary(db, attendance.user_id, attendance.check_in.date())
     await db.commit()
     await db.refresh(attendance)
     return attendance
@@ -0,0 +1,318 @@
+# app/services/attendance_archive.py
+"""
+Cold storage for old attendance. Closed records older than
+ATTENDANCE_ARCHIVE_AFTER_MONTHS are written to zstd-compressed Parquet files,
+one directory per company and month, then deleted from attendance_records:
+
+    <ATTENDANCE_ARCHIVE_DIR>/company_id=12/month=2019-03/attendance.parquet
+
+manifest.json holds the watermark: months before it may have archived rows,
+so date-range reads reaching below it also scan the files. pyarrow is only
+imported when files are actually written or read.
+"""
+import asyncio
+import os
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.etag import as_utc
+from app.models.attendance import Attendance
+from app.models.user import User
+from app.services.attendance_archive_manifest import (
+    archive_root,
+    archive_watermark,
+    read_manifest,
+    write_manifest,
+)
+from app.services.attendance_partitions import (
+    add_months,
+    detach_partition,
+    list_partitions,
+    month_start,
+    partition_name,
+)
+from app.utils.pagination import decode_cursor
+
+ARCHIVE_COLUMNS = list(Attendance.__table__.columns)
+ARCHIVE_FILE = "attendance.parquet"
+DELETE_CHUNK_SIZE = 1000
+
+
+def _month_dir(company_id: Optional[int], month: date) -> Path:
+    company = "none" if company_id is None else company_id
+    return archive_root() / f"company_id={company}" / f"month={month:%Y-%m}"
+
+
+def _arrow_schema():
+    import pyarrow as pa
+
+    types = {
+        int: pa.int64(),
+        float: pa.float64(),
+        str: pa.string(),
+        datetime: pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema(
+        [(column.key, types[column.type.python_type]) for column in ARCHIVE_COLUMNS]
+    )
+
+
+class _MonthWriter:
+    """
+    The month's file of each company, written batch by batch. A month that
+    already has a file (an interrupted run, or sessions closed after the
+    month was archived) is merged by id, so re-archiving rows is idempotent.
+    """
+
+    def __init__(self, month: date):
+        self.month = month
+        self.schema = _arrow_schema()
+        self.files: Dict[Optional[int], Tuple[Path, Any]] = {}
+
+    def write(self, company_id: Optional[int], rows: List[Dict[str, Any]]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if company_id not in self.files:
+            directory = _month_dir(company_id, self.month)
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / ARCHIVE_FILE
+            writer = pq.ParquetWriter(
+                f"{path}.new", self.schema, compression="zstd"
+            )
+            self.files[company_id] = (path, writer)
+        self.files[company_id][1].write_table(
+            pa.Table.from_pylist(rows, schema=self.schema)
+        )
+
+    def close(self) -> List[str]:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        # Files only get their final name once complete; readers skip the rest
+        paths = []
+        for path, writer in self.files.values():
+            writer.close()
+            if path.exists():
+                added = pq.read_table(f"{path}.new")
+                kept = pq.read_table(path)
+                kept = kept.filter(
+                    pc.invert(pc.is_in(kept["id"], value_set=added["id"]))
+                )
+                merged = pa.concat_tables([kept, added]).sort_by(
+                    [("check_in", "ascending"), ("id", "ascending")]
+                )
+                pq.write_table(merged, f"{path}.tmp", compression="zstd")
+                os.replace(f"{path}.tmp", path)
+                os.remove(f"{path}.new")
+            else:
+                os.replace(f"{path}.new", path)
+            paths.append(str(path))
+        return paths
+
+
+async def _archive_month(
+    db: AsyncSession, month: date, batch_size: int
+) -> Tuple[List[int], List[str]]:
+    """Write the month's closed records to files; returns their ids and paths"""
+    lower = datetime.combine(month, time.min)
+    upper = datetime.combine(add_months(month, 1), time.min)
+    query = (
+        select(User.company_id, *ARCHIVE_COLUMNS)
+        .select_from(Attendance)
+        .outerjoin(User, User.id == Attendance.user_id)
+        .where(
+            Attendance.check_in >= lower,
+            Attendance.check_in < upper,
+            Attendance.check_out.is_not(None),
+        )
+        .order_by(Attendance.check_in, Attendance.id)
+        .execution_options(yield_per=batch_size)
+    )
+    writer = _MonthWriter(month)
+    ids: List[int] = []
+    result = await db.stream(query)
+    async for partition in result.partitions(batch_size):
+        by_company: Dict[Optional[int], List[Dict[str, Any]]] = {}
+        for row in partition:
+            record = row._asdict()
+            by_company.setdefault(record.pop("company_id"), []).append(record)
+            ids.append(record["id"])
+        for company_id, rows in by_company.items():
+            await asyncio.to_thread(writer.write, company_id, rows)
+    paths = await asyncio.to_thread(writer.close)
+    return ids, paths
+
+
+async def _delete_archived(db: AsyncSession, month: date, ids: List[int]) -> None:
+    lower = datetime.combine(month, time.min)
+    upper = datetime.combine(add_months(month, 1), time.min)
+    for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+        await db.execute(
+            delete(Attendance)
+            .where(
+                # Bounds on the partition key keep the delete to one partition
+                Attendance.check_in >= lower,
+                Attendance.check_in < upper,
+                Attendance.id.in_(ids[start : start + DELETE_CHUNK_SIZE]),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    await db.commit()
+
+    # An emptied month partition is dropped rather than left to vacuum
+    name = partition_name(month)
+    if db.get_bind().dialect.name == "postgresql" and name in await list_partitions(
+        db
+    ):
+        remaining = (
+            await db.execute(
+                select(func.count())
+                .select_from(Attendance)
+                .where(Attendance.check_in >= lower, Attendance.check_in < upper)
+            )
+        ).scalar_one()
+        if not remaining:
+            await detach_partition(db, name, drop=True)
+
+
+async def archive_attendance(
+    db: AsyncSession, today: date, after_months: int, batch_size: int = 10000
+) -> Dict[str, object]:
+    """
+    Move closed records of months ending `after_months` or more months ago to
+    the archive, a month at a time. Files are written and the watermark
+    advanced before rows are deleted; if a run stops in between, rows exist
+    in both places until the next run and reads de-duplicate them by id.
+    Open sessions stay in the database until they are closed.
+    """
+    cutoff = add_months(month_start(today), -after_months)
+    oldest = (
+        await db.execute(
+            select(func.min(Attendance.check_in)).where(
+                Attendance.check_out.is_not(None),
+                Attendance.check_in < datetime.combine(cutoff, time.min),
+            )
+        )
+    ).scalar()
+    report: Dict[str, Any] = {"archived": 0, "months": [], "files": []}
+    if oldest is None:
+        return report
+
+    month = month_start(oldest.date())
+    while month < cutoff:
+        ids, paths = await _archive_month(db, month, batch_size)
+        if ids:
+            manifest = dict(read_manifest())
+            watermark = archive_watermark()
+            following = add_months(month, 1)
+            if watermark is None or watermark < following:
+                manifest["watermark"] = following.isoformat()
+            manifest["revision"] += 1
+            await asyncio.to_thread(write_manifest, manifest)
+            await _delete_archived(db, month, ids)
+            report["archived"] += len(ids)
+            report["months"].append(f"{month:%Y-%m}")
+            report["files"].extend(paths)
+        month = add_months(month, 1)
+    return report
+
+
+def _read_month(
+    month: date,
+    start: datetime,
+    upper: datetime,
+    user_id: Optional[int],
+    before: Optional[Tuple[datetime, int]],
+    limit: int,
+) -> List[Dict[str, Any]]:
+    """
+    The month's newest `limit` records in the range, newest first. The range,
+    user and cursor are pushed into the scan, so row-group statistics skip
+    most of each file and only matching rows are materialized.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    pattern = f"company_id=*/month={month:%Y-%m}/{ARCHIVE_FILE}"
+    paths = sorted(archive_root().glob(pattern))
+    if not paths:
+        return []
+    bounds = [("check_in", ">=", start), ("check_in", "<=", upper)]
+    if user_id:
+        bounds.append(("user_id", "=", user_id))
+    if before is None:
+        filters = [bounds]
+    else:
+        # (check_in, id) < before, in disjunctive normal form
+        filters = [
+            bounds + [("check_in", "<", before[0])],
+            bounds + [("check_in", "=", before[0]), ("id", "<", before[1])],
+        ]
+    table = pa.concat_tables(pq.read_table(path, filters=filters) for path in paths)
+    table = table.sort_by([("check_in", "descending"), ("id", "descending")])
+    return table.slice(0, limit).to_pylist()
+
+
+def _read_archived(
+    start_date: datetime,
+    end_date: datetime,
+    user_id: Optional[int],
+    before: Optional[Tuple[datetime, int]],
+    limit: int,
+) -> List[Dict[str, Any]]:
+    start, end = as_utc(start_date), as_utc(end_date)
+    upper = min(end, before[0]) if before else end
+    first = month_start(start.date())
+    month = min(month_start(upper.date()), add_months(archive_watermark(), -1))
+    rows: List[Dict[str, Any]] = []
+    # Newest month first; every record of a month is newer than those of
+    # the months before it, so each only has to fill what is left of the page
+    while month >= first and len(rows) < limit:
+        rows.extend(
+            _read_month(month, start, upper, user_id, before, limit - len(rows))
+        )
+        month = add_months(month, -1)
+    return rows
+
+
+async def get_archived_attendance(
+    start_date: datetime,
+    end_date: datetime,
+    user_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> List[Attendance]:
+    """
+    Archived records in the range, newest first, as transient Attendance
+    objects so they can be mixed with rows loaded from the database
+    """
+    before = None
+    if cursor:
+        check_in, id = decode_cursor(cursor)
+        before = (as_utc(check_in), id)
+    rows = await asyncio.to_thread(
+        _read_archived, start_date, end_date, user_id, before, limit
+    )
+    return [Attendance(**row) for row in rows]
+
+
+def merge_archived(hot: Sequence[Any], cold: Sequence[Any]) -> List[Any]:
+    """
+    Database rows and archived records in (check_in, id) descending order.
+    A record present in both (an interrupted archive run) is kept once,
+    preferring the database copy.
+    """
+    seen = {record.id for record in hot}
+    merged = list(hot)
+    for record in cold:
+        if record.id not in seen:
+            seen.add(record.id)
+            merged.append(record)
+    merged.sort(key=lambda record: (as_utc(record.check_in), record.id), reverse=True)
+    return merged
@@ -0,0 +1,77 @@
+# app/services/attendance_archive_manifest.py
+"""
+The attendance archive's manifest.json and the watermark it holds: months
+before the watermark may have records in the Parquet archive instead of
+attendance_records. Kept apart from attendance_archive so the services that
+must respect the watermark can import it without the archive job's
+dependencies.
+"""
+import json
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from app.core.config import settings
+from app.core.etag import as_utc
+
+MANIFEST = "manifest.json"
+
+_manifest_cache: Dict[str, Any] = {}
+
+
+def archive_root() -> Path:
+    return Path(settings.ATTENDANCE_ARCHIVE_DIR)
+
+
+def read_manifest() -> Dict[str, Any]:
+    """The archive manifest, re-read only when the file changes"""
+    path = archive_root() / MANIFEST
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return {"watermark": None, "revision": 0}
+    # Every write replaces the file, so the inode changes even when mtime
+    # resolution is too coarse to tell two writes apart
+    key = (str(path), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if _manifest_cache.get("key") != key:
+        _manifest_cache["manifest"] = json.loads(path.read_text())
+        _manifest_cache["key"] = key
+    return _manifest_cache["manifest"]
+
+
+def write_manifest(manifest: Dict[str, Any]) -> None:
+    root = archive_root()
+    root.mkdir(parents=True, exist_ok=True)
+    tmp = root / f"{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest))
+    os.replace(tmp, root / MANIFEST)
+
+
+def archive_watermark() -> Optional[date]:
+    watermark = read_manifest()["watermark"]
+    return date.fromisoformat(watermark) if watermark else None
+
+
+def reaches_archive(start: Union[date, datetime]) -> bool:
+    watermark = archive_watermark()
+    if isinstance(start, datetime):
+        start = as_utc(start).date()
+    return watermark is not None and start < watermark
+
+
+def ensure_not_archived(start: Union[date, datetime]) -> None:
+    """
+    Raise ValueError if a range starting at `start` reaches archived months.
+    Only date-range listings read the archive; reports and exports working
+    on attendance_records would silently miss those records.
+    """
+    if reaches_archive(start):
+        raise ValueError(f"Attendance before {archive_watermark()} is archived")
+
+
+def archive_revision(start_date: Optional[datetime]) -> Optional[int]:
+    """Changes on every archive run; None when `start_date` is all hot data"""
+    if start_date is None or not reaches_archive(start_date):
+        return None
+    return read_manifest()["revision"]
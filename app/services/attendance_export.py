@@ -0,0 +1,70 @@
+# app/services/attendance_export.py
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.attendance import Attendance
+
+EXPORT_COLUMNS = list(Attendance.__table__.columns)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+
+async def stream_attendance_rows(
+    db: AsyncSession,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[Sequence[Row]]:
+    """
+    Yield batches of attendance rows from a server-side cursor, oldest first.
+    Plain column tuples are selected so no ORM objects are built.
+    """
+    filters = []
+    if start_date:
+        filters.append(Attendance.check_in >= start_date)
+    if end_date:
+        filters.append(Attendance.check_in <= end_date)
+    if user_id:
+        filters.append(Attendance.user_id == user_id)
+
+    query = (
+        select(*EXPORT_COLUMNS)
+        .where(*filters)
+        .order_by(Attendance.check_in, Attendance.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await db.stream(query)
+    async for partition in result.partitions(batch_size):
+        yield partition
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def render_csv(batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for batch in batches:
+        writer.writerows([[_plain(value) for value in row] for row in batch])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+async def render_ndjson(batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[str]:
+    async for batch in batches:
+        yield "".join(
+            json.dumps(dict(row._mapping), default=_plain) + "\n" for row in batch
+        )
@@ -0,0 +1,179 @@
+# app/services/attendance_import.py
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.attendance import Attendance
+from app.schemas.attendance import (
+    AttendanceCreate,
+    AttendanceImportError,
+    AttendanceImportResult,
+)
+from app.services.attendance_summary import refresh_daily_summaries
+
+# A record is either a dict of raw column values or the error that stopped
+# it from being parsed, tagged with the line it starts on.
+ParsedRecord = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of UTF-8 byte chunks into lines without buffering the body"""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRecord]:
+    """
+    Parse CSV with a header row. Quoted fields may span lines (notes often
+    do); physical lines are joined until the quote count is balanced.
+    """
+    header: Optional[List[str]] = None
+    buffered: List[str] = []
+    start_line = 0
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not buffered:
+            if not line.strip():
+                continue
+            start_line = line_no
+        buffered.append(line)
+        record = "\n".join(buffered)
+        if record.count('"') % 2:
+            continue
+        buffered = []
+        try:
+            values = next(csv.reader([record]))
+        except csv.Error as exc:
+            yield start_line, None, f"Malformed CSV: {exc}"
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield start_line, None, (
+                f"Expected {len(header)} columns, got {len(values)}"
+            )
+            continue
+        yield start_line, {
+            name: (value if value != "" else None)
+            for name, value in zip(header, values)
+        }, None
+    if buffered:
+        yield start_line, None, "Unterminated quoted field"
+
+
+async def iter_ndjson_records(
+    lines: AsyncIterator[str],
+) -> AsyncIterator[ParsedRecord]:
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_no, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+def _database_message(exc: DBAPIError) -> str:
+    return str(exc.orig).strip().splitlines()[0] if exc.orig else str(exc)
+
+
+def _record_error(result: AttendanceImportResult, line: int, error: str, limit: int):
+    result.failed += 1
+    if len(result.errors) < limit:
+        result.errors.append(AttendanceImportError(line=line, error=error))
+
+
+async def _insert_chunk(
+    db: AsyncSession,
+    chunk: List[Tuple[int, Dict[str, Any]]],
+    result: AttendanceImportResult,
+    max_errors: int,
+) -> None:
+    """
+    Insert a chunk with one executemany. If the database rejects it, retry
+    row by row inside savepoints so only the offending rows are reported.
+    """
+    inserted = [row for _, row in chunk]
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(Attendance), inserted)
+    except DBAPIError:
+        inserted = []
+        for line, row in chunk:
+            try:
+                async with db.begin_nested():
+                    await db.execute(insert(Attendance), [row])
+                inserted.append(row)
+            except DBAPIError as exc:
+                _record_error(result, line, _database_message(exc), max_errors)
+    result.imported += len(inserted)
+    await refresh_daily_summaries(
+        db,
+        [
+            (row["user_id"], row["check_in"].date())
+            for row in inserted
+            if row["check_out"] is not None
+        ],
+    )
+    await db.commit()
+
+
+async def import_attendance(
+    db: AsyncSession,
+    records: AsyncIterator[ParsedRecord],
+    chunk_size: int = 1000,
+    max_errors: int = 1000,
+) -> AttendanceImportResult:
+    """
+    Validate records against AttendanceCreate and insert them in chunks of
+    `chunk_size`, committing per chunk. Invalid rows are reported and skipped.
+    """
+    result = AttendanceImportResult()
+    chunk: List[Tuple[int, Dict[str, Any]]] = []
+    async for line, record, error in records:
+        result.total_rows += 1
+        if error is not None:
+            _record_error(result, line, error, max_errors)
+            continue
+        try:
+            obj_in = AttendanceCreate(**record)
+        except ValidationError as exc:
+            _record_error(result, line, _validation_message(exc), max_errors)
+            continue
+        chunk.append((line, obj_in.model_dump()))
+        if len(chunk) >= chunk_size:
+            await _insert_chunk(db, chunk, result, max_errors)
+            chunk = []
+    if chunk:
+        await _insert_chunk(db, chunk, result, max_errors)
+    return result
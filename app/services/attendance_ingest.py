@@ -0,0 +1,288 @@
+# app/services/attendance_ingest.py
+"""
+Write-behind ingestion for check-in/check-out bursts. Requests enqueue an
+event and await its future; one background task drains the queue and writes
+each batch in a single transaction, so a shift-start storm costs one commit
+per batch instead of one per employee.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.attendance import Attendance
+from app.services.attendance import (
+    apply_check_out,
+    check_in,
+    check_out,
+    close_earlier_month_sessions,
+)
+from app.services.attendance_summary import refresh_daily_summaries
+
+logger = logging.getLogger(__name__)
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+@dataclass
+class IngestEvent:
+    kind: str  # "check_in" or "check_out"
+    values: Dict[str, Any]
+    future: asyncio.Future = field(repr=False)
+
+
+def _resolve(event: IngestEvent, result: Any) -> None:
+    # The caller may have gone away (client disconnect cancels the future)
+    if not event.future.done():
+        event.future.set_result(result)
+
+
+def _fail(event: IngestEvent, exc: BaseException) -> None:
+    if not event.future.done():
+        event.future.set_exception(exc)
+
+
+class AttendanceIngestor:
+    def __init__(
+        self,
+        batch_size: int,
+        flush_interval: float,
+        session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    ) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory
+        # None is the stop request
+        self._queue: "asyncio.Queue[Optional[IngestEvent]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"events": 0, "batches": 0, "fallbacks": 0}
+
+    async def check_in(self, **values: Any) -> Optional[Attendance]:
+        values.setdefault("check_in", datetime.now())
+        return await self._submit("check_in", values)
+
+    async def check_out(
+        self, attendance_id: int, **values: Any
+    ) -> Optional[Attendance]:
+        values.setdefault("check_out_time", datetime.now())
+        return await self._submit("check_out", dict(values, id=attendance_id))
+
+    async def _submit(self, kind: str, values: Dict[str, Any]) -> Any:
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(IngestEvent(kind, values, future))
+        return await future
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            if self._queue.empty():
+                # Queues bind to the loop that first waits on them
+                self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Let the worker finish the batch it is writing, flush whatever is
+        queued, then stop it. Every queued request gets its answer.
+        """
+        if self._task is not None and not self._task.done():
+            self._queue.put_nowait(None)
+            await self._task
+        self._task = None
+        while not self._queue.empty():
+            batch, _ = self._drain_nowait([])
+            if batch:
+                await self._flush_batch(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(self._stats, queued=self._queue.qsize())
+
+    def _drain_nowait(self, batch: List[IngestEvent]) -> Tuple[List[IngestEvent], bool]:
+        """Fill `batch` from the queue; also reports whether stop was requested"""
+        stopping = False
+        while len(batch) < self.batch_size and not self._queue.empty():
+            event = self._queue.get_nowait()
+            if event is None:
+                stopping = True
+            else:
+                batch.append(event)
+        return batch, stopping
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            event = await self._queue.get()
+            if event is None:
+                break
+            batch = [event]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not stopping:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                batch.append(event)
+                stopping = self._drain_nowait(batch)[1]
+            await self._flush_batch(batch)
+        # Events queued behind the stop request are flushed by stop()
+
+    async def _flush_batch(self, batch: List[IngestEvent]) -> None:
+        try:
+            await self._flush(batch)
+        except Exception as exc:
+            logger.exception("Flushing attendance events failed")
+            for event in batch:
+                _fail(event, exc)
+        finally:
+            # Cancelled mid-flush: the outcome is unknown, but callers must
+            # not wait forever
+            for event in batch:
+                _fail(event, RuntimeError("Attendance event was not processed"))
+
+    async def _flush(self, batch: List[IngestEvent]) -> None:
+        self._stats["events"] += len(batch)
+        self._stats["batches"] += 1
+        check_ins = [event for event in batch if event.kind == "check_in"]
+        check_outs = [event for event in batch if event.kind == "check_out"]
+        async with self.session_factory() as db:
+            if check_ins:
+                await self._flush_check_ins(db, check_ins)
+            if check_outs:
+                await self._flush_check_outs(db, check_outs)
+
+    async def _flush_check_ins(
+        self, db: AsyncSession, events: List[IngestEvent]
+    ) -> None:
+        """
+        One multi-row INSERT ... ON CONFLICT DO NOTHING RETURNING for the first
+        event per user. Conflicting users (already checked in, or holding a
+        stale session from an earlier day) and repeated taps go through the
+        regular check-in so they get exactly the same outcome as before.
+        """
+        first: Dict[int, IngestEvent] = {}
+        retry: List[IngestEvent] = []
+        for event in events:
+            if event.values["user_id"] in first:
+                retry.append(event)
+            else:
+                first[event.values["user_id"]] = event
+
+        upsert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+        try:
+            await close_earlier_month_sessions(
+                db,
+                list(first),
+                min(event.values["check_in"] for event in first.values()),
+            )
+            if upsert is not None:
+                statement = upsert(Attendance).on_conflict_do_nothing()
+            else:
+                statement = insert(Attendance)
+            result = await db.scalars(
+                statement.returning(Attendance),
+                [event.values for event in first.values()],
+            )
+            inserted = {attendance.user_id: attendance for attendance in result}
+            await db.commit()
+        except Exception:
+            logger.exception("Batched check-in failed; retrying one by one")
+            await db.rollback()
+            inserted = {}
+
+        for user_id, event in first.items():
+            if user_id in inserted:
+                _resolve(event, inserted[user_id])
+            else:
+                retry.append(event)
+        for event in retry:
+            self._stats["fallbacks"] += 1
+            values = dict(event.values)
+            try:
+                check_in_time = values.pop("check_in")
+                _resolve(
+                    event, await check_in(db, check_in_time=check_in_time, **values)
+                )
+            except Exception as exc:
+                await db.rollback()
+                _fail(event, exc)
+
+    async def _flush_check_outs(
+        self, db: AsyncSession, events: List[IngestEvent]
+    ) -> None:
+        """
+        Load every record in one query, apply the check-outs and write them
+        with the summary refresh in a single commit. Only the first check-out
+        of a still-open record applies; repeats in the batch and records that
+        are already closed resolve to None, like a failed check-in.
+        """
+        ids = [event.values["id"] for event in events]
+        closed: Optional[Dict[int, IngestEvent]] = {}
+        try:
+            result = await db.scalars(
+                select(Attendance).where(Attendance.id.in_(ids))
+            )
+            records = {attendance.id: attendance for attendance in result}
+            for event in events:
+                values = dict(event.values)
+                attendance = records.get(values.pop("id"))
+                if attendance is None or attendance.check_out is not None:
+                    continue
+                apply_check_out(attendance, values.pop("check_out_time"), **values)
+                closed[attendance.id] = event
+            await db.flush()
+            await refresh_daily_summaries(
+                db,
+                [
+                    (attendance.user_id, attendance.check_in.date())
+                    for attendance in map(records.get, closed)
+                ],
+            )
+            await db.commit()
+            # Pick up server-side updated_at for the whole batch in one query
+            result = await db.scalars(
+                select(Attendance)
+                .where(Attendance.id.in_(list(closed)))
+                .execution_options(populate_existing=True)
+            )
+            records = {attendance.id: attendance for attendance in result}
+        except Exception:
+            logger.exception("Batched check-out failed; retrying one by one")
+            await db.rollback()
+            closed = None
+
+        for event in events:
+            if closed is not None:
+                attendance_id = event.values["id"]
+                applied = closed.get(attendance_id) is event
+                _resolve(event, records[attendance_id] if applied else None)
+                continue
+            self._stats["fallbacks"] += 1
+            values = dict(event.values)
+            try:
+                attendance_id = values.pop("id")
+                _resolve(
+                    event, await check_out(db, attendance_id=attendance_id, **values)
+                )
+            except Exception as exc:
+                await db.rollback()
+                _fail(event, exc)
+
+
+attendance_ingestor = AttendanceIngestor(
+    batch_size=settings.ATTENDANCE_INGEST_BATCH_SIZE,
+    flush_interval=settings.ATTENDANCE_INGEST_FLUSH_MS / 1000,
+)
@@ -0,0 +1,160 @@
+# app/services/attendance_partitions.py
+"""
+Monthly range partitions of attendance_records on PostgreSQL (migration
+0009). Partitions are created ahead of time so rows never land in the
+default partition, and old months are detached (a catalog change) instead of
+being deleted row by row.
+"""
+import re
+from datetime import date, datetime, time
+from typing import Dict, List, Optional
+
+from sqlalchemy import text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.attendance import Attendance
+from app.services.attendance_summary import refresh_daily_summaries
+
+PARENT_TABLE = "attendance_records"
+DEFAULT_PARTITION = "attendance_records_default"
+_PARTITION_NAME = re.compile(r"^attendance_records_p(\d{4})_(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month:%Y_%m}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    match = _PARTITION_NAME.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+async def list_partitions(db: AsyncSession) -> List[str]:
+    result = await db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = CAST(:parent AS regclass) "
+            "ORDER BY child.relname"
+        ),
+        {"parent": PARENT_TABLE},
+    )
+    return list(result.scalars())
+
+
+async def create_partition(db: AsyncSession, month: date) -> bool:
+    """
+    Create and attach the partition for `month`; False if it already exists.
+    Rows of that month already sitting in the default partition are moved
+    into it first, otherwise attaching would fail.
+    """
+    name = partition_name(month)
+    if name in await list_partitions(db):
+        return False
+    lower, upper = month, add_months(month, 1)
+    await db.execute(
+        text(
+            f'CREATE TABLE "{name}" '
+            f"(LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        )
+    )
+    await db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE check_in >= :lower AND check_in < :upper RETURNING *) "
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ),
+        {
+            "lower": datetime.combine(lower, time.min),
+            "upper": datetime.combine(upper, time.min),
+        },
+    )
+    await db.execute(
+        text(
+            f'ALTER TABLE {PARENT_TABLE} ATTACH PARTITION "{name}" '
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+    )
+    # One open session per user, enforced within the partition
+    await db.execute(
+        text(
+            f'CREATE UNIQUE INDEX "uq_{name}_open_session" ON "{name}" (user_id) '
+            "WHERE check_out IS NULL"
+        )
+    )
+    await db.commit()
+    return True
+
+
+async def detach_partition(db: AsyncSession, name: str, drop: bool = False) -> None:
+    """Detach a partition; its rows stay in a standalone table unless dropped"""
+    await db.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+    if drop:
+        await db.execute(text(f'DROP TABLE "{name}"'))
+    await db.commit()
+
+
+async def close_sessions_before(db: AsyncSession, month: date) -> int:
+    """
+    Auto-close open sessions from earlier months. The open-session index is
+    unique per partition only, so a session left open last month would not
+    block, and would not be closed by, a check-in this month.
+    """
+    result = await db.execute(
+        update(Attendance)
+        .where(
+            Attendance.check_out.is_(None),
+            Attendance.check_in < datetime.combine(month, time.min),
+        )
+        .values(check_out=Attendance.check_in, check_out_method="AUTO")
+        .returning(Attendance.user_id, Attendance.check_in)
+        .execution_options(synchronize_session=False)
+    )
+    closed = result.all()
+    await refresh_daily_summaries(
+        db, [(user_id, check_in.date()) for user_id, check_in in closed]
+    )
+    await db.commit()
+    return len(closed)
+
+
+async def maintain_partitions(
+    db: AsyncSession,
+    today: date,
+    months_ahead: int,
+    retention_months: Optional[int] = None,
+    drop_detached: bool = False,
+) -> Dict[str, object]:
+    """
+    Ensure partitions exist from this month to `months_ahead` months out and
+    detach those older than `retention_months` (kept forever when None).
+    """
+    current = month_start(today)
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if await create_partition(db, month):
+            created.append(partition_name(month))
+
+    detached = []
+    if retention_months is not None:
+        oldest_kept = add_months(current, -retention_months)
+        for name in await list_partitions(db):
+            month = partition_month(name)
+            if month is not None and month < oldest_kept:
+                await detach_partition(db, name, drop=drop_detached)
+                detached.append(name)
+
+    closed = await close_sessions_before(db, current)
+    return {"created": created, "detached": detached, "closed_sessions": closed}
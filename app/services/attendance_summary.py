@@ -0,0 +1,214 @@
+# app/services/attendance_summary.py
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import (
+    Date,
+    Integer,
+    and_,
+    cast,
+    delete,
+    extract,
+    func,
+    insert,
+    select,
+    tuple_,
+    type_coerce,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.models.attendance import Attendance
+from app.models.attendance_summary import DailyAttendanceSummary
+from app.models.user import User
+from app.services.attendance_archive_manifest import archive_watermark
+
+SUMMARY_PERIODS = ("day", "week", "month")
+
+
+def _day_bounds(start_day: date, end_day: date) -> Tuple[datetime, datetime]:
+    return (
+        datetime.combine(start_day, time.min),
+        datetime.combine(end_day + timedelta(days=1), time.min),
+    )
+
+
+def _rollup_query(*filters) -> Select:
+    """Aggregate completed sessions per user and day from attendance_records"""
+    day = func.date(Attendance.check_in)
+    duration = extract("epoch", Attendance.check_out) - extract(
+        "epoch", Attendance.check_in
+    )
+    return (
+        select(
+            Attendance.user_id,
+            type_coerce(day, Date).label("day"),
+            User.company_id,
+            cast(func.coalesce(func.sum(duration), 0), Integer),
+            func.min(Attendance.check_in),
+            func.max(Attendance.check_out),
+            func.count(Attendance.id),
+        )
+        .join(User, User.id == Attendance.user_id)
+        .where(Attendance.check_out.isnot(None), *filters)
+        .group_by(Attendance.user_id, day, User.company_id)
+    )
+
+
+_ROLLUP_COLUMNS = [
+    "user_id",
+    "day",
+    "company_id",
+    "total_seconds",
+    "first_check_in",
+    "last_check_out",
+    "session_count",
+]
+
+
+async def refresh_daily_summary(db: AsyncSession, user_id: int, day: date) -> None:
+    """
+    Recompute one user's rollup row for one day. Runs in the caller's
+    transaction so the rollup commits atomically with the attendance change.
+    """
+    day_start, day_end = _day_bounds(day, day)
+    await db.execute(
+        delete(DailyAttendanceSummary).where(
+            and_(
+                DailyAttendanceSummary.user_id == user_id,
+                DailyAttendanceSummary.day == day,
+            )
+        )
+    )
+    await db.execute(
+        insert(DailyAttendanceSummary).from_select(
+            _ROLLUP_COLUMNS,
+            _rollup_query(
+                Attendance.user_id == user_id,
+                Attendance.check_in >= day_start,
+                Attendance.check_in < day_end,
+            ),
+        )
+    )
+
+
+async def refresh_daily_summaries(
+    db: AsyncSession, keys: Iterable[Tuple[int, date]]
+) -> None:
+    """
+    Recompute the rollup rows of many (user, day) pairs with one DELETE and
+    one INSERT ... SELECT, in the caller's transaction
+    """
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    if len(keys) == 1:
+        await refresh_daily_summary(db, *keys[0])
+        return
+    user_ids = sorted({user_id for user_id, _ in keys})
+    # The user and check_in bounds let the key filter use the index and, on
+    # PostgreSQL, prune partitions
+    day_start, day_end = _day_bounds(
+        min(day for _, day in keys), max(day for _, day in keys)
+    )
+    await db.execute(
+        delete(DailyAttendanceSummary).where(
+            tuple_(DailyAttendanceSummary.user_id, DailyAttendanceSummary.day).in_(
+                keys
+            )
+        )
+    )
+    await db.execute(
+        insert(DailyAttendanceSummary).from_select(
+            _ROLLUP_COLUMNS,
+            _rollup_query(
+                Attendance.user_id.in_(user_ids),
+                Attendance.check_in >= day_start,
+                Attendance.check_in < day_end,
+                tuple_(
+                    Attendance.user_id,
+                    type_coerce(func.date(Attendance.check_in), Date),
+                ).in_(keys),
+            ),
+        )
+    )
+
+
+async def rebuild_daily_summary(
+    db: AsyncSession,
+    start_day: date,
+    end_day: date,
+    user_id: Optional[int] = None,
+) -> int:
+    """
+    Recompute the rollup for an inclusive range of days; returns rows written.
+    Days before the archive watermark are left as they are: their records
+    are no longer in attendance_records.
+    """
+    watermark = archive_watermark()
+    if watermark is not None and start_day < watermark:
+        start_day = watermark
+    if start_day > end_day:
+        return 0
+    day_start, day_end = _day_bounds(start_day, end_day)
+    delete_query = delete(DailyAttendanceSummary).where(
+        and_(
+            DailyAttendanceSummary.day >= start_day,
+            DailyAttendanceSummary.day <= end_day,
+        )
+    )
+    filters = [Attendance.check_in >= day_start, Attendance.check_in < day_end]
+    if user_id:
+        delete_query = delete_query.where(DailyAttendanceSummary.user_id == user_id)
+        filters.append(Attendance.user_id == user_id)
+
+    await db.execute(delete_query)
+    result = await db.execute(
+        insert(DailyAttendanceSummary).from_select(
+            _ROLLUP_COLUMNS, _rollup_query(*filters)
+        )
+    )
+    await db.commit()
+    return result.rowcount
+
+
+def _period_start(db: AsyncSession, period: str):
+    column = DailyAttendanceSummary.day
+    if period == "day":
+        return column
+    if db.get_bind().dialect.name == "sqlite":
+        if period == "week":
+            return type_coerce(func.date(column, "weekday 0", "-6 days"), Date)
+        return type_coerce(func.date(column, "start of month"), Date)
+    return cast(func.date_trunc(period, column), Date)
+
+
+async def get_attendance_summary(
+    db: AsyncSession,
+    start_day: date,
+    end_day: date,
+    period: str = "week",
+    user_id: Optional[int] = None,
+    company_id: Optional[int] = None,
+) -> List[dict]:
+    """Totals per user and day, ISO week or month, read from the rollup only"""
+    period_start = _period_start(db, period)
+    query = select(
+        DailyAttendanceSummary.user_id,
+        period_start.label("period_start"),
+        func.sum(DailyAttendanceSummary.total_seconds).label("total_seconds"),
+        func.sum(DailyAttendanceSummary.session_count).label("session_count"),
+        func.count().label("days_present"),
+    ).where(
+        DailyAttendanceSummary.day >= start_day,
+        DailyAttendanceSummary.day <= end_day,
+    )
+    if user_id:
+        query = query.where(DailyAttendanceSummary.user_id == user_id)
+    if company_id:
+        query = query.where(DailyAttendanceSummary.company_id == company_id)
+    query = query.group_by(DailyAttendanceSummary.user_id, period_start).order_by(
+        DailyAttendanceSummary.user_id, period_start
+    )
+    result = await db.execute(query)
+    return [dict(row) for row in result.mappings().all()]
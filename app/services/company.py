@@ -1,23 +1,175 @@
 # app/services/company.py
-from typing import Any, Dict, Optional, Union, List
+from typing import Any, Dict, Optional, Sequence, Union, List
+from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import inspect, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import (
+    load_only,
+    make_transient_to_detached,
+    selectinload,
+)
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.config import settings
+from app.core.invalidation import invalidation_channel
 from app.models.company import Company
+from app.models.user import User
 from app.schemas.company import CompanyCreate, CompanyUpdate
+from app.utils.cache import CacheBackend, LocalCacheBackend
 
+COMPANY_COLUMNS = [column.key for column in Company.__table__.columns]
+# Employee snapshots never carry password hashes
+EMPLOYEE_COLUMNS = [
+    column.key for column in User.__table__.columns if column.key != "hashed_password"
+]
+LIST_GENERATION_KEY = "companies:generation"
 
-async def get_company(db: AsyncSession, id: int) -> Optional[Company]:
-    result = await db.execute(select(Company).filter(Company.id == id))
-    return result.scalars().first()
+# Column snapshots of companies, their employees and company list pages.
+# Swap in another CacheBackend to share it between workers.
+company_cache: CacheBackend = LocalCacheBackend(
+    maxsize=settings.COMPANY_CACHE_SIZE, ttl=settings.COMPANY_CACHE_TTL_SECONDS
+)
+
+
+def _company_key(id: Any) -> str:
+    return f"company:{id}"
+
+
+def _employees_key(company_id: Any) -> str:
+    return f"company:{company_id}:employees"
+
+
+def _generation_key(company_id: Any) -> str:
+    return f"company:{company_id}:generation"
+
+
+def _evict_company(key: str) -> None:
+    company_cache.evict_local(
+        _company_key(key), _generation_key(key), LIST_GENERATION_KEY
+    )
+
+
+def _evict_company_employees(key: str) -> None:
+    company_cache.evict_local(_employees_key(key), _generation_key(key))
+
+
+invalidation_channel.subscribe("company", _evict_company)
+invalidation_channel.subscribe("company_employees", _evict_company_employees)
+invalidation_channel.subscribe_reset(company_cache.clear)
+
+
+async def invalidate_company(id: int) -> None:
+    """Drop the company and every cached list page (via a new generation)"""
+    await company_cache.delete(
+        _company_key(id), _generation_key(id), LIST_GENERATION_KEY
+    )
+    await invalidation_channel.publish("company", id)
+
+
+async def invalidate_company_employees(*company_ids: Optional[int]) -> None:
+    """Called by user writes that may change a company's employee list"""
+    for company_id in {id for id in company_ids if id is not None}:
+        await company_cache.delete(
+            _employees_key(company_id), _generation_key(company_id)
+        )
+        await invalidation_channel.publish("company_employees", company_id)
+
+
+def _snapshot(obj: Any, keys: Sequence[str]) -> Optional[Dict[str, Any]]:
+    """Loaded column values, or None if any of `keys` is not loaded"""
+    state = inspect(obj).dict
+    if any(key not in state for key in keys):
+        return None
+    return {key: state[key] for key in keys}
+
+
+async def _restore(db: AsyncSession, model: Any, snapshot: Dict[str, Any]) -> Any:
+    # Attach without a SELECT, as get_user_cached does
+    obj = model(**snapshot)
+    make_transient_to_detached(obj)
+    return await db.merge(obj, load=False)
+
+
+async def _generation(key: str) -> str:
+    """
+    Token under `key`, created on first use. Invalidations delete it, so a
+    reader holding an older token knows its database read may be stale.
+    """
+    generation = await company_cache.get(key)
+    if generation is None:
+        generation = uuid4().hex
+        await company_cache.set(key, generation)
+    return generation
+
+
+async def get_company(
+    db: AsyncSession, id: int, with_employees: bool = False
+) -> Optional[Company]:
+    snapshot = await company_cache.get(_company_key(id))
+    employees = None
+    if with_employees and snapshot is not None:
+        employees = await company_cache.get(_employees_key(id))
+    if snapshot is not None and (employees is not None or not with_employees):
+        company = await _restore(db, Company, snapshot)
+        if with_employees:
+            set_committed_value(
+                company,
+                "employees",
+                [await _restore(db, User, employee) for employee in employees],
+            )
+        return company
+
+    generation = await _generation(_generation_key(id))
+    query = select(Company).filter(Company.id == id)
+    if with_employees:
+        # One extra IN query for all employees; lazy loading fails under asyncio
+        query = query.options(selectinload(Company.employees))
+    result = await db.execute(query)
+    company = result.scalars().first()
+    if company is None:
+        return None
+    if await company_cache.get(_generation_key(id)) != generation:
+        # Invalidated while loading; the rows may predate the change
+        return company
+    snapshot = _snapshot(company, COMPANY_COLUMNS)
+    if snapshot is not None:
+        await company_cache.set(_company_key(id), snapshot)
+    if with_employees:
+        employees = [_snapshot(user, EMPLOYEE_COLUMNS) for user in company.employees]
+        if all(employee is not None for employee in employees):
+            await company_cache.set(_employees_key(id), employees)
+    return company
 
 
 async def get_companies(
-    db: AsyncSession, skip: int = 0, limit: int = 100
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[Sequence[str]] = None,
 ) -> List[Company]:
-    result = await db.execute(select(Company).offset(skip).limit(limit))
-    return result.scalars().all()
+    """
+    List pages are cached under the current list generation, which every
+    company write replaces, so no page is ever served after a change.
+    """
+    generation = await _generation(LIST_GENERATION_KEY)
+    key = f"companies:{generation}:{skip}:{limit}:{','.join(fields or ['*'])}"
+    snapshots = await company_cache.get(key)
+    if snapshots is not None:
+        return [await _restore(db, Company, snapshot) for snapshot in snapshots]
+
+    query = select(Company).offset(skip).limit(limit)
+    if fields is not None:
+        query = query.options(
+            load_only(*(getattr(Company, field) for field in fields))
+        )
+    result = await db.execute(query)
+    companies = result.scalars().all()
+    keys = COMPANY_COLUMNS if fields is None else sorted({"id", *fields})
+    snapshots = [_snapshot(company, keys) for company in companies]
+    if all(snapshot is not None for snapshot in snapshots):
+        await company_cache.set(key, snapshots)
+    return companies
 
 
 async def create_company(db: AsyncSession, obj_in: CompanyCreate) -> Company:
@@ -30,6 +182,7 @@ async def create_company(db: AsyncSession, obj_in: CompanyCreate) -> Company:
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    await invalidate_company(db_obj.id)
     return db_obj
 
 
@@ -39,7 +192,7 @@ async def update_company(
     if isinstance(obj_in, dict):
         update_data = obj_in
     else:
-        update_data = obj_in.dict(exclude_unset=True)
+        update_data = obj_in.model_dump(exclude_unset=True)
     
     for field in update_data:
         if hasattr(db_obj, field):
@@ -48,12 +201,26 @@ async def update_company(
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    await invalidate_company(db_obj.id)
     return db_obj
 
 
 async def delete_company(db: AsyncSession, id: int) -> Optional[Company]:
     company = await get_company(db, id=id)
     if company:
+        # Detach employees explicitly to learn whose cached user rows change
+        result = await db.execute(
+            update(User)
+            .where(User.company_id == id)
+            .values(company_id=None)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+        employee_ids = result.scalars().all()
         await db.delete(company)
         await db.commit()
+        await invalidate_company(id)
+        await invalidate_company_employees(id)
+        for user_id in employee_ids:
+            await invalidation_channel.publish("user", user_id)
     return company
@@ -0,0 +1,104 @@
+# app/services/company_site.py
+from typing import Any, Dict, List, Optional, Union
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.invalidation import invalidation_channel
+from app.models.company_site import CompanySite
+from app.schemas.company_site import CompanySiteCreate, CompanySiteUpdate
+from app.utils.cache import TTLCache
+from app.utils.geolocation import SiteIndex
+
+# Per-worker spatial index of each company's active sites, keyed by company id
+site_index_cache = TTLCache(
+    maxsize=settings.SITE_INDEX_CACHE_SIZE, ttl=settings.SITE_INDEX_TTL_SECONDS
+)
+
+
+def _evict_site_index(key: str) -> None:
+    site_index_cache.delete(int(key))
+
+
+invalidation_channel.subscribe("company_sites", _evict_site_index)
+invalidation_channel.subscribe_reset(site_index_cache.clear)
+
+
+async def get_company_site(db: AsyncSession, id: int) -> Optional[CompanySite]:
+    result = await db.execute(select(CompanySite).filter(CompanySite.id == id))
+    return result.scalars().first()
+
+
+async def get_company_sites(
+    db: AsyncSession, company_id: int, active_only: bool = False
+) -> List[CompanySite]:
+    query = select(CompanySite).filter(CompanySite.company_id == company_id)
+    if active_only:
+        query = query.filter(CompanySite.is_active.is_(True))
+    result = await db.execute(query.order_by(CompanySite.id))
+    return result.scalars().all()
+
+
+async def create_company_site(
+    db: AsyncSession, company_id: int, obj_in: CompanySiteCreate
+) -> CompanySite:
+    db_obj = CompanySite(
+        company_id=company_id,
+        name=obj_in.name,
+        latitude=obj_in.latitude,
+        longitude=obj_in.longitude,
+        radius_meters=obj_in.radius_meters,
+        is_active=obj_in.is_active,
+    )
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    await invalidation_channel.publish("company_sites", company_id)
+    return db_obj
+
+
+async def update_company_site(
+    db: AsyncSession,
+    db_obj: CompanySite,
+    obj_in: Union[CompanySiteUpdate, Dict[str, Any]],
+) -> CompanySite:
+    if isinstance(obj_in, dict):
+        update_data = obj_in
+    else:
+        update_data = obj_in.model_dump(exclude_unset=True)
+
+    for field in update_data:
+        if hasattr(db_obj, field):
+            setattr(db_obj, field, update_data[field])
+
+    db.add(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    await invalidation_channel.publish("company_sites", db_obj.company_id)
+    return db_obj
+
+
+async def delete_company_site(db: AsyncSession, id: int) -> Optional[CompanySite]:
+    site = await get_company_site(db, id=id)
+    if site:
+        await db.delete(site)
+        await db.commit()
+        await invalidation_channel.publish("company_sites", site.company_id)
+    return site
+
+
+async def get_site_index(db: AsyncSession, company_id: int) -> SiteIndex:
+    """
+    The company's active sites as a SiteIndex. Built from one query on first
+    use and then served from this worker's cache until the sites change.
+    """
+    index = site_index_cache.get(company_id)
+    if index is None:
+        sites = await get_company_sites(db, company_id, active_only=True)
+        index = SiteIndex(
+            (site.id, site.latitude, site.longitude, site.radius_meters)
+            for site in sites
+        )
+        site_index_cache.set(company_id, index)
+    return index
@@ -0,0 +1,91 @@
+# app/services/geofence_audit.py
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.attendance import Attendance
+from app.models.user import User
+from app.schemas.attendance import GeofenceAuditResult, GeofenceViolation
+from app.services.attendance_archive_manifest import ensure_not_archived
+from app.utils.geolocation import calculate_distance_array
+
+# (latitude, longitude, radius in meters)
+Fence = Tuple[float, float, float]
+
+
+def nearest_fence_distance(
+    lats: np.ndarray, lons: np.ndarray, fences: Sequence[Fence]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For each coordinate, the distance to the closest fence centre and whether
+    it lies inside at least one fence
+    """
+    nearest = np.full(lats.shape, np.inf)
+    inside = np.zeros(lats.shape, dtype=bool)
+    for fence_lat, fence_lon, radius in fences:
+        distance = calculate_distance_array(lats, lons, fence_lat, fence_lon)
+        np.minimum(nearest, distance, out=nearest)
+        inside |= distance <= radius
+    return nearest, inside
+
+
+async def audit_attendance_locations(
+    db: AsyncSession,
+    fences: Sequence[Fence],
+    start_date: datetime,
+    end_date: datetime,
+    user_id: Optional[int] = None,
+    company_id: Optional[int] = None,
+    chunk_size: int = 10000,
+    max_flagged: int = 1000,
+) -> GeofenceAuditResult:
+    """
+    Stream stored check-in coordinates in chunks and flag, in bulk, records
+    that fall outside every fence. At most `max_flagged` violations are
+    listed; all of them are counted. Ranges reaching archived months raise
+    ValueError.
+    """
+    ensure_not_archived(start_date)
+    query = select(
+        Attendance.id,
+        Attendance.user_id,
+        Attendance.check_in,
+        Attendance.latitude,
+        Attendance.longitude,
+    ).where(Attendance.check_in >= start_date, Attendance.check_in <= end_date)
+    if user_id:
+        query = query.where(Attendance.user_id == user_id)
+    if company_id:
+        query = query.join(User, User.id == Attendance.user_id).where(
+            User.company_id == company_id
+        )
+    query = query.execution_options(yield_per=chunk_size)
+
+    result = GeofenceAuditResult()
+    stream = await db.stream(query)
+    async for rows in stream.partitions(chunk_size):
+        ids, user_ids, check_ins, lats, lons = zip(*rows)
+        lats = np.array(lats, dtype=float)
+        lons = np.array(lons, dtype=float)
+        located = ~(np.isnan(lats) | np.isnan(lons))
+        result.checked += int(located.sum())
+        result.missing_location += int((~located).sum())
+
+        distance, inside = nearest_fence_distance(lats, lons, fences)
+        outside = np.flatnonzero(located & ~inside)
+        result.flagged += len(outside)
+        for index in outside[: max(0, max_flagged - len(result.violations))]:
+            result.violations.append(
+                GeofenceViolation(
+                    id=ids[index],
+                    user_id=user_ids[index],
+                    check_in=check_ins[index],
+                    latitude=lats[index],
+                    longitude=lons[index],
+                    distance_meters=round(float(distance[index]), 1),
+                )
+            )
+    return result
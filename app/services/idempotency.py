@@ -0,0 +1,141 @@
+# app/services/idempotency.py
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, NamedTuple, Optional, Tuple
+from weakref import WeakValueDictionary
+
+from sqlalchemy import and_, delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.idempotency_key import IdempotencyKey
+from app.utils.cache import TTLCache
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: int
+    body: Any
+
+
+# (user_id, endpoint, key) -> StoredResponse; the table is the cross-worker copy
+idempotency_cache = TTLCache(
+    maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_TTL_SECONDS
+)
+_locks: "WeakValueDictionary[Tuple[int, str, str], asyncio.Lock]" = (
+    WeakValueDictionary()
+)
+
+
+def request_fingerprint(payload: Any) -> str:
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def key_lock(user_id: int, endpoint: str, key: str) -> asyncio.Lock:
+    """Serializes concurrent retries of one key within this worker"""
+    lock_key = (user_id, endpoint, key)
+    lock = _locks.get(lock_key)
+    if lock is None:
+        lock = _locks[lock_key] = asyncio.Lock()
+    return lock
+
+
+def _key_filter(user_id: int, endpoint: str, key: str):
+    return and_(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.endpoint == endpoint,
+        IdempotencyKey.key == key,
+    )
+
+
+async def get_stored_response(
+    db: AsyncSession, user_id: int, endpoint: str, key: str
+) -> Optional[StoredResponse]:
+    cache_key = (user_id, endpoint, key)
+    stored = idempotency_cache.get(cache_key)
+    if stored is not None:
+        return stored
+
+    result = await db.execute(
+        select(
+            IdempotencyKey.request_hash,
+            IdempotencyKey.status_code,
+            IdempotencyKey.response_body,
+        ).where(
+            _key_filter(user_id, endpoint, key),
+            IdempotencyKey.expires_at > datetime.now(timezone.utc),
+        )
+    )
+    row = result.first()
+    if row is None:
+        return None
+    stored = StoredResponse(
+        row.request_hash, row.status_code, json.loads(row.response_body)
+    )
+    idempotency_cache.set(cache_key, stored)
+    return stored
+
+
+async def save_response(
+    db: AsyncSession,
+    user_id: int,
+    endpoint: str,
+    key: str,
+    request_hash: str,
+    status_code: int,
+    body: Any,
+) -> StoredResponse:
+    """
+    Record the first response for a key. If another worker stored one in the
+    meantime, that response wins and is returned instead.
+    """
+    now = datetime.now(timezone.utc)
+    await db.execute(
+        delete(IdempotencyKey).where(
+            _key_filter(user_id, endpoint, key), IdempotencyKey.expires_at <= now
+        )
+    )
+    values = dict(
+        user_id=user_id,
+        endpoint=endpoint,
+        key=key,
+        request_hash=request_hash,
+        status_code=status_code,
+        response_body=json.dumps(body),
+        expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+    )
+    upsert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if upsert is not None:
+        result = await db.execute(
+            upsert(IdempotencyKey).values(**values).on_conflict_do_nothing()
+        )
+        inserted = result.rowcount == 1
+    else:
+        await db.execute(insert(IdempotencyKey).values(**values))
+        inserted = True
+    await db.commit()
+
+    if not inserted:
+        idempotency_cache.delete((user_id, endpoint, key))
+        existing = await get_stored_response(db, user_id, endpoint, key)
+        if existing is not None:
+            return existing
+    stored = StoredResponse(request_hash, status_code, body)
+    idempotency_cache.set((user_id, endpoint, key), stored)
+    return stored
+
+
+async def purge_expired_idempotency_keys(db: AsyncSession) -> int:
+    result = await db.execute(
+        delete(IdempotencyKey).where(
+            IdempotencyKey.expires_at <= datetime.now(timezone.utc)
+        )
+    )
+    await db.commit()
+    return result.rowcount
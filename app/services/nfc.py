@@ -0,0 +1,136 @@
+# app/services/nfc.py
+from typing import Dict, List, NamedTuple, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.invalidation import invalidation_channel
+from app.models.nfc_tag import NFCTag
+from app.schemas.nfc_tag import NFCTagBulkResult, NFCTagCreate
+
+BATCH_SIZE = 1000
+
+
+class RegisteredTag(NamedTuple):
+    user_id: Optional[int]
+    site_id: Optional[int]
+    is_active: bool
+
+
+class NFCTagRegistry:
+    """
+    Per-worker hash map of every registered tag. Loaded with one query on
+    first use and dropped whenever tags change, so the next lookup reloads it.
+    """
+
+    def __init__(self) -> None:
+        self._tags: Optional[Dict[str, RegisteredTag]] = None
+        self._generation = 0
+        self.loads = 0
+
+    async def get(self, db: AsyncSession, tag_id: str) -> Optional[RegisteredTag]:
+        tags = self._tags
+        if tags is None:
+            generation = self._generation
+            result = await db.execute(
+                select(NFCTag.tag_id, NFCTag.user_id, NFCTag.site_id, NFCTag.is_active)
+            )
+            tags = {
+                row.tag_id: RegisteredTag(row.user_id, row.site_id, bool(row.is_active))
+                for row in result
+            }
+            self.loads += 1
+            # Invalidated while loading: the rows may predate the change, so
+            # answer this lookup from them but do not keep them
+            if generation == self._generation:
+                self._tags = tags
+        return tags.get(tag_id)
+
+    def invalidate(self, key: str = "") -> None:
+        self._generation += 1
+        self._tags = None
+
+    def __len__(self) -> int:
+        return len(self._tags or ())
+
+
+nfc_registry = NFCTagRegistry()
+invalidation_channel.subscribe("nfc_tags", nfc_registry.invalidate)
+invalidation_channel.subscribe_reset(nfc_registry.invalidate)
+
+
+async def get_nfc_tags(
+    db: AsyncSession, skip: int = 0, limit: int = 100
+) -> List[NFCTag]:
+    result = await db.execute(
+        select(NFCTag).order_by(NFCTag.id).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
+
+
+async def register_nfc_tags(
+    db: AsyncSession, tags: List[NFCTagCreate]
+) -> NFCTagBulkResult:
+    """Insert new tags and overwrite existing ones, matched by tag_id"""
+    by_tag_id = {tag.tag_id: tag for tag in tags}
+    tag_ids = list(by_tag_id)
+    result = NFCTagBulkResult()
+    for start in range(0, len(tag_ids), BATCH_SIZE):
+        batch = tag_ids[start : start + BATCH_SIZE]
+        existing = dict(
+            (
+                await db.execute(
+                    select(NFCTag.tag_id, NFCTag.id).where(NFCTag.tag_id.in_(batch))
+                )
+            ).all()
+        )
+        updates = [
+            {"id": existing[tag_id], **by_tag_id[tag_id].model_dump(exclude={"tag_id"})}
+            for tag_id in batch
+            if tag_id in existing
+        ]
+        inserts = [
+            by_tag_id[tag_id].model_dump() for tag_id in batch if tag_id not in existing
+        ]
+        if updates:
+            await db.execute(update(NFCTag), updates)
+        if inserts:
+            await db.execute(insert(NFCTag), inserts)
+        result.updated += len(updates)
+        result.created += len(inserts)
+    await db.commit()
+    await invalidation_channel.publish("nfc_tags", "*")
+    return result
+
+
+async def deactivate_nfc_tags(
+    db: AsyncSession, tag_ids: List[str]
+) -> NFCTagBulkResult:
+    result = NFCTagBulkResult()
+    for start in range(0, len(tag_ids), BATCH_SIZE):
+        batch = tag_ids[start : start + BATCH_SIZE]
+        outcome = await db.execute(
+            update(NFCTag)
+            .where(NFCTag.tag_id.in_(batch), NFCTag.is_active.is_(True))
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
+        )
+        result.deactivated += outcome.rowcount
+    await db.commit()
+    await invalidation_channel.publish("nfc_tags", "*")
+    return result
+
+
+async def validate_tag(db: AsyncSession, tag_id: str, user_id: int) -> Dict:
+    """Check a scanned tag against the registry"""
+    tag = await nfc_registry.get(db, tag_id)
+    if tag is None or not tag.is_active:
+        return {"valid": False, "message": "Invalid NFC tag ID"}
+    if tag.user_id is not None and tag.user_id != user_id:
+        return {"valid": False, "message": "NFC tag is assigned to another user"}
+    return {
+        "valid": True,
+        "tag_id": tag_id,
+        "site_id": tag.site_id,
+        "message": "Valid NFC tag",
+    }
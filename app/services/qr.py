@@ -0,0 +1,129 @@
+# app/services/qr.py
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.company_site import CompanySite
+from app.utils.qr import QR_FORMATS, render_qr_code
+
+logger = logging.getLogger(__name__)
+
+
+def current_window(now: Optional[float] = None) -> int:
+    """Index of the rotation window containing `now` (epoch seconds)"""
+    return int((time.time() if now is None else now) // settings.QR_ROTATION_SECONDS)
+
+
+def window_expires_in(window: int, now: Optional[float] = None) -> int:
+    end = (window + 1) * settings.QR_ROTATION_SECONDS
+    return max(0, int(end - (time.time() if now is None else now)))
+
+
+def site_code(site_id: int, window: int) -> str:
+    """Signed check-in payload for a site, valid for one rotation window"""
+    message = f"{site_id}.{window}"
+    signature = hmac.new(
+        settings.SECRET_KEY.encode(), message.encode(), hashlib.sha256
+    ).hexdigest()[:20]
+    return f"{message}.{signature}"
+
+
+def verify_site_code(code: str, now: Optional[float] = None) -> Optional[int]:
+    """
+    Site id encoded in a rotating code, or None if the code is forged or
+    expired. The previous window is still accepted so a code scanned right
+    before rotation does not fail.
+    """
+    try:
+        site_id, window, _ = code.split(".")
+        site_id, window = int(site_id), int(window)
+    except ValueError:
+        return None
+    if current_window(now) - window not in (0, 1):
+        return None
+    if not hmac.compare_digest(site_code(site_id, window), code):
+        return None
+    return site_id
+
+
+class SiteQRRenderer:
+    """
+    Keeps ready-to-serve images of the current and next rotating code of
+    every active site, refreshed by a background task, so display screens
+    polling for their code never wait on rendering.
+    """
+
+    def __init__(self) -> None:
+        self._images: Dict[Tuple[int, int, str], bytes] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    async def get(self, site_id: int, format: str = "png") -> Tuple[bytes, int]:
+        """Image of the site's current code and the window it belongs to"""
+        window = current_window()
+        key = (site_id, window, format)
+        image = self._images.get(key)
+        if image is None:
+            # Not pre-rendered yet (a new site, or rendering disabled)
+            image = await asyncio.to_thread(
+                render_qr_code, site_code(site_id, window), settings.QR_BOX_SIZE, format
+            )
+            self._images[key] = image
+        return image, window
+
+    async def refresh(self) -> None:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(CompanySite.id).filter(CompanySite.is_active.is_(True))
+            )
+            site_ids = result.scalars().all()
+
+        window = current_window()
+        images = {}
+        for site_id in site_ids:
+            for upcoming in (window, window + 1):
+                for format in QR_FORMATS:
+                    key = (site_id, upcoming, format)
+                    # The current window was rendered as the upcoming one
+                    # on the previous refresh
+                    image = self._images.get(key)
+                    if image is None:
+                        image = await asyncio.to_thread(
+                            render_qr_code,
+                            site_code(site_id, upcoming),
+                            settings.QR_BOX_SIZE,
+                            format,
+                        )
+                    images[key] = image
+        self._images = images
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Pre-rendering site QR codes failed")
+            # Wake shortly before the next window starts; it is already rendered
+            await asyncio.sleep(max(1, window_expires_in(current_window()) - 1))
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+site_qr_renderer = SiteQRRenderer()
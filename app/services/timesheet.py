@@ -0,0 +1,236 @@
+# app/services/timesheet.py
+"""
+Company timesheets computed in one SQL statement: window functions rank each
+employee's sessions per day and total the day, an outer aggregation folds
+the days into per-employee totals. Only one row per employee reaches Python.
+"""
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import (
+    Date,
+    Integer,
+    and_,
+    case,
+    cast,
+    delete,
+    extract,
+    func,
+    or_,
+    select,
+    type_coerce,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.models.attendance import Attendance
+from app.models.timesheet_snapshot import TimesheetSnapshot
+from app.models.user import User
+from app.services.attendance_archive_manifest import ensure_not_archived
+
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _rules() -> Dict[str, Any]:
+    return {
+        "workday_hours": settings.TIMESHEET_WORKDAY_HOURS,
+        "workday_start": settings.TIMESHEET_WORKDAY_START,
+        "late_grace_minutes": settings.TIMESHEET_LATE_GRACE_MINUTES,
+        "timezone": settings.TIMESHEET_TIMEZONE,
+    }
+
+
+def _rules_key(rules: Dict[str, Any]) -> str:
+    key = "{workday_hours:g}h@{workday_start:%H:%M}+{late_grace_minutes}m".format(
+        **rules
+    )
+    # UTC snapshots keep their original keys; archived periods have no
+    # records left to recompute them from
+    if rules["timezone"] != "UTC":
+        key += f" {rules['timezone']}"
+    return key
+
+
+def _timesheet_query(
+    company_id: int,
+    start_day: date,
+    end_day: date,
+    rules: Dict[str, Any],
+    dialect: str,
+) -> Select:
+    workday_seconds = int(rules["workday_hours"] * 3600)
+    start = rules["workday_start"]
+    late_after = (
+        start.hour * 3600 + start.minute * 60 + rules["late_grace_minutes"] * 60
+    )
+
+    if dialect == "postgresql":
+        # Wall-clock check-in time in the timesheet zone, so days and late
+        # flags do not move with the session's TimeZone setting
+        zone = ZoneInfo(rules["timezone"])
+        local_check_in = func.timezone(rules["timezone"], Attendance.check_in)
+    else:
+        # SQLite stores naive UTC values
+        zone = None
+        local_check_in = Attendance.check_in
+
+    day = type_coerce(func.date(local_check_in), Date)
+    duration = extract("epoch", Attendance.check_out) - extract(
+        "epoch", Attendance.check_in
+    )
+    per_day = (Attendance.user_id, day)
+    sessions = (
+        select(
+            Attendance.user_id,
+            day.label("day"),
+            duration.label("duration"),
+            # Seconds after midnight; only each day's first session can be late
+            (extract("epoch", local_check_in) - extract("epoch", day)).label(
+                "start_offset"
+            ),
+            case(
+                (
+                    or_(
+                        Attendance.check_out.is_(None),
+                        Attendance.check_out_method == "AUTO",
+                    ),
+                    1,
+                ),
+                else_=0,
+            ).label("missing"),
+            func.row_number()
+            .over(partition_by=per_day, order_by=Attendance.check_in)
+            .label("day_seq"),
+            func.sum(duration).over(partition_by=per_day).label("day_seconds"),
+        )
+        .join(User, User.id == Attendance.user_id)
+        .where(
+            User.company_id == company_id,
+            Attendance.check_in >= datetime.combine(start_day, time.min, zone),
+            Attendance.check_in
+            < datetime.combine(end_day + timedelta(days=1), time.min, zone),
+        )
+        .subquery()
+    )
+
+    first_of_day = sessions.c.day_seq == 1
+    overtime = case(
+        (
+            and_(first_of_day, sessions.c.day_seconds > workday_seconds),
+            sessions.c.day_seconds - workday_seconds,
+        ),
+        else_=0,
+    )
+    late = case((and_(first_of_day, sessions.c.start_offset > late_after), 1), else_=0)
+    return (
+        select(
+            User.id.label("user_id"),
+            User.email,
+            User.full_name,
+            cast(func.coalesce(func.sum(sessions.c.duration), 0), Integer).label(
+                "total_seconds"
+            ),
+            cast(func.coalesce(func.sum(overtime), 0), Integer).label(
+                "overtime_seconds"
+            ),
+            func.count(sessions.c.day.distinct()).label("days_present"),
+            func.count(sessions.c.user_id).label("session_count"),
+            func.coalesce(func.sum(late), 0).label("late_arrivals"),
+            func.coalesce(func.sum(sessions.c.missing), 0).label(
+                "missing_check_outs"
+            ),
+        )
+        .outerjoin(sessions, sessions.c.user_id == User.id)
+        .where(User.company_id == company_id)
+        .group_by(User.id, User.email, User.full_name)
+        .order_by(User.id)
+    )
+
+
+async def _compute_timesheet(
+    db: AsyncSession,
+    company_id: int,
+    start_day: date,
+    end_day: date,
+    rules: Dict[str, Any],
+    finished: bool,
+) -> Dict[str, Any]:
+    result = await db.execute(
+        _timesheet_query(
+            company_id, start_day, end_day, rules, db.get_bind().dialect.name
+        )
+    )
+    return {
+        "company_id": company_id,
+        "start_date": start_day.isoformat(),
+        "end_date": end_day.isoformat(),
+        "workday_hours": rules["workday_hours"],
+        "workday_start": rules["workday_start"].isoformat(),
+        "late_grace_minutes": rules["late_grace_minutes"],
+        "finished": finished,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "entries": [dict(row) for row in result.mappings().all()],
+    }
+
+
+async def get_company_timesheet(
+    db: AsyncSession,
+    company_id: int,
+    start_day: date,
+    end_day: date,
+    refresh: bool = False,
+) -> str:
+    """
+    The timesheet as a JSON document. Periods that ended before today are
+    stored in timesheet_snapshots on first request and served from there;
+    `refresh` recomputes a stored snapshot, e.g. after corrections. Periods
+    reaching archived months can only be served from an existing snapshot
+    (ValueError otherwise): their records are gone from attendance_records.
+    """
+    rules = _rules()
+    finished = end_day < date.today()
+    if not finished:
+        ensure_not_archived(start_day)
+        report = await _compute_timesheet(
+            db, company_id, start_day, end_day, rules, finished
+        )
+        return json.dumps(report)
+
+    key = and_(
+        TimesheetSnapshot.company_id == company_id,
+        TimesheetSnapshot.start_day == start_day,
+        TimesheetSnapshot.end_day == end_day,
+        TimesheetSnapshot.rules == _rules_key(rules),
+    )
+    if not refresh:
+        payload = (
+            await db.execute(select(TimesheetSnapshot.payload).where(key))
+        ).scalar_one_or_none()
+        if payload is not None:
+            return payload
+    ensure_not_archived(start_day)
+    if refresh:
+        await db.execute(delete(TimesheetSnapshot).where(key))
+
+    payload = json.dumps(
+        await _compute_timesheet(db, company_id, start_day, end_day, rules, finished)
+    )
+    # A concurrent request may have stored the same snapshot; keep the first
+    upsert = _UPSERT_INSERTS[db.get_bind().dialect.name]
+    await db.execute(
+        upsert(TimesheetSnapshot)
+        .values(
+            company_id=company_id,
+            start_day=start_day,
+            end_day=end_day,
+            rules=_rules_key(rules),
+            payload=payload,
+        )
+        .on_conflict_do_nothing()
+    )
+    await db.commit()
+    return payload
@@ -1,12 +1,40 @@
 # app/services/user.py
-from typing import Any, Dict, Optional, Union, List
+from typing import Any, Dict, Optional, Sequence, Union, List
+from uuid import uuid4
 
-from sqlalchemy import select
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, make_transient_to_detached
 
-from app.core.security import get_password_hash, verify_password
+from app.core.config import settings
+from app.core.invalidation import invalidation_channel
+from app.core.security import get_password_hash_async, verify_password_async
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.company import invalidate_company_employees
+from app.utils.cache import TTLCache
+
+PUBLIC_USER_COLUMNS = [
+    column for column in User.__table__.columns if column.key != "hashed_password"
+]
+
+# Column snapshots of recently authenticated users, keyed by user id
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def _generation_key(id: int) -> tuple:
+    return ("generation", id)
+
+
+def _evict_user(key: str) -> None:
+    user_cache.delete(int(key))
+    user_cache.delete(_generation_key(int(key)))
+
+
+invalidation_channel.subscribe("user", _evict_user)
+invalidation_channel.subscribe_reset(user_cache.clear)
 
 
 async def get_user(db: AsyncSession, id: int) -> Optional[User]:
@@ -14,22 +42,69 @@ async def get_user(db: AsyncSession, id: int) -> Optional[User]:
     return result.scalars().first()
 
 
+async def get_user_cached(db: AsyncSession, id: int) -> Optional[User]:
+    """
+    Like get_user, but served from user_cache when possible. A cached
+    snapshot is merged into the session without emitting a SELECT.
+    """
+    snapshot = user_cache.get(id)
+    if snapshot is None:
+        # Invalidations delete the token, so a row read before an update or
+        # delete committed is never cached after it
+        generation = user_cache.get(_generation_key(id))
+        if generation is None:
+            generation = uuid4().hex
+            user_cache.set(_generation_key(id), generation)
+        user = await get_user(db, id=id)
+        if user and user_cache.get(_generation_key(id)) == generation:
+            user_cache.set(
+                id,
+                {
+                    attr.key: getattr(user, attr.key)
+                    for attr in inspect(User).column_attrs
+                },
+            )
+        return user
+
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+async def invalidate_user(id: int) -> None:
+    await invalidation_channel.publish("user", id)
+
+
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     result = await db.execute(select(User).filter(User.email == email))
     return result.scalars().first()
 
 
 async def get_users(
-    db: AsyncSession, skip: int = 0, limit: int = 100
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    as_rows: bool = False,
+    fields: Optional[Sequence[str]] = None,
 ) -> List[User]:
-    result = await db.execute(select(User).offset(skip).limit(limit))
+    if as_rows:
+        # Plain row tuples for the fast list path; never select password hashes
+        columns = PUBLIC_USER_COLUMNS
+        if fields is not None:
+            columns = [column for column in columns if column.key in fields]
+        result = await db.execute(select(*columns).offset(skip).limit(limit))
+        return result.all()
+    query = select(User).offset(skip).limit(limit)
+    if fields is not None:
+        query = query.options(load_only(*(getattr(User, field) for field in fields)))
+    result = await db.execute(query)
     return result.scalars().all()
 
 
 async def create_user(db: AsyncSession, user_create: UserCreate) -> User:
     db_user = User(
         email=user_create.email,
-        hashed_password=get_password_hash(user_create.password),
+        hashed_password=await get_password_hash_async(user_create.password),
         full_name=user_create.full_name,
         is_superuser=user_create.is_superuser,
         is_active=user_create.is_active,
@@ -38,6 +113,7 @@ async def create_user(db: AsyncSession, user_create: UserCreate) -> User:
     db.add(db_user)
     await db.commit()
     await db.refresh(db_user)
+    await invalidate_company_employees(db_user.company_id)
     return db_user
 
 
@@ -47,10 +123,11 @@ async def update_user(
     if isinstance(obj_in, dict):
         update_data = obj_in
     else:
-        update_data = obj_in.dict(exclude_unset=True)
+        update_data = obj_in.model_dump(exclude_unset=True)
     
+    previous_company_id = db_obj.company_id
     if update_data.get("password"):
-        hashed_password = get_password_hash(update_data["password"])
+        hashed_password = await get_password_hash_async(update_data["password"])
         del update_data["password"]
         update_data["hashed_password"] = hashed_password
     
@@ -61,14 +138,19 @@ async def update_user(
     db.add(db_obj)
     await db.commit()
     await db.refresh(db_obj)
+    await invalidate_user(db_obj.id)
+    await invalidate_company_employees(previous_company_id, db_obj.company_id)
     return db_obj
 
 
 async def delete_user(db: AsyncSession, id: int) -> Optional[User]:
     user = await get_user(db, id=id)
     if user:
+        company_id = user.company_id
         await db.delete(user)
         await db.commit()
+        await invalidate_user(id)
+        await invalidate_company_employees(company_id)
     return user
 
 
@@ -76,7 +158,7 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> Opti
     user = await get_user_by_email(db, email=email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return None
     return user
 
@@ -1,6 +1,13 @@
 # app/utils/geolocation.py
 import math
-from typing import Tuple, Optional
+from collections import defaultdict
+from typing import Any, DefaultDict, Iterable, List, Tuple, Optional, Union
+
+import numpy as np
+
+ArrayLike = Union[float, np.ndarray]
+
+EARTH_RADIUS_METERS = 6371000
 
 
 def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -42,3 +49,103 @@ def is_within_radius(
     """
     distance = calculate_distance(user_lat, user_lon, target_lat, target_lon)
     return distance <= radius_meters
+
+
+def calculate_distance_array(
+    lat1: ArrayLike, lon1: ArrayLike, lat2: ArrayLike, lon2: ArrayLike
+) -> np.ndarray:
+    """
+    Vectorized calculate_distance: haversine distance in meters between
+    arrays of coordinates, broadcasting scalars against arrays
+    """
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    dlat = lat2_rad - lat1_rad
+    dlon = np.radians(lon2) - np.radians(lon1)
+    a = (
+        np.sin(dlat / 2) ** 2
+        + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
+    )
+    return EARTH_RADIUS_METERS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def is_within_radius_array(
+    user_lat: ArrayLike,
+    user_lon: ArrayLike,
+    target_lat: ArrayLike,
+    target_lon: ArrayLike,
+    radius_meters: ArrayLike = 100,
+) -> np.ndarray:
+    """
+    Vectorized is_within_radius, returning a boolean array
+    """
+    distance = calculate_distance_array(user_lat, user_lon, target_lat, target_lon)
+    return distance <= radius_meters
+
+
+# Meters per degree of latitude (and of longitude at the equator)
+METERS_PER_DEGREE = 111320
+
+
+class SiteIndex:
+    """
+    Uniform grid over lat/lon for point-in-geofence lookups. Each site is
+    registered in every cell its bounding box touches, so a lookup only runs
+    the haversine check against the few sites sharing the point's cell.
+    Sites are (key, latitude, longitude, radius_meters) tuples.
+    """
+
+    def __init__(
+        self,
+        sites: Iterable[Tuple[Any, float, float, float]] = (),
+        cell_degrees: float = 0.01,
+    ) -> None:
+        self.cell_degrees = cell_degrees
+        self._cells: DefaultDict[Tuple[int, int], List[tuple]] = defaultdict(list)
+        self._keys = set()
+        for site in sites:
+            self.add(*site)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (
+            math.floor(lat / self.cell_degrees),
+            math.floor(lon / self.cell_degrees),
+        )
+
+    def add(self, key: Any, lat: float, lon: float, radius_meters: float) -> None:
+        dlat = radius_meters / METERS_PER_DEGREE
+        meters_per_lon_degree = METERS_PER_DEGREE * math.cos(math.radians(lat))
+        if radius_meters < 180 * meters_per_lon_degree:
+            dlon = radius_meters / meters_per_lon_degree
+            min_lon, max_lon = lon - dlon, lon + dlon
+        else:
+            # Near the poles the circle spans every longitude; cap the columns
+            # at one turn of the globe instead of letting the span blow up
+            min_lon, max_lon = -180.0, 180.0
+        bbox = (lat - dlat, lat + dlat, min_lon, max_lon)
+        min_row, min_col = self._cell(bbox[0], bbox[2])
+        max_row, max_col = self._cell(bbox[1], bbox[3])
+        entry = (key, lat, lon, radius_meters, bbox)
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                self._cells[(row, col)].append(entry)
+        self._keys.add(key)
+
+    def find(self, lat: float, lon: float) -> Optional[Any]:
+        """Key of the nearest site whose radius contains the point, if any"""
+        best_key, best_distance = None, math.inf
+        for key, site_lat, site_lon, radius, bbox in self._cells.get(
+            self._cell(lat, lon), ()
+        ):
+            if not (bbox[0] <= lat <= bbox[1] and bbox[2] <= lon <= bbox[3]):
+                continue
+            distance = calculate_distance(lat, lon, site_lat, site_lon)
+            if distance <= radius and distance < best_distance:
+                best_key, best_distance = key, distance
+        return best_key
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._keys
@@ -0,0 +1,26 @@
+# app/utils/pagination.py
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Tuple
+
+
+def encode_cursor(check_in: datetime, id: int) -> str:
+    """
+    Encode a (check_in, id) keyset position as an opaque URL-safe cursor
+    """
+    raw = json.dumps([check_in.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor, raising ValueError if malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        check_in, id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(check_in), int(id)
+    except (binascii.Error, TypeError, ValueError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
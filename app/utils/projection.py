@@ -0,0 +1,45 @@
+# app/utils/projection.py
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+
+def parse_fields(
+    fields: Optional[str], schema: Type[BaseModel]
+) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma-separated `fields=` value against the fields of a response
+    schema, raising ValueError for unknown names. None means all fields.
+    """
+    if fields is None:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    if not requested:
+        raise ValueError("No fields requested")
+    unknown = [name for name in requested if name not in schema.model_fields]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # Keep the schema's field order so equal selections share one adapter
+    return tuple(name for name in schema.model_fields if name in requested)
+
+
+@lru_cache(maxsize=128)
+def list_adapter(
+    schema: Type[BaseModel], fields: Optional[Tuple[str, ...]] = None
+) -> TypeAdapter:
+    """
+    TypeAdapter for a list of `schema`, or of a model carrying only `fields`
+    (same types and defaults) when a sparse fieldset is requested
+    """
+    if fields is not None:
+        model_fields = schema.model_fields
+        schema = create_model(
+            f"{schema.__name__}Fields",
+            __config__=ConfigDict(from_attributes=True),
+            **{
+                name: (model_fields[name].annotation, model_fields[name])
+                for name in fields
+            },
+        )
+    return TypeAdapter(List[schema])
@@ -1,12 +1,17 @@
 # app/utils/qr.py
 import qrcode
+import qrcode.image.svg
 import io
 import base64
 from typing import Optional
 
-def generate_qr_code(data: str, size: int = 10) -> str:
+QR_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def render_qr_code(data: str, size: int = 10, format: str = "png") -> bytes:
     """
-    Generate QR code for given data and return as base64 string
+    Render a QR code as PNG or SVG bytes; SVG skips rasterization and is much
+    cheaper. Not cached: rotating site codes are kept by SiteQRRenderer.
     """
     qr = qrcode.QRCode(
         version=1,
@@ -16,9 +21,20 @@ def generate_qr_code(data: str, size: int = 10) -> str:
     )
     qr.add_data(data)
     qr.make(fit=True)
-    
+
+    if format == "svg":
+        img = qr.make_image(image_factory=qrcode.image.svg.SvgPathImage)
+        return img.to_string(encoding="unicode").encode("utf-8")
+
     img = qr.make_image(fill_color="black", back_color="white")
-    
+
     buffer = io.BytesIO()
     img.save(buffer, format="PNG")
-    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+    return buffer.getvalue()
+
+
+def generate_qr_code(data: str, size: int = 10) -> str:
+    """
+    Generate QR code for given data and return as base64 string
+    """
+    return base64.b64encode(render_qr_code(data, size)).decode("utf-8")
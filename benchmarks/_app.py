@@ -0,0 +1,109 @@
+# benchmarks/_app.py
+"""
+Helpers for driving the FastAPI app in-process against a throwaway SQLite
+database, so benchmarks run without Docker or PostgreSQL.
+"""
+import os
+import statistics
+import tempfile
+from typing import Dict, List, Sequence, Tuple
+
+os.environ.setdefault("POSTGRES_SERVER", "localhost")
+os.environ.setdefault("POSTGRES_USER", "bench")
+os.environ.setdefault("POSTGRES_PASSWORD", "bench")
+os.environ.setdefault("POSTGRES_DB", "bench")
+os.environ.setdefault("FIRST_SUPERUSER", "admin@example.com")
+os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "admin")
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import (  # noqa: E402
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token, get_password_hash  # noqa: E402
+from app.db.base_class import Base  # noqa: E402
+from app.db.session import get_db, get_session_factory  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.attendance_ingest import attendance_ingestor  # noqa: E402
+
+API = settings.API_V1_STR
+
+
+async def bootstrap(db_path: str = "") -> Tuple[AsyncEngine, sessionmaker]:
+    """Create a fresh SQLite schema and route the app's sessions to it"""
+    if not db_path:
+        db_path = os.path.join(tempfile.mkdtemp(prefix="workcheck-bench-"), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def _get_db():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+    attendance_ingestor.session_factory = session_factory
+    return engine, session_factory
+
+
+async def seed_users(
+    session_factory: sessionmaker, count: int, password: str = "password"
+) -> List[int]:
+    """Insert `count` active users sharing one password hash; return their ids"""
+    hashed = get_password_hash(password)
+    async with session_factory() as db:
+        result = await db.execute(
+            insert(User).returning(User.id),
+            [
+                {
+                    "email": f"user{i}@example.com",
+                    "hashed_password": hashed,
+                    "full_name": f"User {i}",
+                    "is_active": True,
+                    "is_superuser": False,
+                }
+                for i in range(count)
+            ],
+        )
+        ids = list(result.scalars().all())
+        await db.commit()
+    return ids
+
+
+def auth_headers(user_id: int) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {create_access_token(user_id)}"}
+
+
+def client(base_url: str = "") -> httpx.AsyncClient:
+    """An HTTP client for a running server, or the in-process app if no URL"""
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=60)
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60
+    )
+
+
+def latency_summary(samples: Sequence[float]) -> Dict[str, float]:
+    """Count and p50/p95/p99/max latency in milliseconds"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    if len(ordered) > 1:
+        cuts = statistics.quantiles(ordered, n=100, method="inclusive")
+    else:
+        cuts = ordered * 99
+    return {
+        "count": len(ordered),
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
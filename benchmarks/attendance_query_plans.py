@@ -0,0 +1,129 @@
+# benchmarks/attendance_query_plans.py
+"""
+Compare query plans for the hot attendance queries with and without the
+indexes added in migration 0002.
+
+Seeds a scratch table shaped like attendance_records (10M rows by default)
+in the target PostgreSQL database, runs EXPLAIN (ANALYZE, BUFFERS) for each
+query, adds the indexes and runs them again.
+
+    python -m benchmarks.attendance_query_plans --dsn postgresql://u:p@localhost/bench
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import asyncpg
+
+TABLE = "bench_attendance_records"
+
+INDEXES = [
+    f"CREATE INDEX ON {TABLE} (user_id, check_in DESC)",
+    f"CREATE INDEX ON {TABLE} (user_id) WHERE check_out IS NULL",
+    f"CREATE INDEX ON {TABLE} (check_in)",
+]
+
+QUERIES = {
+    "current_status": (
+        f"SELECT * FROM {TABLE} WHERE user_id = $1 "
+        "AND check_in >= $2 AND check_in <= $2 + interval '1 day' "
+        "ORDER BY check_in DESC LIMIT 1",
+        lambda users: (users // 2, datetime(2025, 3, 2, tzinfo=timezone.utc)),
+    ),
+    "user_history": (
+        f"SELECT * FROM {TABLE} WHERE user_id = $1 "
+        "ORDER BY check_in DESC, id DESC LIMIT 100",
+        lambda users: (users // 3,),
+    ),
+    "open_session": (
+        f"SELECT id FROM {TABLE} WHERE user_id = $1 AND check_out IS NULL",
+        lambda users: (users // 4,),
+    ),
+    "date_range": (
+        f"SELECT * FROM {TABLE} WHERE check_in >= $1 "
+        "AND check_in <= $1 + interval '1 day' "
+        "ORDER BY check_in DESC, id DESC LIMIT 100",
+        lambda users: (datetime(2025, 3, 14, tzinfo=timezone.utc),),
+    ),
+}
+
+
+async def seed(conn: asyncpg.Connection, rows: int, users: int) -> None:
+    await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    await conn.execute(
+        f"""
+        CREATE TABLE {TABLE} (
+            id serial PRIMARY KEY,
+            user_id integer,
+            check_in timestamptz,
+            check_out timestamptz,
+            latitude double precision,
+            longitude double precision,
+            check_in_method varchar,
+            check_out_method varchar,
+            notes varchar,
+            created_at timestamptz DEFAULT now(),
+            updated_at timestamptz
+        )
+        """
+    )
+    # One session per user per day, newest day leaves ~1% of sessions open
+    started = time.perf_counter()
+    await conn.execute(
+        f"""
+        INSERT INTO {TABLE} (user_id, check_in, check_out, check_in_method)
+        SELECT
+            (g % $2) + 1,
+            ts,
+            CASE WHEN g > $1 - $2 / 100 THEN NULL ELSE ts + interval '8 hours' END,
+            'QR'
+        FROM generate_series(1, $1) AS g,
+        LATERAL (
+            SELECT timestamptz '2024-01-01 08:00' + ((g / $2) * interval '1 day')
+                + ((g % 60) * interval '1 minute') AS ts
+        ) AS t
+        """,
+        rows,
+        users,
+    )
+    await conn.execute(f"ANALYZE {TABLE}")
+    print(f"seeded {rows} rows in {time.perf_counter() - started:.1f}s")
+
+
+async def explain_all(conn: asyncpg.Connection, users: int, label: str) -> None:
+    print(f"\n===== {label} =====")
+    for name, (sql, params) in QUERIES.items():
+        plan = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", *params(users))
+        print(f"\n--- {name}")
+        for row in plan:
+            print(row[0])
+
+
+async def main(dsn: str, rows: int, users: int, keep: bool) -> None:
+    conn = await asyncpg.connect(dsn)
+    try:
+        await seed(conn, rows, users)
+        await explain_all(conn, users, "before (primary key only)")
+        for ddl in INDEXES:
+            started = time.perf_counter()
+            await conn.execute(ddl)
+            print(f"{ddl}: {time.perf_counter() - started:.1f}s")
+        await conn.execute(f"ANALYZE {TABLE}")
+        await explain_all(conn, users, "after (migration 0002 indexes)")
+    finally:
+        if not keep:
+            await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--dsn", required=True, help="asyncpg DSN of a scratch database"
+    )
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded table")
+    args = parser.parse_args()
+    asyncio.run(main(args.dsn, args.rows, args.users, args.keep))
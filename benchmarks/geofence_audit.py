@@ -0,0 +1,81 @@
+# benchmarks/geofence_audit.py
+"""
+Compare the scalar is_within_radius loop with the NumPy-vectorized path
+used by the geofence audit, over synthetic check-in coordinates.
+
+    python -m benchmarks.geofence_audit --records 1000000 --fences 5
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.services.geofence_audit import nearest_fence_distance
+from app.utils.geolocation import is_within_radius
+
+
+def synthetic(records: int, fences: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    centres = rng.uniform([6.4, 3.3], [6.7, 3.6], size=(fences, 2))
+    fence_list = [(lat, lon, 150.0) for lat, lon in centres]
+    # Most points jitter around a fence centre, some land anywhere in the city
+    picks = centres[rng.integers(0, fences, records)]
+    lats = picks[:, 0] + rng.normal(0, 0.001, records)
+    lons = picks[:, 1] + rng.normal(0, 0.001, records)
+    return lats, lons, fence_list
+
+
+def scalar_audit(lats, lons, fences) -> int:
+    flagged = 0
+    for lat, lon in zip(lats.tolist(), lons.tolist()):
+        if not any(
+            is_within_radius(lat, lon, f_lat, f_lon, radius)
+            for f_lat, f_lon, radius in fences
+        ):
+            flagged += 1
+    return flagged
+
+
+def vectorized_audit(lats, lons, fences, chunk_size: int) -> int:
+    flagged = 0
+    for start in range(0, len(lats), chunk_size):
+        _, inside = nearest_fence_distance(
+            lats[start : start + chunk_size], lons[start : start + chunk_size], fences
+        )
+        flagged += int((~inside).sum())
+    return flagged
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    value = func(*args)
+    return value, time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--fences", type=int, default=5)
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    lats, lons, fences = synthetic(args.records, args.fences)
+    scalar_flagged, scalar_s = timed(scalar_audit, lats, lons, fences)
+    vector_flagged, vector_s = timed(
+        vectorized_audit, lats, lons, fences, args.chunk_size
+    )
+    assert scalar_flagged == vector_flagged, (scalar_flagged, vector_flagged)
+    print(
+        json.dumps(
+            {
+                "records": args.records,
+                "fences": args.fences,
+                "flagged": vector_flagged,
+                "scalar_s": round(scalar_s, 3),
+                "vectorized_s": round(vector_s, 3),
+                "speedup": round(scalar_s / vector_s, 1),
+            },
+            indent=2,
+        )
+    )
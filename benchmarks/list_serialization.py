@@ -0,0 +1,116 @@
+# benchmarks/list_serialization.py
+"""
+Compare list responses built from ORM objects through response_model (the
+previous path) with row tuples validated and serialized by a TypeAdapter,
+for GET /attendance/ and GET /users/ at 1k and 10k rows.
+
+    python -m benchmarks.list_serialization --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from benchmarks._app import API, auth_headers, bootstrap, client, seed_users
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.main import app
+from app.models.attendance import Attendance
+from app.models.user import User
+from app.schemas.attendance import Attendance as AttendanceSchema
+from app.schemas.user import User as UserSchema
+from app.services.attendance import get_attendance
+from app.services.user import get_users
+
+# The pre-fast-path endpoints, mounted on a separate app
+baseline = FastAPI()
+
+
+@baseline.get("/attendance/", response_model=List[AttendanceSchema])
+async def baseline_attendance(limit: int, db: AsyncSession = Depends(get_db)):
+    return await get_attendance(db, limit=limit)
+
+
+@baseline.get("/users/", response_model=List[UserSchema])
+async def baseline_users(limit: int, db: AsyncSession = Depends(get_db)):
+    return await get_users(db, limit=limit)
+
+
+async def seed(session_factory, rows: int) -> int:
+    user_ids = await seed_users(session_factory, rows)
+    start = datetime(2024, 1, 1, 8)
+    async with session_factory() as db:
+        await db.execute(
+            update(User).where(User.id == user_ids[0]).values(is_superuser=True)
+        )
+        await db.execute(
+            insert(Attendance),
+            [
+                {
+                    "user_id": user_ids[i % len(user_ids)],
+                    "check_in": start + timedelta(minutes=i),
+                    "check_out": start + timedelta(minutes=i, hours=8),
+                    "check_in_method": "QR",
+                    "check_out_method": "QR",
+                    "notes": "seeded",
+                }
+                for i in range(rows)
+            ],
+        )
+        await db.commit()
+    return user_ids[0]
+
+
+async def timed(http: httpx.AsyncClient, url: str, headers, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await http.get(url, headers=headers)
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return {
+        "best_ms": round(min(timings) * 1000, 2),
+        "bytes": len(response.content),
+    }
+
+
+async def main(sizes: List[int], repeat: int) -> dict:
+    _, session_factory = await bootstrap()
+    baseline.dependency_overrides = app.dependency_overrides
+    admin_id = await seed(session_factory, max(sizes))
+    headers = auth_headers(admin_id)
+
+    report = {}
+    legacy = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=baseline), base_url="http://baseline"
+    )
+    async with client() as http, legacy:
+        for resource in ("attendance", "users"):
+            for size in sizes:
+                before = await timed(
+                    legacy, f"/{resource}/?limit={size}", None, repeat
+                )
+                after = await timed(
+                    http, f"{API}/{resource}/?limit={size}", headers, repeat
+                )
+                report[f"{resource}_{size}"] = {
+                    "orm_response_model": before,
+                    "rows_typeadapter": after,
+                    "speedup": round(before["best_ms"] / after["best_ms"], 2),
+                }
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.sizes, args.repeat)), indent=2))
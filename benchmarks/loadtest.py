@@ -0,0 +1,226 @@
+# benchmarks/loadtest.py
+"""
+Simulate a shift-start storm: every employee logs in, checks in at a random
+moment within the ramp window, polls /attendance/status and checks out.
+Reports throughput and latency percentiles per endpoint as JSON so runs can
+be compared across commits.
+
+In-process against a throwaway SQLite database:
+
+    python -m benchmarks.loadtest --employees 500 --ramp 30
+
+Against a running server (users are created through the API as the first
+superuser):
+
+    python -m benchmarks.loadtest --base-url http://localhost:8000 \\
+        --admin-email admin@example.com --admin-password secret
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks._app import API, bootstrap, client, latency_summary, seed_users
+
+from app.core.config import settings
+from app.services.attendance_ingest import attendance_ingestor
+
+PASSWORD = "password"
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(
+        self, http: httpx.AsyncClient, name: str, method: str, url: str, **kwargs
+    ) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await http.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        self.latencies[name].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            samples = self.latencies[name]
+            endpoints[name] = dict(
+                latency_summary(samples),
+                errors=self.errors[name],
+                throughput_rps=round(len(samples) / elapsed, 2) if elapsed else 0.0,
+            )
+        total = sum(len(samples) for samples in self.latencies.values())
+        return {
+            "elapsed_s": round(elapsed, 3),
+            "requests": total,
+            "errors": sum(self.errors.values()),
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+async def employee(
+    http: httpx.AsyncClient,
+    recorder: Recorder,
+    email: str,
+    arrival: float,
+    polls: int,
+    poll_interval: float,
+) -> None:
+    await asyncio.sleep(arrival)
+    response = await recorder.request(
+        http,
+        "login",
+        "POST",
+        f"{API}/login/access-token",
+        data={"username": email, "password": PASSWORD},
+    )
+    if response is None or response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    await recorder.request(
+        http,
+        "check_in",
+        "POST",
+        f"{API}/attendance/check-in",
+        json={"check_in_method": "MANUAL"},
+        headers=headers,
+    )
+    for _ in range(polls):
+        await asyncio.sleep(poll_interval * random.uniform(0.5, 1.5))
+        await recorder.request(
+            http, "status", "GET", f"{API}/attendance/status", headers=headers
+        )
+    await recorder.request(
+        http,
+        "check_out",
+        "POST",
+        f"{API}/attendance/check-out",
+        json={"check_out_method": "MANUAL"},
+        headers=headers,
+    )
+
+
+async def create_remote_users(
+    http: httpx.AsyncClient, count: int, admin_email: str, admin_password: str
+) -> List[str]:
+    response = await http.post(
+        f"{API}/login/access-token",
+        data={"username": admin_email, "password": admin_password},
+    )
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    run_id = int(time.time())
+    emails = [f"loadtest-{run_id}-{i}@example.com" for i in range(count)]
+    for email in emails:
+        response = await http.post(
+            f"{API}/users/",
+            json={"email": email, "password": PASSWORD, "full_name": "Load Test"},
+            headers=headers,
+        )
+        response.raise_for_status()
+    return emails
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    random.seed(args.seed)
+    async with client(args.base_url) as http:
+        if args.base_url:
+            emails = await create_remote_users(
+                http, args.employees, args.admin_email, args.admin_password
+            )
+        else:
+            if args.ingest_mode:
+                settings.ATTENDANCE_INGEST_MODE = args.ingest_mode
+            _, session_factory = await bootstrap()
+            await seed_users(session_factory, args.employees, password=PASSWORD)
+            emails = [f"user{i}@example.com" for i in range(args.employees)]
+
+        recorder = Recorder()
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                employee(
+                    http,
+                    recorder,
+                    email,
+                    random.uniform(0, args.ramp),
+                    args.polls,
+                    args.poll_interval,
+                )
+                for email in emails
+            )
+        )
+        elapsed = time.perf_counter() - started
+        await attendance_ingestor.stop()
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "target": args.base_url or "in-process",
+            "ingest_mode": args.ingest_mode or settings.ATTENDANCE_INGEST_MODE,
+            "employees": args.employees,
+            "ramp_s": args.ramp,
+            "polls": args.polls,
+            "poll_interval_s": args.poll_interval,
+            "seed": args.seed,
+        },
+        **recorder.report(elapsed),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument(
+        "--ramp", type=float, default=10.0, help="seconds over which arrivals spread"
+    )
+    parser.add_argument("--polls", type=int, default=3)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--base-url", default="", help="target a running server")
+    parser.add_argument("--admin-email", default="admin@example.com")
+    parser.add_argument("--admin-password", default="admin")
+    parser.add_argument(
+        "--ingest-mode",
+        choices=["direct", "batched"],
+        help="in-process only: override ATTENDANCE_INGEST_MODE",
+    )
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(report + "\n")
+    print(report)
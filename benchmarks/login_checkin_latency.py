@@ -0,0 +1,99 @@
+# benchmarks/login_checkin_latency.py
+"""
+Measure check-in latency while a burst of logins is in flight.
+
+Runs the app in-process against SQLite. With --blocking the services use
+the synchronous bcrypt calls on the event loop, which is how logins behaved
+before hashing was moved to a worker pool.
+
+    python -m benchmarks.login_checkin_latency --logins 200 --employees 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks._app import (
+    API,
+    auth_headers,
+    bootstrap,
+    client,
+    latency_summary,
+    seed_users,
+)
+
+import app.services.user as user_service
+from app.core.security import password_hash_stats, verify_password
+
+
+async def _blocking_verify(plain_password: str, hashed_password: str) -> bool:
+    return verify_password(plain_password, hashed_password)
+
+
+async def run(logins: int, employees: int, rounds: int) -> dict:
+    _, session_factory = await bootstrap()
+    user_ids = await seed_users(session_factory, employees + 1)
+    login_email = "user0@example.com"
+    checkin_users = user_ids[1:]
+
+    login_latencies = []
+    checkin_latencies = []
+
+    async with client() as http:
+
+        async def login() -> None:
+            started = time.perf_counter()
+            response = await http.post(
+                f"{API}/login/access-token",
+                data={"username": login_email, "password": "password"},
+            )
+            response.raise_for_status()
+            login_latencies.append(time.perf_counter() - started)
+
+        async def employee(user_id: int) -> None:
+            headers = auth_headers(user_id)
+            for _ in range(rounds):
+                started = time.perf_counter()
+                response = await http.post(
+                    f"{API}/attendance/check-in",
+                    json={"check_in_method": "MANUAL"},
+                    headers=headers,
+                )
+                response.raise_for_status()
+                checkin_latencies.append(time.perf_counter() - started)
+                await http.post(
+                    f"{API}/attendance/check-out",
+                    json={"check_out_method": "MANUAL"},
+                    headers=headers,
+                )
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(login() for _ in range(logins)),
+            *(employee(user_id) for user_id in checkin_users),
+        )
+        elapsed = time.perf_counter() - started
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "check_in": latency_summary(checkin_latencies),
+        "login": latency_summary(login_latencies),
+        "password_hash_pool": password_hash_stats(),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--blocking",
+        action="store_true",
+        help="verify passwords on the event loop (pre-offload behaviour)",
+    )
+    args = parser.parse_args()
+    if args.blocking:
+        user_service.verify_password_async = _blocking_verify
+    report = asyncio.run(run(args.logins, args.employees, args.rounds))
+    print(json.dumps(report, indent=2))
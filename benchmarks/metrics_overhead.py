@@ -0,0 +1,137 @@
+# benchmarks/metrics_overhead.py
+"""
+Measure what the metrics middleware and SQL event hooks add to each request
+and statement, next to the latency of a real in-process request.
+
+    python -m benchmarks.metrics_overhead --requests 50000 --statements 50000
+"""
+import argparse
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from benchmarks._app import API, auth_headers, bootstrap, client, seed_users
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+
+from app.core import metrics
+
+
+async def _plain_app(scope, receive, send) -> None:
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def _noop_send(message) -> None:
+    pass
+
+
+async def _time_asgi(asgi_app, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/bench",
+        "route": SimpleNamespace(path="/bench"),
+    }
+    started = time.perf_counter()
+    for _ in range(requests):
+        await asgi_app(dict(scope), None, _noop_send)
+    return (time.perf_counter() - started) / requests
+
+
+def _time_statements(statements: int) -> float:
+    engine = create_engine("sqlite://")
+    with engine.connect() as conn:
+        query = text("select 1")
+        started = time.perf_counter()
+        for _ in range(statements):
+            conn.execute(query).scalar()
+        elapsed = time.perf_counter() - started
+    engine.dispose()
+    return elapsed / statements
+
+
+def statement_overhead(statements: int) -> dict:
+    token = metrics.current_query_stats.set(metrics.QueryStats())
+    try:
+        hooked = _time_statements(statements)
+        hooks = [
+            ("before_cursor_execute", metrics._before_cursor_execute),
+            ("after_cursor_execute", metrics._after_cursor_execute),
+            ("handle_error", metrics._handle_error),
+        ]
+        for name, fn in hooks:
+            event.remove(Engine, name, fn)
+        try:
+            bare = _time_statements(statements)
+        finally:
+            for name, fn in hooks:
+                event.listen(Engine, name, fn)
+    finally:
+        metrics.current_query_stats.reset(token)
+    return {
+        "bare_us": round(bare * 1e6, 3),
+        "instrumented_us": round(hooked * 1e6, 3),
+        "overhead_us": round((hooked - bare) * 1e6, 3),
+    }
+
+
+async def request_overhead(requests: int) -> dict:
+    middleware = metrics.MetricsMiddleware(_plain_app)
+    bare = await _time_asgi(_plain_app, requests)
+    wrapped = await _time_asgi(middleware, requests)
+    metrics.request_duration.clear()
+    metrics.request_db_statements.clear()
+    metrics.request_db_duration.clear()
+    return {
+        "bare_us": round(bare * 1e6, 3),
+        "instrumented_us": round(wrapped * 1e6, 3),
+        "overhead_us": round((wrapped - bare) * 1e6, 3),
+    }
+
+
+async def reference_request(samples: int) -> float:
+    """Median in-process latency of GET /users/me against SQLite, in µs"""
+    _, session_factory = await bootstrap()
+    (user_id,) = await seed_users(session_factory, 1)
+    headers = auth_headers(user_id)
+    timings = []
+    async with client() as http:
+        for _ in range(samples):
+            started = time.perf_counter()
+            response = await http.get(f"{API}/users/me", headers=headers)
+            timings.append(time.perf_counter() - started)
+            response.raise_for_status()
+    timings.sort()
+    return timings[len(timings) // 2] * 1e6
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--statements", type=int, default=50000)
+    parser.add_argument("--samples", type=int, default=500)
+    args = parser.parse_args()
+
+    per_request = await request_overhead(args.requests)
+    per_statement = statement_overhead(args.statements)
+    reference_us = await reference_request(args.samples)
+    # A typical authenticated request runs a handful of statements
+    typical_us = per_request["overhead_us"] + 3 * per_statement["overhead_us"]
+    print(
+        json.dumps(
+            {
+                "middleware_per_request": per_request,
+                "sql_hooks_per_statement": per_statement,
+                "reference_request_p50_us": round(reference_us, 1),
+                "typical_overhead_pct": round(100 * typical_us / reference_us, 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
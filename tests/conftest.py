@@ -0,0 +1,75 @@
+# tests/conftest.py
+import os
+
+os.environ.setdefault("POSTGRES_SERVER", "localhost")
+os.environ.setdefault("POSTGRES_USER", "test")
+os.environ.setdefault("POSTGRES_PASSWORD", "test")
+os.environ.setdefault("POSTGRES_DB", "test")
+os.environ.setdefault("FIRST_SUPERUSER", "admin@example.com")
+os.environ.setdefault("FIRST_SUPERUSER_PASSWORD", "admin")
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base_class import Base  # noqa: E402
+from app.db.session import get_db, get_session_factory  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.company import company_cache  # noqa: E402
+from app.services.company_site import site_index_cache  # noqa: E402
+from app.services.idempotency import idempotency_cache  # noqa: E402
+from app.services.nfc import nfc_registry  # noqa: E402
+from app.services.user import user_cache  # noqa: E402
+from tests import utils  # noqa: E402
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def _get_db():
+        async with factory() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = _get_db
+    app.dependency_overrides[get_session_factory] = lambda: factory
+    yield factory
+    app.dependency_overrides.clear()
+    user_cache.clear()
+    site_index_cache.clear()
+    company_cache.clear()
+    idempotency_cache.clear()
+    nfc_registry.invalidate()
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db(session_factory):
+    async with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+async def client(session_factory):
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    ) as http:
+        yield http
+
+
+@pytest.fixture
+def auth_headers():
+    def _headers(user_id: int):
+        return {"Authorization": f"Bearer {create_access_token(user_id)}"}
+
+    return _headers
+
+
+@pytest.fixture
+def assert_max_queries():
+    return utils.assert_max_queries
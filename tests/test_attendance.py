@@ -0,0 +1,1040 @@
+# tests/test_attendance.py
+import asyncio
+import csv
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql.elements import TextClause
+
+from app.core.config import settings
+from app.models.attendance import Attendance
+from app.models.attendance_summary import DailyAttendanceSummary
+from app.models.company import Company
+from app.models.company_site import CompanySite
+from app.models.nfc_tag import NFCTag
+from app.models.user import User
+from app.schemas.attendance import Attendance as AttendanceSchema
+from app.services.attendance import check_in, close_earlier_month_sessions
+from app.services.attendance_archive import (
+    archive_attendance,
+    get_archived_attendance,
+)
+from app.services.attendance_import import import_attendance
+from app.services.attendance_partitions import (
+    DEFAULT_PARTITION,
+    create_partition,
+    maintain_partitions,
+    partition_name,
+)
+from app.services.attendance_ingest import AttendanceIngestor
+from app.services.attendance_summary import rebuild_daily_summary
+from app.services.idempotency import idempotency_cache
+from app.services.nfc import NFCTagRegistry, nfc_registry, validate_tag
+from app.services.qr import current_window, site_code
+from app.utils.pagination import encode_cursor
+from app.utils.projection import list_adapter
+
+API = settings.API_V1_STR
+
+
+async def _seed_attendance(db, rows: int) -> int:
+    user_id = (
+        await db.execute(
+            insert(User).returning(User.id),
+            [
+                {
+                    "email": "admin@example.com",
+                    "hashed_password": "x",
+                    "is_superuser": True,
+                }
+            ],
+        )
+    ).scalar_one()
+    start = datetime(2024, 1, 1, 8)
+    if rows:
+        await db.execute(
+            insert(Attendance),
+            [
+                {
+                    "user_id": user_id,
+                    "check_in": start + timedelta(days=i),
+                    "check_out": start + timedelta(days=i, hours=8),
+                    "check_in_method": "QR",
+                    "notes": "x" * 500,
+                }
+                for i in range(rows)
+            ],
+        )
+    await db.commit()
+    return user_id
+
+
+async def test_read_attendance_sparse_fieldset(db, client, auth_headers):
+    user_id = await _seed_attendance(db, rows=3)
+
+    response = await client.get(
+        f"{API}/attendance/",
+        params={"fields": "check_out,user_id,check_in", "limit": 2},
+        headers=auth_headers(user_id),
+    )
+
+    assert response.status_code == 200
+    assert [sorted(row) for row in response.json()] == [
+        ["check_in", "check_out", "user_id"]
+    ] * 2
+    # Keyset columns are still fetched for the next-page cursor
+    assert "X-Next-Cursor" in response.headers
+
+
+async def test_cursor_pages_walk_equal_check_in_times(db, client, auth_headers):
+    user_id = await _seed_attendance(db, rows=0)
+    same, earlier = datetime(2024, 1, 2, 8), datetime(2024, 1, 1, 8)
+    await db.execute(
+        insert(Attendance),
+        [
+            {
+                "user_id": user_id,
+                "check_in": check_in_time,
+                "check_out": check_in_time + timedelta(hours=8),
+            }
+            for check_in_time in [same] * 5 + [earlier] * 2
+        ],
+    )
+    await db.commit()
+    expected = (
+        await db.execute(
+            select(Attendance.id).order_by(
+                Attendance.check_in.desc(), Attendance.id.desc()
+            )
+        )
+    ).scalars().all()
+
+    seen, pages, params = [], 0, {"limit": 2}
+    while True:
+        response = await client.get(
+            f"{API}/attendance/", params=params, headers=auth_headers(user_id)
+        )
+        assert response.status_code == 200
+        seen += [row["id"] for row in response.json()]
+        pages += 1
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+    # Ties on check_in are broken by id, so pages neither repeat nor skip rows
+    assert seen == expected
+    assert pages == 4
+
+
+async def test_list_and_detail_format_datetimes_alike(db, client, auth_headers):
+    user_id = await _seed_attendance(db, rows=1)
+    headers = auth_headers(user_id)
+
+    listed = (await client.get(f"{API}/attendance/", headers=headers)).json()[0]
+    detail = (
+        await client.get(f"{API}/attendance/{listed['id']}", headers=headers)
+    ).json()
+    assert {key: listed[key] for key in detail} == detail
+
+    # PostgreSQL returns aware UTC values; the list path must write them the
+    # way single-record responses do ("Z", not "+00:00")
+    check_in_time = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    record = AttendanceSchema.model_validate(
+        {"id": 1, "user_id": user_id, "check_in": check_in_time}
+    )
+    adapter = list_adapter(AttendanceSchema)
+    assert json.loads(adapter.dump_json([record]))[0]["check_in"] == json.loads(
+        record.model_dump_json()
+    )["check_in"] == "2024-01-01T00:00:00Z"
+
+
+async def test_read_attendance_unknown_field(db, client, auth_headers):
+    user_id = await _seed_attendance(db, rows=1)
+
+    response = await client.get(
+        f"{API}/attendance/",
+        params={"fields": "user_id,hashed_password"},
+        headers=auth_headers(user_id),
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown fields: hashed_password"
+
+
+async def test_export_streams_csv_and_ndjson(
+    db, client, auth_headers, monkeypatch
+):
+    user_id = await _seed_attendance(db, rows=5)
+    # Several batches, so the CSV header must only be written once
+    monkeypatch.setattr(settings, "ATTENDANCE_EXPORT_BATCH_SIZE", 2)
+    headers = auth_headers(user_id)
+
+    async with client.stream(
+        "GET", f"{API}/attendance/export", headers=headers
+    ) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        body = "".join([chunk async for chunk in response.aiter_text()])
+    rows = list(csv.DictReader(body.splitlines()))
+    assert [row["check_in"] for row in rows] == [
+        datetime(2024, 1, 1 + i, 8).isoformat() for i in range(5)
+    ]
+
+    response = await client.get(
+        f"{API}/attendance/export",
+        params={"format": "ndjson", "start_date": "2024-01-03T00:00:00"},
+        headers=headers,
+    )
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["user_id"] for record in records] == [user_id] * 3
+    assert records[0]["check_in"] == datetime(2024, 1, 3, 8).isoformat()
+
+
+async def test_read_attendance_not_modified(db, client, auth_headers):
+    user_id = await _seed_attendance(db, rows=3)
+    headers = auth_headers(user_id)
+    response = await client.get(f"{API}/attendance/", headers=headers)
+    etag = response.headers["ETag"]
+
+    response = await client.get(
+        f"{API}/attendance/", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    # Explicit timestamp: SQLite's CURRENT_TIMESTAMP only has second resolution
+    await db.execute(
+        update(Attendance)
+        .values(notes="edited", updated_at=datetime(2030, 1, 1))
+        .where(Attendance.id == 1)
+    )
+    await db.commit()
+    response = await client.get(
+        f"{API}/attendance/", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+async def test_date_range_reads_archived_attendance(
+    db, client, auth_headers, tmp_path, monkeypatch
+):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(settings, "ATTENDANCE_ARCHIVE_DIR", str(tmp_path / "archive"))
+    user_id = await _seed_attendance(db, rows=3)
+    await db.execute(
+        insert(Attendance),
+        [
+            {
+                "user_id": user_id,
+                "check_in": datetime(2024, 3, 1, 8),
+                "check_out": datetime(2024, 3, 1, 16),
+            }
+        ],
+    )
+    await db.commit()
+
+    report = await archive_attendance(db, date(2024, 3, 15), after_months=1)
+
+    assert report["archived"] == 3
+    assert (await db.execute(select(func.count(Attendance.id)))).scalar_one() == 1
+    headers = auth_headers(user_id)
+    response = await client.get(
+        f"{API}/attendance/",
+        params={
+            "start_date": "2024-01-02T00:00:00",
+            "end_date": "2024-03-31T00:00:00",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert [row["check_in"][:10] for row in response.json()] == [
+        "2024-03-01",
+        "2024-01-03",
+        "2024-01-02",
+    ]
+
+    # A cursor positions both sides; skip is ignored as for hot-only pages
+    page = {"start_date": "2024-01-02T00:00:00", "end_date": "2024-03-31T00:00:00"}
+    response = await client.get(
+        f"{API}/attendance/", params={**page, "limit": 1}, headers=headers
+    )
+    cursor = response.headers["X-Next-Cursor"]
+    response = await client.get(
+        f"{API}/attendance/",
+        params={**page, "limit": 1, "skip": 1, "cursor": cursor},
+        headers=headers,
+    )
+    assert [row["check_in"][:10] for row in response.json()] == ["2024-01-03"]
+
+    # The ETag of an archive-only range follows the archive
+    january = {"start_date": "2024-01-02T00:00:00", "end_date": "2024-01-31T00:00:00"}
+    response = await client.get(f"{API}/attendance/", params=january, headers=headers)
+    etag = response.headers["ETag"]
+    await archive_attendance(db, date(2024, 5, 15), after_months=1)
+    response = await client.get(
+        f"{API}/attendance/",
+        params=january,
+        headers={**headers, "If-None-Match": etag},
+    )
+    assert response.status_code == 200
+
+
+async def test_archived_pages_follow_the_cursor(db, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(settings, "ATTENDANCE_ARCHIVE_DIR", str(tmp_path / "archive"))
+    user_id = await _seed_attendance(db, rows=0)
+    # Equal check-ins, so only the id orders them
+    same = datetime(2024, 1, 10, 8)
+    await db.execute(
+        insert(Attendance),
+        [
+            {"user_id": user_id, "check_in": same, "check_out": same}
+            for _ in range(5)
+        ]
+        + [{"user_id": user_id, "check_in": same.replace(month=2), "check_out": same}],
+    )
+    await db.commit()
+    await archive_attendance(db, date(2024, 4, 15), after_months=1)
+
+    seen, cursor = [], None
+    while True:
+        page = await get_archived_attendance(
+            datetime(2024, 1, 1), datetime(2024, 1, 31), user_id, cursor, limit=2
+        )
+        assert len(page) <= 2
+        if not page:
+            break
+        seen.extend(record.id for record in page)
+        cursor = encode_cursor(page[-1].check_in, page[-1].id)
+
+    assert seen == sorted(seen, reverse=True) and len(seen) == 5
+
+
+async def test_check_in_closes_session_from_previous_month(db, assert_max_queries):
+    user_id = (
+        await db.execute(
+            insert(User).returning(User.id),
+            [{"email": "night@example.com", "hashed_password": "x"}],
+        )
+    ).scalar_one()
+    await db.commit()
+
+    # The common case stays a single INSERT ... RETURNING
+    with assert_max_queries(1):
+        attendance = await check_in(
+            db, user_id, check_in_time=datetime(2024, 1, 31, 22)
+        )
+    assert attendance is not None
+
+    # Without partitions the open-session index spans months, so last
+    # month's session conflicts and is closed on the retry path
+    attendance = await check_in(db, user_id, check_in_time=datetime(2024, 2, 1, 9))
+
+    assert attendance is not None
+    rows = (
+        await db.execute(
+            select(Attendance.check_in, Attendance.check_out_method).order_by(
+                Attendance.check_in
+            )
+        )
+    ).all()
+    assert rows == [
+        (datetime(2024, 1, 31, 22), "AUTO"),
+        (datetime(2024, 2, 1, 9), None),
+    ]
+
+
+async def test_partitioned_check_in_closes_only_last_month(db):
+    result = await db.execute(
+        insert(User).returning(User.id),
+        [{"email": f"night{i}@example.com", "hashed_password": "x"} for i in range(2)],
+    )
+    user_ids = list(result.scalars())
+    await db.execute(
+        insert(Attendance),
+        [
+            {"user_id": user_ids[0], "check_in": datetime(2023, 12, 31, 22)},
+            {"user_id": user_ids[1], "check_in": datetime(2024, 1, 31, 22)},
+        ],
+    )
+    await db.commit()
+
+    class PartitionedSession:
+        """Takes the PostgreSQL path; the UPDATE itself is portable"""
+
+        def __getattr__(self, name):
+            return getattr(db, name)
+
+        def get_bind(self):
+            return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    # One partition only; older months are left to the maintenance job
+    closed = await close_earlier_month_sessions(
+        PartitionedSession(), user_ids, datetime(2024, 2, 1, 9)
+    )
+    await db.commit()
+
+    assert closed == 1
+    rows = (
+        await db.execute(
+            select(Attendance.check_in, Attendance.check_out_method).order_by(
+                Attendance.check_in
+            )
+        )
+    ).all()
+    assert rows == [
+        (datetime(2023, 12, 31, 22), None),
+        (datetime(2024, 1, 31, 22), "AUTO"),
+    ]
+
+
+async def test_maintain_partitions_creates_ahead_and_detaches_old(db):
+    user_id = (
+        await db.execute(
+            insert(User).returning(User.id),
+            [{"email": "night@example.com", "hashed_password": "x"}],
+        )
+    ).scalar_one()
+    await db.execute(
+        insert(Attendance),
+        [
+            {"user_id": user_id, "check_in": datetime(2024, 2, 29, 22)},
+            {
+                "user_id": user_id,
+                "check_in": datetime(2024, 3, 1, 8),
+                "check_out": datetime(2024, 3, 1, 16),
+            },
+        ],
+    )
+    await db.commit()
+    partitions = [
+        DEFAULT_PARTITION,
+        partition_name(date(2023, 12, 1)),
+        partition_name(date(2024, 2, 1)),
+        partition_name(date(2024, 3, 1)),
+    ]
+    catalog = []
+
+    class CatalogSession:
+        """Answers the pg_inherits lookup and records partition DDL"""
+
+        def __getattr__(self, name):
+            return getattr(db, name)
+
+        async def execute(self, statement, *args, **kwargs):
+            sql = str(statement)
+            if "pg_inherits" in sql:
+                return SimpleNamespace(scalars=lambda: list(partitions))
+            if not isinstance(statement, TextClause):
+                return await db.execute(statement, *args, **kwargs)
+            catalog.append(" ".join(sql.split()))
+            if sql.startswith("CREATE TABLE"):
+                partitions.append(sql.split('"')[1])
+
+    report = await maintain_partitions(
+        CatalogSession(), date(2024, 3, 15), months_ahead=2, retention_months=2
+    )
+
+    assert report == {
+        "created": ["attendance_records_p2024_04", "attendance_records_p2024_05"],
+        "detached": ["attendance_records_p2023_12"],
+        "closed_sessions": 1,
+    }
+    assert (
+        "ALTER TABLE attendance_records ATTACH PARTITION "
+        '"attendance_records_p2024_04" '
+        "FOR VALUES FROM ('2024-04-01') TO ('2024-05-01')"
+    ) in catalog
+    assert (
+        'CREATE UNIQUE INDEX "uq_attendance_records_p2024_05_open_session" ON '
+        '"attendance_records_p2024_05" (user_id) WHERE check_out IS NULL'
+    ) in catalog
+    assert catalog[-1] == (
+        'ALTER TABLE attendance_records DETACH PARTITION "attendance_records_p2023_12"'
+    )
+    # Creating a partition that exists is a no-op
+    assert not await create_partition(CatalogSession(), date(2024, 4, 1))
+    # The session left open in February is closed; March's is untouched
+    rows = (
+        await db.execute(
+            select(Attendance.check_in, Attendance.check_out_method).order_by(
+                Attendance.check_in
+            )
+        )
+    ).all()
+    assert rows == [
+        (datetime(2024, 2, 29, 22), "AUTO"),
+        (datetime(2024, 3, 1, 8), None),
+    ]
+
+
+async def test_second_check_in_conflicts_on_open_session(
+    db, client, auth_headers, assert_max_queries
+):
+    user_id = (
+        await db.execute(
+            insert(User).returning(User.id),
+            [{"email": "worker@example.com", "hashed_password": "x"}],
+        )
+    ).scalar_one()
+    await db.commit()
+    headers = auth_headers(user_id)
+
+    manual = {"check_in_method": "MANUAL"}
+    response = await client.post(
+        f"{API}/attendance/check-in", json=manual, headers=headers
+    )
+    assert response.status_code == 200
+    # No status pre-check: the insert itself hits the open-session index,
+    # after which only the stale-session close is tried
+    with assert_max_queries(2):
+        response = await client.post(
+            f"{API}/attendance/check-in", json=manual, headers=headers
+        )
+    assert response.status_code == 400
+    assert response.json()["detail"] == (
+        "You are already checked in. Please check out first."
+    )
+
+    with pytest.raises(IntegrityError):
+        await db.execute(
+            insert(Attendance), [{"user_id": user_id, "check_in": datetime.now()}]
+        )
+    await db.rollback()
+    open_sessions = await db.scalar(
+        select(func.count()).where(Attendance.check_out.is_(None))
+    )
+    assert open_sessions == 1
+
+
+async def test_check_in_auto_closes_session_from_earlier_day(
+    db, client, auth_headers
+):
+    user_id = (
+        await db.execute(
+            insert(User).returning(User.id),
+            [{"email": "worker@example.com", "hashed_password": "x"}],
+        )
+    ).scalar_one()
+    yesterday = datetime.combine(date.today() - timedelta(days=1), time.min)
+    await db.execute(
+        insert(Attendance),
+        [{"user_id": user_id, "check_in": yesterday + timedelta(hours=9)}],
+    )
+    await db.commit()
+
+    response = await client.post(
+        f"{API}/attendance/check-in",
+        json={"check_in_method": "MANUAL"},
+        headers=auth_headers(user_id),
+    )
+
+    assert response.status_code == 200
+    rows = (
+        await db.execute(
+            select(Attendance.check_out, Attendance.check_out_method).order_by(
+                Attendance.check_in
+            )
+        )
+    ).all()
+    # Closed with zero duration rather than guessing when the user left
+    assert rows == [(yesterday + timedelta(hours=9), "AUTO"), (None, None)]
+
+
+async def test_import_reports_row_errors_without_aborting(db, client, auth_headers):
+    user_id = await _seed_attendance(db, rows=0)
+    body = (
+        "user_id,check_in,check_out,notes\n"
+        f"{user_id},2024-02-01T09:00:00,2024-02-01T17:00:00,ok\n"
+        f"{user_id},not a date,,\n"
+        f"{user_id},2024-02-02T09:00:00\n"
+        f'{user_id},2024-02-03T09:00:00,2024-02-03T17:00:00,"two\nlines"\n'
+        f"{user_id},2024-02-04T09:00:00,,\n"
+        f"{user_id},2024-02-05T09:00:00,,\n"
+    )
+
+    response = await client.post(
+        f"{API}/attendance/import",
+        content=body,
+        headers={**auth_headers(user_id), "Content-Type": "text/csv"},
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["total_rows"], result["imported"], result["failed"]) == (6, 3, 3)
+    # Line numbers are physical lines; the second open session breaks the
+    # unique index and only that row is rejected
+    assert [error["line"] for error in result["errors"]] == [3, 4, 8]
+    assert result["errors"][1]["error"] == "Expected 4 columns, got 2"
+    assert await db.scalar(select(func.count()).select_from(Attendance)) == 3
+
+    response = await client.post(
+        f"{API}/attendance/import",
+        params={"format": "ndjson"},
+        content='{"user_id": %d, "check_in": "2024-03-01T09:00:00"\n[]\n' % user_id,
+        headers=auth_headers(user_id),
+    )
+    assert [error["line"] for error in response.json()["errors"]] == [1, 2]
+
+
+async def test_import_refreshes_summaries_in_one_statement(db, assert_max_queries):
+    result = await db.execute(
+        insert(User).returning(User.id),
+        [{"email": f"import{i}@example.com", "hashed_password": "x"} for i in range(2)],
+    )
+    user_ids = list(result.scalars())
+    untouched = {
+        "user_id": user_ids[0],
+        "day": date(2024, 3, 1),
+        "total_seconds": 60,
+        "session_count": 1,
+    }
+    await db.execute(insert(DailyAttendanceSummary), [untouched])
+    await db.commit()
+
+    async def records():
+        line = 0
+        for user_id in user_ids:
+            for day in range(4, 7):
+                line += 1
+                check_in_time = datetime(2024, 3, day, 9)
+                yield line, {
+                    "user_id": user_id,
+                    "check_in": check_in_time.isoformat(),
+                    "check_out": (check_in_time + timedelta(hours=8)).isoformat(),
+                }, None
+
+    # Savepoint, insert and release, one DELETE and one INSERT ... SELECT for
+    # all six (user, day) rollups, commit
+    with assert_max_queries(6):
+        imported = await import_attendance(db, records())
+
+    assert imported.imported == 6
+    rows = (
+        await db.execute(
+            select(
+                DailyAttendanceSummary.user_id,
+                DailyAttendanceSummary.day,
+                DailyAttendanceSummary.total_seconds,
+            ).order_by(DailyAttendanceSummary.user_id, DailyAttendanceSummary.day)
+        )
+    ).all()
+    assert rows == [(user_ids[0], date(2024, 3, 1), 60)] + [
+        (user_id, date(2024, 3, day), 8 * 3600)
+        for user_id in user_ids
+        for day in range(4, 7)
+    ]
+
+
+async def test_archived_months_are_not_recomputed(
+    db, client, auth_headers, tmp_path, monkeypatch
+):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(settings, "ATTENDANCE_ARCHIVE_DIR", str(tmp_path / "archive"))
+    user_id = await _seed_attendance(db, rows=3)
+    company_id = (
+        await db.execute(
+            insert(Company).returning(Company.id), [{"name": "Acme", "address": "x"}]
+        )
+    ).scalar_one()
+    await rebuild_daily_summary(db, date(2024, 1, 1), date(2024, 1, 31))
+    await archive_attendance(db, date(2024, 3, 15), after_months=1)
+    headers = auth_headers(user_id)
+    january = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+
+    response = await client.post(
+        f"{API}/attendance/summary/rebuild", params=january, headers=headers
+    )
+    assert response.json() == {"rows": 0}
+    summaries = select(func.count()).select_from(DailyAttendanceSummary)
+    assert (await db.execute(summaries)).scalar_one() == 3
+
+    response = await client.get(
+        f"{API}/companies/{company_id}/timesheet",
+        params={**january, "refresh": "true"},
+        headers=headers,
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Attendance before 2024-02-01 is archived"
+
+    response = await client.get(
+        f"{API}/attendance/export",
+        params={"start_date": "2024-01-01T00:00:00"},
+        headers=headers,
+    )
+    assert response.status_code == 400
+
+
+async def test_archiving_a_month_again_is_idempotent(db, tmp_path, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(settings, "ATTENDANCE_ARCHIVE_DIR", str(tmp_path / "archive"))
+    await _seed_attendance(db, rows=3)
+    rows = (await db.execute(select(Attendance.__table__))).mappings().all()
+    await archive_attendance(db, date(2024, 3, 15), after_months=1)
+
+    # As if the first run stopped before deleting the archived rows
+    await db.execute(insert(Attendance), [dict(row) for row in rows])
+    await db.commit()
+    report = await archive_attendance(db, date(2024, 3, 15), after_months=1)
+
+    assert report["archived"] == 3
+    (path,) = report["files"]
+    assert pq.read_table(path).num_rows == 3
+
+
+async def test_nfc_registry_discards_load_raced_by_invalidation(db):
+    await db.execute(insert(NFCTag), [{"tag_id": "tag-1", "is_active": True}])
+    await db.commit()
+    registry = NFCTagRegistry()
+
+    class _InvalidatedDuringQuery:
+        async def execute(self, statement):
+            result = await db.execute(statement)
+            registry.invalidate()
+            return result
+
+    assert await registry.get(_InvalidatedDuringQuery(), "tag-1") is not None
+    # The raced load was not kept, so the next lookup queries again
+    await registry.get(db, "tag-1")
+    assert registry.loads == 2
+    await registry.get(db, "tag-1")
+    assert registry.loads == 2
+
+
+async def test_bulk_nfc_endpoints_update_the_registry(db, client, auth_headers):
+    admin_id = await _seed_attendance(db, rows=0)
+    headers = auth_headers(admin_id)
+    await db.execute(insert(NFCTag), [{"tag_id": "door", "is_active": False}])
+    await db.commit()
+
+    response = await client.post(
+        f"{API}/nfc-tags/bulk",
+        json={
+            "tags": [
+                {"tag_id": "door", "user_id": admin_id},
+                {"tag_id": "desk"},
+                {"tag_id": "gate"},
+            ]
+        },
+        headers=headers,
+    )
+    assert response.json() == {"created": 2, "updated": 1, "deactivated": 0}
+    response = await client.get(f"{API}/nfc-tags/", headers=headers)
+    assert [(tag["tag_id"], tag["is_active"]) for tag in response.json()] == [
+        ("door", True),
+        ("desk", True),
+        ("gate", True),
+    ]
+    assert (await validate_tag(db, "door", admin_id))["valid"]
+    assert (await validate_tag(db, "desk", admin_id))["valid"]
+    generation = nfc_registry._generation
+
+    response = await client.post(
+        f"{API}/nfc-tags/deactivate",
+        json={"tag_ids": ["desk", "gate", "unknown"]},
+        headers=headers,
+    )
+    assert response.json() == {"created": 0, "updated": 0, "deactivated": 2}
+    # The cached registry was dropped, so the next scan sees the change
+    assert nfc_registry._generation > generation
+    assert await validate_tag(db, "desk", admin_id) == {
+        "valid": False,
+        "message": "Invalid NFC tag ID",
+    }
+    assert (await validate_tag(db, "door", admin_id))["valid"]
+    # Already inactive tags are not counted again
+    response = await client.post(
+        f"{API}/nfc-tags/deactivate", json={"tag_ids": ["desk"]}, headers=headers
+    )
+    assert response.json()["deactivated"] == 0
+
+    user_id = (
+        await db.execute(
+            insert(User).returning(User.id),
+            [{"email": "worker@example.com", "hashed_password": "x"}],
+        )
+    ).scalar_one()
+    await db.commit()
+    response = await client.post(
+        f"{API}/nfc-tags/deactivate",
+        json={"tag_ids": ["door"]},
+        headers=auth_headers(user_id),
+    )
+    assert response.status_code == 400
+
+
+async def _seed_site_employee(db) -> tuple:
+    company_id = (
+        await db.execute(
+            insert(Company).returning(Company.id), [{"name": "Acme", "address": "x"}]
+        )
+    ).scalar_one()
+    site_id = (
+        await db.execute(
+            insert(CompanySite).returning(CompanySite.id),
+            [
+                {
+                    "company_id": company_id,
+                    "name": "HQ",
+                    "latitude": 6.5,
+                    "longitude": 3.4,
+                    "radius_meters": 100,
+                }
+            ],
+        )
+    ).scalar_one()
+    user_id = (
+        await db.execute(
+            insert(User).returning(User.id),
+            [
+                {
+                    "email": "worker@example.com",
+                    "hashed_password": "x",
+                    "company_id": company_id,
+                }
+            ],
+        )
+    ).scalar_one()
+    await db.execute(
+        insert(NFCTag),
+        [
+            {"tag_id": "desk", "site_id": site_id, "is_active": True},
+            {"tag_id": "retired", "site_id": site_id, "is_active": False},
+        ],
+    )
+    await db.commit()
+    return user_id, site_id
+
+
+async def test_check_in_rejects_missing_or_invalid_credentials(
+    db, client, auth_headers
+):
+    user_id, site_id = await _seed_site_employee(db)
+    expired = site_code(site_id, current_window() - 2)
+    at_site = {"latitude": 6.5, "longitude": 3.4}
+    cases = [
+        ({"check_in_method": "QR"}, "QR code is required."),
+        ({"check_in_method": "QR", "qr_code": "1.2.3"}, "Invalid or expired QR code."),
+        ({"check_in_method": "QR", "qr_code": expired}, "Invalid or expired QR code."),
+        ({"check_in_method": "NFC"}, "NFC tag ID is required."),
+        ({"check_in_method": "NFC", "nfc_tag_id": "unknown"}, "Invalid NFC tag ID"),
+        ({"check_in_method": "NFC", "nfc_tag_id": "retired"}, "Invalid NFC tag ID"),
+    ]
+    for payload, detail in cases:
+        response = await client.post(
+            f"{API}/attendance/check-in",
+            json={**payload, **at_site},
+            headers=auth_headers(user_id),
+        )
+        assert (response.status_code, response.json()["detail"]) == (400, detail)
+
+    response = await client.post(
+        f"{API}/attendance/check-in",
+        json={"check_in_method": "NFC", "nfc_tag_id": "desk", **at_site},
+        headers=auth_headers(user_id),
+    )
+    assert response.status_code == 200
+
+
+async def test_check_in_and_out_enforce_geofence(
+    db, client, auth_headers, assert_max_queries
+):
+    user_id, _ = await _seed_site_employee(db)
+    headers = auth_headers(user_id)
+    manual = {"check_in_method": "MANUAL"}
+
+    response = await client.post(
+        f"{API}/attendance/check-in", json=manual, headers=headers
+    )
+    assert (response.status_code, response.json()["detail"]) == (
+        400,
+        "Your location is required to check in or out.",
+    )
+    # About 1 km north of the 100 m site; the site index is cached by now
+    with assert_max_queries(0):
+        response = await client.post(
+            f"{API}/attendance/check-in",
+            json={**manual, "latitude": 6.509, "longitude": 3.4},
+            headers=headers,
+        )
+    assert (response.status_code, response.json()["detail"]) == (
+        400,
+        "You are not at an allowed location.",
+    )
+
+    response = await client.post(
+        f"{API}/attendance/check-in",
+        json={**manual, "latitude": 6.5005, "longitude": 3.4},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    response = await client.post(
+        f"{API}/attendance/check-out",
+        json={"check_out_method": "MANUAL", "latitude": 7.0, "longitude": 3.4},
+        headers=headers,
+    )
+    assert response.status_code == 400
+    assert await db.scalar(
+        select(func.count()).where(Attendance.check_out.is_not(None))
+    ) == 0
+
+
+async def test_geofence_audit_flags_records_outside_sites(
+    db, client, auth_headers
+):
+    admin_id = await _seed_attendance(db, rows=0)
+    user_id, _ = await _seed_site_employee(db)
+    start = datetime(2024, 1, 1, 8)
+    ids = (
+        await db.execute(
+            insert(Attendance).returning(Attendance.id),
+            [
+                {
+                    "user_id": user_id,
+                    "check_in": start + timedelta(days=i),
+                    "check_out": start + timedelta(days=i, hours=8),
+                    "latitude": lat,
+                    "longitude": lon,
+                }
+                for i, (lat, lon) in enumerate(
+                    [(6.5, 3.4), (6.5005, 3.4), (6.51, 3.4), (None, None)]
+                )
+            ],
+        )
+    ).scalars().all()
+    await db.commit()
+    company_id = await db.scalar(select(User.company_id).where(User.id == user_id))
+    headers = auth_headers(admin_id)
+    period = {"start_date": "2024-01-01T00:00:00", "end_date": "2024-02-01T00:00:00"}
+
+    response = await client.post(
+        f"{API}/attendance/audit/geofence",
+        json={**period, "company_id": company_id},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["checked"] == 3 and result["missing_location"] == 1
+    # 0.01 degrees of latitude north of the site, well past its 100 m radius
+    [violation] = result["violations"]
+    assert (result["flagged"], violation["id"]) == (1, ids[2])
+    assert violation["distance_meters"] == 1111.9
+
+    # An explicit fence overrides the company's sites
+    response = await client.post(
+        f"{API}/attendance/audit/geofence",
+        json={**period, "latitude": 6.5, "longitude": 3.4, "radius_meters": 10},
+        headers=headers,
+    )
+    assert response.json()["flagged"] == 2
+
+    response = await client.post(
+        f"{API}/attendance/audit/geofence", json=period, headers=headers
+    )
+    assert response.status_code == 400
+    response = await client.post(
+        f"{API}/attendance/audit/geofence",
+        json={**period, "company_id": company_id},
+        headers=auth_headers(user_id),
+    )
+    assert response.status_code == 400
+
+
+async def test_idempotent_check_in_replays_first_response(
+    db, client, auth_headers, assert_max_queries
+):
+    user_id = await _seed_attendance(db, rows=0)
+    headers = {**auth_headers(user_id), "Idempotency-Key": "tap-1"}
+    manual = {"check_in_method": "MANUAL"}
+
+    first = await client.post(
+        f"{API}/attendance/check-in", json=manual, headers=headers
+    )
+    assert first.status_code == 200
+    # Answered from the in-process cache without a query
+    with assert_max_queries(0):
+        retry = await client.post(
+            f"{API}/attendance/check-in", json=manual, headers=headers
+        )
+    assert (retry.status_code, retry.json()) == (200, first.json())
+    assert retry.headers["Idempotent-Replayed"] == "true"
+
+    # Another worker finds the response in the idempotency table
+    idempotency_cache.clear()
+    with assert_max_queries(1) as statements:
+        retry = await client.post(
+            f"{API}/attendance/check-in", json=manual, headers=headers
+        )
+    assert (retry.status_code, retry.json()) == (200, first.json())
+    assert "attendance_records" not in statements[0]
+
+    response = await client.post(
+        f"{API}/attendance/check-in",
+        json={**manual, "notes": "different"},
+        headers=headers,
+    )
+    assert response.status_code == 422
+    assert await db.scalar(select(func.count()).select_from(Attendance)) == 1
+
+
+async def test_batched_check_outs_of_one_session_apply_once(db, session_factory):
+    user_id = (
+        await db.execute(
+            insert(User).returning(User.id),
+            [{"email": "worker@example.com", "hashed_password": "x"}],
+        )
+    ).scalar_one()
+    attendance = await check_in(db, user_id, check_in_time=datetime.now())
+    ingestor = AttendanceIngestor(
+        batch_size=10, flush_interval=0.05, session_factory=session_factory
+    )
+
+    first, second = await asyncio.gather(
+        ingestor.check_out(attendance.id, notes="bye"),
+        ingestor.check_out(attendance.id, notes="bye"),
+    )
+    await ingestor.stop()
+
+    assert first.check_out is not None and first.notes == "bye"
+    assert second is None
+
+
+async def test_ingestor_stop_answers_in_flight_and_queued_events(
+    db, session_factory
+):
+    result = await db.execute(
+        insert(User).returning(User.id),
+        [{"email": f"worker{i}@example.com", "hashed_password": "x"} for i in range(3)],
+    )
+    user_ids = list(result.scalars())
+    await db.commit()
+    flushing = asyncio.Event()
+
+    @asynccontextmanager
+    async def slow_session():
+        flushing.set()
+        await asyncio.sleep(0.05)
+        async with session_factory() as session:
+            yield session
+
+    ingestor = AttendanceIngestor(
+        batch_size=2, flush_interval=0.01, session_factory=slow_session
+    )
+    in_flight = [
+        asyncio.create_task(ingestor.check_in(user_id=user_id))
+        for user_id in user_ids[:2]
+    ]
+    await flushing.wait()
+    queued = asyncio.create_task(ingestor.check_in(user_id=user_ids[2]))
+    await asyncio.sleep(0)
+
+    await ingestor.stop()
+
+    assert all(task.done() for task in in_flight + [queued])
+    assert {task.result().user_id for task in in_flight + [queued]} == set(user_ids)
@@ -0,0 +1,101 @@
+# tests/test_auth.py
+import asyncio
+
+from app.core.config import settings
+from app.core.security import (
+    create_access_token,
+    get_password_hash,
+    password_hash_stats,
+    verify_password_async,
+)
+from app.schemas.user import UserCreate
+from app.services.user import (
+    create_user,
+    get_user_cached,
+    update_user,
+    user_cache,
+)
+
+API = settings.API_V1_STR
+
+
+async def test_login_access_token(db, client):
+    await create_user(
+        db, UserCreate(email="worker@example.com", password="correct horse")
+    )
+
+    response = await client.post(
+        f"{API}/login/access-token",
+        data={"username": "worker@example.com", "password": "correct horse"},
+    )
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    response = await client.post(
+        f"{API}/login/test-token", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.json()["email"] == "worker@example.com"
+
+    for username, password in [
+        ("worker@example.com", "wrong"),
+        ("nobody@example.com", "correct horse"),
+    ]:
+        response = await client.post(
+            f"{API}/login/access-token",
+            data={"username": username, "password": password},
+        )
+        assert response.status_code == 401
+
+
+async def test_password_hashing_keeps_event_loop_free():
+    hashed = get_password_hash("secret")
+    before = password_hash_stats()
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    ticker = asyncio.create_task(tick())
+    calls = 2 * settings.PASSWORD_HASH_MAX_CONCURRENCY
+    results = await asyncio.gather(
+        *(verify_password_async("secret", hashed) for _ in range(calls))
+    )
+    ticker.cancel()
+
+    assert results == [True] * calls
+    # The loop kept running while bcrypt worked in the executor
+    assert ticks > calls
+    stats = password_hash_stats()
+    assert stats["completed"] - before["completed"] == calls
+    assert stats["running"] == stats["waiting"] == 0
+    # Calls beyond the concurrency bound queued instead of piling onto the pool
+    assert stats["max_waiting"] >= calls - settings.PASSWORD_HASH_MAX_CONCURRENCY
+
+
+async def test_user_not_cached_when_deactivated_during_read(db, client):
+    user = await create_user(
+        db, UserCreate(email="worker@example.com", password="correct horse")
+    )
+    user_id = user.id
+
+    class DeactivatingSession:
+        """Lets a concurrent update land between the SELECT and the cache fill"""
+
+        def __getattr__(self, name):
+            return getattr(db, name)
+
+        async def execute(self, *args, **kwargs):
+            result = await db.execute(*args, **kwargs)
+            await update_user(db, db_obj=user, obj_in={"is_active": False})
+            return result
+
+    await get_user_cached(DeactivatingSession(), user_id)
+    assert user_cache.get(user_id) is None
+
+    token = create_access_token(user_id)
+    response = await client.get(
+        f"{API}/users/me", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert (response.status_code, response.json()["detail"]) == (400, "Inactive user")
@@ -0,0 +1,357 @@
+# tests/test_companies.py
+import asyncio
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert, update
+from sqlalchemy.dialects import postgresql
+
+from app.core.config import settings
+from app.core.invalidation import PostgresInvalidationChannel
+from app.models.attendance import Attendance
+from app.models.company import Company
+from app.models.company_site import CompanySite
+from app.models.user import User
+from app.schemas.user import UserCreate
+from app.services.company import (
+    company_cache,
+    delete_company,
+    get_company,
+    invalidate_company,
+    update_company,
+)
+from app.services import qr, timesheet
+from app.services.user import create_user, get_user_cached, user_cache
+
+API = settings.API_V1_STR
+
+
+async def _seed_company(db, employees: int) -> tuple:
+    company_id = (
+        await db.execute(
+            insert(Company).returning(Company.id),
+            [{"name": "Acme", "address": "1 Main St"}],
+        )
+    ).scalar_one()
+    result = await db.execute(
+        insert(User).returning(User.id),
+        [
+            {
+                "email": f"user{i}@example.com",
+                "hashed_password": "x",
+                "company_id": company_id,
+            }
+            for i in range(employees)
+        ],
+    )
+    user_ids = list(result.scalars())
+    await db.commit()
+    return company_id, user_ids
+
+
+async def test_read_company_with_employees_query_count(
+    db, client, auth_headers, assert_max_queries
+):
+    company_id, user_ids = await _seed_company(db, employees=25)
+    headers = auth_headers(user_ids[0])
+
+    # Current user, company, employees: independent of company size
+    with assert_max_queries(3):
+        response = await client.get(f"{API}/companies/{company_id}", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()["employees"]) == 25
+
+
+async def test_read_company_not_modified(
+    db, client, auth_headers, assert_max_queries
+):
+    company_id, user_ids = await _seed_company(db, employees=25)
+    headers = auth_headers(user_ids[0])
+    response = await client.get(f"{API}/companies/{company_id}", headers=headers)
+    etag = response.headers["ETag"]
+
+    # User and company both come from the caches
+    with assert_max_queries(0):
+        response = await client.get(
+            f"{API}/companies/{company_id}",
+            headers={**headers, "If-None-Match": etag},
+        )
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    await create_user(
+        db,
+        UserCreate(email="new@example.com", password="x", company_id=company_id),
+    )
+    response = await client.get(
+        f"{API}/companies/{company_id}", headers={**headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert len(response.json()["employees"]) == 26
+
+
+async def test_company_list_cache_invalidated_by_update(
+    db, client, auth_headers, assert_max_queries
+):
+    company_id, user_ids = await _seed_company(db, employees=1)
+    await db.execute(update(User).values(is_superuser=True))
+    await db.commit()
+    headers = auth_headers(user_ids[0])
+    await client.get(f"{API}/companies/", headers=headers)
+
+    with assert_max_queries(0):
+        response = await client.get(f"{API}/companies/", headers=headers)
+    assert response.json()[0]["name"] == "Acme"
+
+    company = await get_company(db, id=company_id)
+    await update_company(db, db_obj=company, obj_in={"name": "Acme Corp"})
+    response = await client.get(f"{API}/companies/", headers=headers)
+    assert response.json()[0]["name"] == "Acme Corp"
+    assert company_cache.stats()["invalidations"] >= 1
+
+
+async def test_company_not_cached_when_invalidated_during_read(db):
+    company_id, _ = await _seed_company(db, employees=1)
+
+    class InvalidatingSession:
+        """Lets a concurrent write land between the SELECT and the cache fill"""
+
+        def __getattr__(self, name):
+            return getattr(db, name)
+
+        async def execute(self, *args, **kwargs):
+            result = await db.execute(*args, **kwargs)
+            await invalidate_company(company_id)
+            return result
+
+    company = await get_company(InvalidatingSession(), id=company_id)
+    assert company.name == "Acme"
+    assert await company_cache.get(f"company:{company_id}") is None
+
+    await get_company(db, id=company_id)
+    assert await company_cache.get(f"company:{company_id}") is not None
+
+
+async def test_delete_company_evicts_cached_employees(db):
+    company_id, user_ids = await _seed_company(db, employees=2)
+    for user_id in user_ids:
+        await get_user_cached(db, user_id)
+    assert user_cache.get(user_ids[1])["company_id"] == company_id
+
+    await delete_company(db, id=company_id)
+
+    assert all(user_cache.get(user_id) is None for user_id in user_ids)
+    db.expunge_all()
+    user = await get_user_cached(db, user_ids[1])
+    assert user.company_id is None
+
+
+async def test_read_other_company_denied_before_loading(
+    db, client, auth_headers, assert_max_queries
+):
+    company_id, user_ids = await _seed_company(db, employees=1)
+
+    # Only the current user is loaded
+    with assert_max_queries(1):
+        response = await client.get(
+            f"{API}/companies/{company_id + 1}", headers=auth_headers(user_ids[0])
+        )
+    assert response.status_code == 400
+
+
+class _FakeListenerConnection:
+    def __init__(self):
+        self.on_terminate = None
+
+    def add_termination_listener(self, callback):
+        self.on_terminate = callback
+
+    async def add_listener(self, channel, callback):
+        pass
+
+    async def close(self):
+        pass
+
+
+async def test_invalidation_listener_reconnects_and_flushes(db, monkeypatch):
+    import asyncpg
+
+    connections = []
+
+    async def connect(dsn):
+        if len(connections) == 1:
+            connections.append(None)
+            raise OSError("connection refused")
+        connections.append(_FakeListenerConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    monkeypatch.setattr(settings, "CACHE_INVALIDATION_RECONNECT_MIN_SECONDS", 0)
+    channel = PostgresInvalidationChannel("postgresql://test")
+    channel.subscribe_reset(company_cache.clear)
+    await channel.start()
+
+    company_id, _ = await _seed_company(db, employees=1)
+    await get_company(db, id=company_id)
+    connections[0].on_terminate(connections[0])
+    while channel._conn is None:
+        await asyncio.sleep(0)
+
+    # One failed attempt, then listening again on a new connection
+    assert len(connections) == 3 and channel._conn is connections[2]
+    assert await company_cache.get(f"company:{company_id}") is None
+    await channel.stop()
+
+
+async def test_read_own_company_query_count(
+    db, client, auth_headers, assert_max_queries
+):
+    company_id, user_ids = await _seed_company(db, employees=3)
+
+    with assert_max_queries(2):
+        response = await client.get(
+            f"{API}/companies/", headers=auth_headers(user_ids[0])
+        )
+
+    assert response.status_code == 200
+    assert [company["id"] for company in response.json()] == [company_id]
+
+
+async def test_read_companies_sparse_fieldset(db, client, auth_headers):
+    company_id, user_ids = await _seed_company(db, employees=1)
+
+    response = await client.get(
+        f"{API}/companies/",
+        params={"fields": "id,name"},
+        headers=auth_headers(user_ids[0]),
+    )
+
+    assert response.status_code == 200
+    assert response.json() == [{"id": company_id, "name": "Acme"}]
+
+
+async def test_company_timesheet(db, client, auth_headers, assert_max_queries):
+    company_id, (user_id, idle_id) = await _seed_company(db, employees=2)
+    await db.execute(update(User).where(User.id == user_id).values(is_superuser=True))
+    sessions = [
+        # 9h from before the start: one hour of overtime
+        ("2024-01-02 08:50", "2024-01-02 17:50"),
+        # Late first check-in (after 09:05), split day of 7h50
+        ("2024-01-03 09:10", "2024-01-03 12:00"),
+        ("2024-01-03 13:00", "2024-01-03 18:00"),
+        # Never checked out
+        ("2024-01-04 09:00", None),
+    ]
+    await db.execute(
+        insert(Attendance),
+        [
+            {
+                "user_id": user_id,
+                "check_in": datetime.fromisoformat(check_in),
+                "check_out": check_out and datetime.fromisoformat(check_out),
+                "check_in_method": "QR",
+            }
+            for check_in, check_out in sessions
+        ],
+    )
+    await db.commit()
+    url = f"{API}/companies/{company_id}/timesheet"
+    params = {"start_date": "2024-01-01", "end_date": "2024-01-31"}
+    headers = auth_headers(user_id)
+
+    response = await client.get(url, params=params, headers=headers)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["finished"] is True
+    entries = {entry["user_id"]: entry for entry in report["entries"]}
+    assert entries[user_id] == {
+        "user_id": user_id,
+        "email": "user0@example.com",
+        "full_name": None,
+        "total_seconds": 9 * 3600 + 7 * 3600 + 50 * 60,
+        "overtime_seconds": 3600,
+        "days_present": 3,
+        "session_count": 4,
+        "late_arrivals": 1,
+        "missing_check_outs": 1,
+    }
+    assert entries[idle_id]["total_seconds"] == 0
+    assert entries[idle_id]["session_count"] == 0
+
+    # Finished period: served from the stored snapshot
+    with assert_max_queries(1):
+        again = await client.get(url, params=params, headers=headers)
+    assert again.json()["generated_at"] == report["generated_at"]
+
+
+def test_timesheet_judges_days_in_the_configured_timezone():
+    berlin = {**timesheet._rules(), "timezone": "Europe/Berlin"}
+    query = timesheet._timesheet_query(
+        1, date(2024, 1, 1), date(2024, 1, 31), berlin, "postgresql"
+    )
+    compiled = query.compile(dialect=postgresql.dialect())
+
+    # Days, late flags and the period bounds follow Berlin wall-clock time,
+    # whatever TimeZone the database session uses
+    sql = str(compiled)
+    assert "date(timezone(%(timezone_1)s::VARCHAR, attendance_records.check_in))" in sql
+    assert (
+        "EXTRACT(epoch FROM timezone(%(timezone_1)s::VARCHAR, "
+        "attendance_records.check_in))"
+    ) in sql
+    assert compiled.params["timezone_1"] == "Europe/Berlin"
+    zone = ZoneInfo("Europe/Berlin")
+    assert (compiled.params["check_in_1"], compiled.params["check_in_2"]) == (
+        datetime(2024, 1, 1, tzinfo=zone),
+        datetime(2024, 2, 1, tzinfo=zone),
+    )
+    # Existing UTC snapshots keep their keys
+    assert timesheet._rules_key(timesheet._rules()) == "8h@09:00+5m"
+    assert timesheet._rules_key(berlin) == "8h@09:00+5m Europe/Berlin"
+
+
+async def test_site_qr_renderer_reuses_rendered_windows(
+    db, session_factory, monkeypatch
+):
+    company_id, _ = await _seed_company(db, employees=0)
+    await db.execute(
+        insert(CompanySite),
+        [
+            {
+                "company_id": company_id,
+                "name": f"Site {i}",
+                "latitude": 6.5,
+                "longitude": 3.4,
+                "radius_meters": 100,
+            }
+            for i in range(2)
+        ],
+    )
+    await db.commit()
+    renders = []
+
+    def render(data, size, format):
+        renders.append(data)
+        return data.encode()
+
+    window = [100]
+    monkeypatch.setattr(qr, "AsyncSessionLocal", session_factory)
+    monkeypatch.setattr(qr, "render_qr_code", render)
+    monkeypatch.setattr(qr, "current_window", lambda now=None: window[0])
+    renderer = qr.SiteQRRenderer()
+
+    await renderer.refresh()
+    assert len(renders) == 2 * 2 * 2  # sites x windows x formats
+    window[0] += 1
+    await renderer.refresh()
+    # Only the new upcoming window is rendered
+    assert len(renders) == 8 + 2 * 2
+
+    image, current = await renderer.get(1, "svg")
+    assert (image, current, len(renders)) == (qr.site_code(1, 101).encode(), 101, 12)
+    # A site missing from the pre-rendered set is rendered once
+    await renderer.get(99, "png")
+    await renderer.get(99, "png")
+    assert len(renders) == 13
@@ -0,0 +1,72 @@
+# tests/test_db.py
+import pytest
+from pydantic import ValidationError
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config import Settings
+from app.db import session as db_session
+from app.db.pool import InstrumentedQueuePool
+
+POSTGRES_URL = "postgresql+asyncpg://user:secret@db/workcheck"
+
+
+def test_pool_profile_presets_yield_to_explicit_settings():
+    web = Settings(DB_POOL_PROFILE="web")
+    assert (web.DB_POOL_SIZE, web.DB_MAX_OVERFLOW) == (10, 20)
+    assert web.DB_POOL_TIMEOUT == 10.0
+    worker = Settings(DB_POOL_PROFILE="worker", DB_MAX_OVERFLOW=4)
+    assert (worker.DB_POOL_SIZE, worker.DB_MAX_OVERFLOW) == (2, 4)
+    with pytest.raises(ValidationError, match="Unknown DB_POOL_PROFILE"):
+        Settings(DB_POOL_PROFILE="huge")
+
+
+def test_engine_options_follow_profile_and_driver(monkeypatch):
+    monkeypatch.setattr(db_session, "settings", Settings(DB_POOL_PROFILE="pgbouncer"))
+
+    options = db_session.engine_options(POSTGRES_URL)
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert (options["pool_size"], options["max_overflow"]) == (5, 10)
+    assert options["pool_pre_ping"] is False
+    assert options["connect_args"] == {"statement_cache_size": 0}
+    # The statement cache argument is asyncpg's; other drivers do not get it
+    assert "connect_args" not in db_session.engine_options(
+        "postgresql+psycopg://user:secret@db/workcheck"
+    )
+    # Pool tuning is PostgreSQL-only
+    assert "poolclass" not in db_session.engine_options("sqlite+aiosqlite://")
+
+
+async def test_instrumented_pool_snapshot_counts_checkouts_and_timeouts(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    for _ in range(3):
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    async with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            async with engine.connect():
+                pass
+        snapshot = engine.pool.snapshot()
+
+    assert snapshot["size"] == 1 and snapshot["timeout"] == 0.05
+    assert (snapshot["checked_out"], snapshot["checked_in"]) == (1, 0)
+    assert (snapshot["checkouts"], snapshot["timeouts"]) == (4, 1)
+    waits = snapshot["recent_wait_seconds"]
+    assert 0 <= waits["p50"] <= waits["p95"] <= waits["p99"]
+    assert waits["p99"] <= snapshot["wait_seconds_max"]
+    assert snapshot["wait_seconds_avg"] == pytest.approx(
+        snapshot["wait_seconds_total"] / 4
+    )
+
+    # Counters survive the pool being recreated on dispose
+    stats = engine.pool.stats
+    await engine.dispose()
+    assert engine.pool.stats is stats
+    assert engine.pool.snapshot()["checkouts"] == 4
+    await engine.dispose()
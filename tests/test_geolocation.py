@@ -0,0 +1,63 @@
+# tests/test_geolocation.py
+import numpy as np
+
+from app.utils.geolocation import (
+    SiteIndex,
+    calculate_distance,
+    calculate_distance_array,
+    is_within_radius,
+    is_within_radius_array,
+)
+
+
+def test_array_helpers_match_scalar_versions():
+    rng = np.random.default_rng(0)
+    lat1, lat2 = rng.uniform(-89, 89, (2, 500))
+    lon1, lon2 = rng.uniform(-180, 180, (2, 500))
+    # Mostly nearby points, so the radius check is not trivially false
+    lat2[:250] = lat1[:250] + rng.uniform(-0.002, 0.002, 250)
+    lon2[:250] = lon1[:250] + rng.uniform(-0.002, 0.002, 250)
+
+    expected = [calculate_distance(*point) for point in zip(lat1, lon1, lat2, lon2)]
+    np.testing.assert_allclose(
+        calculate_distance_array(lat1, lon1, lat2, lon2), expected, rtol=1e-9
+    )
+    inside = is_within_radius_array(lat1, lon1, lat2, lon2, 150)
+    assert inside.tolist() == [
+        is_within_radius(*point, 150) for point in zip(lat1, lon1, lat2, lon2)
+    ]
+    assert 0 < inside.sum() < 500
+    # Scalars broadcast against arrays
+    np.testing.assert_allclose(
+        calculate_distance_array(lat1, lon1, 6.5, 3.4),
+        [calculate_distance(lat, lon, 6.5, 3.4) for lat, lon in zip(lat1, lon1)],
+        rtol=1e-9,
+    )
+
+
+def test_site_index_finds_sites_across_cell_boundaries():
+    # Centred just below a cell corner, so the fence covers four cells
+    index = SiteIndex(
+        [("corner", 0.0099, 0.0099, 200), ("east", 0.0099, 0.0125, 200)],
+        cell_degrees=0.01,
+    )
+
+    assert len(index) == 2 and "corner" in index
+    for lat, lon in [(0.0099, 0.0099), (0.0101, 0.0098), (0.0098, 0.0101)]:
+        assert index.find(lat, lon) == "corner"
+    # Inside both fences the nearest centre wins
+    assert index.find(0.0099, 0.0114) == "east"
+    assert index.find(0.0099, 0.0110) == "corner"
+    # Same cell as the fences but outside every radius
+    assert index.find(0.0119, 0.0081) is None
+    assert index.find(0.05, 0.05) is None
+
+
+def test_site_index_caps_columns_near_the_poles():
+    index = SiteIndex([("pole", 90.0, 0.0, 100)], cell_degrees=0.1)
+
+    columns = {col for _, col in index._cells}
+    assert len(columns) <= 360 / 0.1 + 1
+    for lon in (-179.95, 0.0, 135.0):
+        assert index.find(89.9995, lon) == "pole"
+    assert index.find(89.99, 0.0) is None
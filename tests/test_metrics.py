@@ -0,0 +1,36 @@
+# tests/test_metrics.py
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.models.attendance import Attendance
+from app.models.user import User
+
+API = settings.API_V1_STR
+
+
+async def test_metrics_label_is_full_route_template(db, client, auth_headers):
+    user_id = (
+        await db.execute(
+            insert(User).returning(User.id),
+            [{"email": "worker@example.com", "hashed_password": "x"}],
+        )
+    ).scalar_one()
+    attendance_id = (
+        await db.execute(
+            insert(Attendance).returning(Attendance.id),
+            [{"user_id": user_id, "check_in": datetime(2024, 1, 1, 8)}],
+        )
+    ).scalar_one()
+    await db.commit()
+
+    await client.get(
+        f"{API}/attendance/{attendance_id}", headers=auth_headers(user_id)
+    )
+
+    response = await client.get("/metrics")
+    assert f'route="{API}/attendance/{{attendance_id}}",status="200"' in (
+        response.text
+    )
+    assert f'route="{API}/attendance/{attendance_id}"' not in response.text
@@ -0,0 +1,31 @@
+# tests/utils.py
+from contextlib import contextmanager
+from typing import Iterator, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[List[str]]:
+    """
+    Fail if more than `limit` SQL statements run inside the block, listing
+    them so an N+1 regression shows which query repeats.
+
+        with assert_max_queries(3):
+            await client.get("/api/v1/companies/1")
+    """
+    statements: List[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "before_cursor_execute", _record)
+    assert len(statements) <= limit, (
+        f"Expected at most {limit} queries, got {len(statements)}:\n"
+        + "\n".join(f"{i}. {sql}" for i, sql in enumerate(statements, 1))
+    )